@@ -0,0 +1,183 @@
+"""
+Offline throughput of process_scraping_tasks_concurrent.
+
+Seeds a local storage backend (utils.storage) with synthetic coding_stats
+documents, swaps the four scrapers for stand-ins that sleep for a fixed
+upstream latency and return a realistic payload, and runs the batch
+pipeline (task listing, lanes, write stage) end to end:
+
+    python benchmarks/batch_throughput_benchmark.py --docs 5000 --latency 50
+    python benchmarks/batch_throughput_benchmark.py --backend sqlite --no-batch-writes
+    python benchmarks/batch_throughput_benchmark.py --storage-latency 30 --no-write-behind
+
+With --upstream the real scrapers run instead, against a local upstream
+stand-in (benchmarks/upstream_standin.py serve), so request building,
+parsing, retries and fault handling are measured too:
+
+    python benchmarks/batch_throughput_benchmark.py --upstream http://127.0.0.1:8090
+
+Rate limits and adaptive concurrency are lifted unless --throttled is given,
+so the numbers show the pipeline's own ceiling rather than the politeness
+settings.
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PLATFORMS = ["leetcode", "github", "codechef", "gfg"]
+
+
+def _lift_throttling() -> None:
+    for platform in PLATFORMS:
+        os.environ.setdefault(f"RATE_LIMIT_{platform.upper()}_RATE", "1000000")
+        os.environ.setdefault(f"RATE_LIMIT_{platform.upper()}_BURST", "1000000")
+    os.environ.setdefault("AIMD_ENABLED", "false")
+
+
+def _calendar(rng: random.Random) -> dict:
+    today = datetime.utcnow()
+    return {
+        (today - timedelta(days=day)).strftime("%Y-%m-%d"): rng.randint(0, 6)
+        for day in range(366)
+    }
+
+
+def synthetic_scrapers(latency: float):
+    """Scraper stand-ins returning each platform's output shape after `latency` seconds."""
+
+    def leetcode(username, **kwargs):
+        time.sleep(latency)
+        rng = random.Random(username)
+        return {
+            "calendar": _calendar(rng),
+            "profile": {
+                "username": username,
+                "problems_solved": [{"difficulty": "All", "count": rng.randint(10, 900)}],
+                "badges": [],
+                "contest_history": [],
+                "contest_ranking": {"rating": rng.randint(1200, 2200)}
+            }
+        }
+
+    def github(username, **kwargs):
+        time.sleep(latency)
+        rng = random.Random(username)
+        return {"github": {"public_repos": rng.randint(0, 80), "total_contributions": 300, "calendar": _calendar(rng)}}
+
+    def codechef(username, **kwargs):
+        time.sleep(latency)
+        rng = random.Random(username)
+        return {"codechef": {"rating": rng.randint(1000, 2200), "stars": 2, "calendar": {}, "participated_contests": []}}
+
+    def gfg(username, **kwargs):
+        time.sleep(latency)
+        rng = random.Random(username)
+        return {"info": {"userName": username, "codingScore": rng.randint(0, 900)}, "solvedStats": {}}
+
+    return {
+        "get_leetcode_full_profile": leetcode,
+        "get_github_profile": github,
+        "get_codechef_profile": codechef,
+        "get_gfg_stats": gfg,
+    }
+
+
+def seed(storage, docs: int) -> None:
+    for index in range(docs):
+        institution = f"inst{index % 25}"
+        storage.document(f"institutions/{institution}/coding_stats/doc{index:07d}").set({
+            "institutionId": institution,
+            "platform": PLATFORMS[index % len(PLATFORMS)],
+            "username": f"user{index}",
+        })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    parser.add_argument("--docs", type=int, default=2000, help="Synthetic documents to seed")
+    parser.add_argument("--latency", type=float, default=50, help="Stand-in upstream latency (ms)")
+    parser.add_argument("--upstream", help="Run the real scrapers against the upstream stand-in at this URL")
+    parser.add_argument("--storage-latency", type=float, default=0, help="Added latency per document read/write (ms)")
+    parser.add_argument("--no-batch-writes", action="store_true", help="Write each document inline")
+    parser.add_argument("--no-write-behind", action="store_true", help="Persist results on the scrape workers")
+    parser.add_argument("--throttled", action="store_true", help="Keep rate limits and AIMD")
+    args = parser.parse_args()
+
+    if not args.throttled:
+        _lift_throttling()
+    if args.upstream:
+        from upstream_standin import standin_env
+        os.environ.update(standin_env(args.upstream))
+
+    import main as app
+    from utils.storage import MemoryBackend, SQLiteBackend
+    from utils.write_stage import FirestoreWriteStage, WriteBehindQueue
+
+    # Per-document log lines would dominate the measurement
+    logging.getLogger().setLevel(logging.WARNING)
+
+    backend_class = SQLiteBackend if args.backend == "sqlite" else MemoryBackend
+    storage_latency = args.storage_latency / 1000
+
+    class Backend(backend_class):
+        # Stands in for the round-trip of a remote document store
+        latency = 0.0
+
+        def _load(self, path):
+            time.sleep(self.latency)
+            return super()._load(path)
+
+        def _store(self, path, data):
+            time.sleep(self.latency)
+            super()._store(path, data)
+
+        def _page(self, *args):
+            time.sleep(self.latency)
+            return super()._page(*args)
+
+    if args.backend == "sqlite":
+        path = os.path.join(tempfile.gettempdir(), "batch_benchmark.sqlite3")
+        if os.path.exists(path):
+            os.remove(path)
+        app.storage = Backend(path)
+    else:
+        app.storage = Backend()
+
+    if not args.upstream:
+        for name, scraper in synthetic_scrapers(args.latency / 1000).items():
+            setattr(app, name, scraper)
+
+    seed(app.storage, args.docs)
+    app.storage.latency = storage_latency
+
+    counters = app.BatchCounters()
+    writer = None if args.no_batch_writes else FirestoreWriteStage(app.storage)
+    write_behind = None if args.no_write_behind else WriteBehindQueue()
+    context = app.BatchContext(writer=writer, on_result=counters.on_result, write_behind=write_behind)
+
+    start = time.perf_counter()
+    summary = app.process_scraping_tasks_concurrent(
+        app.iter_scraping_tasks(), counters=counters, context=context
+    )
+    elapsed = time.perf_counter() - start
+
+    upstream = f"upstream stand-in at {args.upstream}" if args.upstream else f"{args.latency:g} ms upstream latency"
+    print(f"{args.backend} backend, {args.docs} documents, {upstream}, "
+          f"{args.storage_latency:g} ms storage latency, "
+          f"{'inline' if args.no_batch_writes else 'batched'} writes"
+          f"{'' if args.no_write_behind else ', write-behind'}")
+    print(f"  successful {summary['successful']}, failed {summary['failed']}")
+    print(f"  {elapsed:.2f}s, {args.docs / elapsed:.0f} documents/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Check that live scrapes and archive reparses agree.
+
+The "reparse" batch engine (main.py) rebuilds documents from archived raw
+responses with each scraper module's parse_archived_profile(). That is only
+safe while it parses exactly like the live scrapers do. This check replays
+every user's newest archived fetch through the upstream stand-in
+(benchmarks/upstream_standin.py), scrapes it live with the sync and async
+scrapers, reparses the same archived responses and compares the results:
+
+    python benchmarks/reparse_parity_check.py --fixtures ./fixtures
+
+Exits with status 1 and prints the differing fields on any mismatch. Run it
+after changing a parser, with fixtures recorded by upstream_standin.py record
+or a copy of the production RAW_ARCHIVE_DIR.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import threading
+from typing import Any, Dict, Iterator, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from upstream_standin import FaultProfile, Fixtures, create_app, iter_latest_records, standin_env
+
+
+def _diff(live: Any, reparsed: Any, path: str = "") -> Iterator[Tuple[str, Any, Any]]:
+    """(path, live value, reparsed value) of every leaf where the two results differ."""
+    if isinstance(live, dict) and isinstance(reparsed, dict):
+        for key in sorted(set(live) | set(reparsed), key=str):
+            yield from _diff(live.get(key), reparsed.get(key), f"{path}.{key}" if path else str(key))
+    elif live != reparsed:
+        yield path, live, reparsed
+
+
+def _start_standin(fixtures_dir: str, port: int):
+    import uvicorn
+
+    app = create_app(Fixtures(fixtures_dir), FaultProfile())
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", required=True, help="Raw response archive directory")
+    parser.add_argument("--port", type=int, default=8091, help="Port of the in-process stand-in")
+    args = parser.parse_args()
+
+    # Scrape the stand-in, without archiving over the fixtures or reusing ETags
+    os.environ.update(standin_env(f"http://127.0.0.1:{args.port}"))
+    os.environ["RAW_ARCHIVE_ENABLED"] = "false"
+    os.environ["ETAG_CACHE_ENABLED"] = "false"
+    # Archived GraphQL contributions are only requested with a token
+    os.environ.setdefault("GITHUB_TOKEN", "standin")
+
+    from modules import codechef_module, geeks_for_geeks_module, github_module, leetcode_module
+    from modules.http_client import AsyncClientPool
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    modules = {
+        "leetcode": (leetcode_module.get_leetcode_full_profile, leetcode_module.get_leetcode_full_profile_async,
+                     leetcode_module.parse_archived_profile),
+        "github": (github_module.get_github_profile, github_module.get_github_profile_async,
+                   github_module.parse_archived_profile),
+        "codechef": (codechef_module.get_codechef_profile, codechef_module.get_codechef_profile_async,
+                     codechef_module.parse_archived_profile),
+        "gfg": (geeks_for_geeks_module.get_gfg_stats, geeks_for_geeks_module.get_gfg_stats_async,
+                geeks_for_geeks_module.parse_archived_profile),
+    }
+
+    server = _start_standin(args.fixtures, args.port)
+    pool = AsyncClientPool()
+    loop = asyncio.new_event_loop()
+    checked = 0
+    mismatches: Dict[str, list] = {}
+
+    try:
+        for record in iter_latest_records(args.fixtures):
+            platform, username = record["platform"], record["username"]
+            scrape, scrape_async, reparse = modules[platform]
+            reparsed = reparse(username, record["responses"])
+            client = loop.run_until_complete(pool.get(platform))
+            results = {
+                "sync": scrape(username),
+                "async": loop.run_until_complete(scrape_async(client, username)),
+            }
+            for engine, live in results.items():
+                checked += 1
+                differences = list(_diff(live, reparsed))
+                if differences:
+                    mismatches[f"{platform}:{username} ({engine})"] = differences
+    finally:
+        loop.run_until_complete(pool.aclose())
+        loop.close()
+        server.should_exit = True
+
+    for name, differences in mismatches.items():
+        print(f"✗ {name}")
+        for path, live, reparsed in differences[:10]:
+            print(f"    {path}: live={live!r} reparse={reparsed!r}")
+    print(f"{checked - len(mismatches)}/{checked} live scrapes match their reparse")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
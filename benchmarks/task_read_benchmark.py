@@ -0,0 +1,159 @@
+"""
+Measure what the projected task query saves over reading whole documents.
+
+Builds synthetic coding_stats documents shaped like real scraped ones (a
+year of calendar, a contest history) and compares full reads with the
+select(TASK_FIELDS) projection used by iter_scraping_tasks, and sequential
+with partitioned concurrent reads:
+
+    # Encoded size per document and per sweep, no Firestore needed
+    python benchmarks/task_read_benchmark.py --docs 20000
+
+    # Timed collection-group reads against the Firestore emulator
+    FIRESTORE_EMULATOR_HOST=localhost:8080 \\
+        python benchmarks/task_read_benchmark.py --docs 20000 --emulator
+
+The emulator run seeds the documents under institutions/bench-*/coding_stats
+on its first use (pass --no-seed to reuse them) and reads them both ways.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.cloud import firestore as gcloud_firestore
+from google.cloud.firestore_v1 import _helpers
+from google.cloud.firestore_v1.types import document
+
+from main import TASK_FIELDS
+from utils.storage import FirestoreBackend
+from utils.task_stream import read_concurrently
+
+PLATFORMS = ["leetcode", "github", "codechef", "gfg"]
+INSTITUTIONS = 20
+
+
+def synthetic_document(index: int, contests: int = 150) -> Dict[str, Any]:
+    """One coding_stats document with a full year of calendar and `contests` contests."""
+    rng = random.Random(index)
+    today = datetime(2026, 10, 16)
+    calendar = {
+        (today - timedelta(days=day)).strftime("%Y-%m-%d"): rng.randint(0, 12)
+        for day in range(366)
+    }
+    history = [
+        {
+            "name": f"Weekly Contest {400 + n}",
+            "rating": 1400 + rng.randint(-50, 300),
+            "ranking": rng.randint(1, 30000),
+            "problemsSolved": rng.randint(0, 4),
+            "startTime": 1700000000 + n * 604800,
+        }
+        for n in range(contests)
+    ]
+    return {
+        "institutionId": f"bench-{index % INSTITUTIONS}",
+        "platform": PLATFORMS[index % len(PLATFORMS)],
+        "username": f"user{index}",
+        "lastUpdated": today,
+        "scrapingStatus": "success",
+        "recentActivity": sum(list(calendar.values())[-30:]),
+        "payloadHash": f"{rng.getrandbits(256):064x}",
+        "rating": history[-1]["rating"],
+        "problems_solved": rng.randint(50, 2000),
+        "calendar": calendar,
+        "participated_contests": history,
+    }
+
+
+def encoded_size(data: Dict[str, Any]) -> int:
+    """Bytes of the Document message Firestore sends for `data`."""
+    message = document.Document(fields=_helpers.encode_dict(data))
+    return len(document.Document.serialize(message))
+
+
+def report_sizes(docs: int, sample: int = 200) -> None:
+    sample_docs = [synthetic_document(i) for i in range(min(docs, sample))]
+    full = sum(encoded_size(doc) for doc in sample_docs) / len(sample_docs)
+    projected = sum(
+        encoded_size({field: doc[field] for field in TASK_FIELDS if field in doc})
+        for doc in sample_docs
+    ) / len(sample_docs)
+
+    print(f"Encoded document size (mean of {len(sample_docs)}):")
+    print(f"  full:      {full / 1024:8.1f} KiB")
+    print(f"  projected: {projected / 1024:8.1f} KiB  ({full / projected:.0f}x smaller)")
+    print(f"Per sweep of {docs} documents:")
+    print(f"  full:      {full * docs / 1024 / 1024:8.1f} MiB")
+    print(f"  projected: {projected * docs / 1024 / 1024:8.1f} MiB")
+
+
+def seed(db, docs: int, batch_size: int = 200) -> None:
+    batch = db.batch()
+    for index in range(docs):
+        data = synthetic_document(index)
+        ref = (
+            db.collection("institutions").document(data["institutionId"])
+            .collection("coding_stats").document(f"doc{index:07d}")
+        )
+        batch.set(ref, data)
+        if (index + 1) % batch_size == 0:
+            batch.commit()
+            batch = db.batch()
+    batch.commit()
+
+
+def timed_read(db, fields: Optional[List[str]], readers: int = 1, page_size: int = 300) -> Dict[str, float]:
+    """Page through the collection group the way iter_scraping_tasks does."""
+    start = time.perf_counter()
+    partitions = FirestoreBackend(db).iter_partitions(
+        partitions=readers, fields=fields, page_size=page_size
+    )
+    count = 0
+    for doc in read_concurrently(partitions):
+        doc.to_dict()
+        count += 1
+    return {"documents": count, "seconds": time.perf_counter() - start}
+
+
+def report_reads(docs: int, seed_documents: bool, rounds: int, readers: int) -> None:
+    if not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        raise SystemExit("--emulator needs FIRESTORE_EMULATOR_HOST (e.g. localhost:8080)")
+
+    db = gcloud_firestore.Client(project=os.environ.get("GCLOUD_PROJECT", "bench"))
+    if seed_documents:
+        print(f"Seeding {docs} documents...")
+        seed(db, docs)
+
+    shapes = [("full", None, 1), ("projected", TASK_FIELDS, 1)]
+    if readers > 1:
+        shapes.append((f"projected, {readers} readers", TASK_FIELDS, readers))
+    for label, fields, count in shapes:
+        runs = [timed_read(db, fields, count) for _ in range(rounds)]
+        best = min(run["seconds"] for run in runs)
+        print(f"  {label:<24} {runs[0]['documents']} documents, best of {rounds}: {best:.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=20000, help="Synthetic documents in the collection")
+    parser.add_argument("--emulator", action="store_true", help="Also time reads against the Firestore emulator")
+    parser.add_argument("--no-seed", action="store_true", help="Reuse documents seeded by an earlier run")
+    parser.add_argument("--rounds", type=int, default=3, help="Timed reads per query shape")
+    parser.add_argument("--readers", type=int, default=4, help="Partitions read concurrently in the last shape")
+    args = parser.parse_args()
+
+    report_sizes(args.docs)
+    if args.emulator:
+        print("Collection-group read time:")
+        report_reads(args.docs, not args.no_seed, args.rounds, args.readers)
+
+
+if __name__ == "__main__":
+    main()
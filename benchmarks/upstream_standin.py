@@ -0,0 +1,352 @@
+"""
+Local stand-in for the four upstreams, for offline load testing.
+
+Serves LeetCode GraphQL, the GitHub REST and GraphQL APIs, CodeChef profile
+pages and the GFG submissions API and profile pages from recorded fixtures,
+with configurable latency and fault injection:
+
+    # Record fixtures from the real upstreams (raw response archive format)
+    python benchmarks/upstream_standin.py record --fixtures ./fixtures \\
+        leetcode:alice github:bob codechef:carol gfg:dave
+
+    # Replay them on :8090 with 80 +- 40 ms latency, 1% 503s and 2% 429s
+    python benchmarks/upstream_standin.py serve --fixtures ./fixtures \\
+        --latency 80 --jitter 40 --error-rate 0.01 --throttle-rate 0.02
+
+serve prints the base URL environment variables that point the scrapers at
+it (LEETCODE_BASE_URL, GITHUB_API_URL, CODECHEF_BASE_URL, GFG_API_BASE_URL,
+GFG_BASE_URL); batch_throughput_benchmark.py --upstream sets them itself.
+
+Fixtures are a raw response archive (modules.raw_archive), so a production
+archive can be replayed as is. A user with a fixture gets their own
+response; any other username gets a random recorded response of the same
+kind, or a small synthetic one if none was recorded. GET /_stats returns
+request and injected fault counts.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Route prefix of each upstream on the stand-in, and the variable that
+# holds the upstream's base URL in the scraper modules
+BASE_URL_VARIABLES = {
+    "LEETCODE_BASE_URL": "/leetcode",
+    "GITHUB_API_URL": "/github",
+    "CODECHEF_BASE_URL": "/codechef",
+    "GFG_API_BASE_URL": "/gfg-api",
+    "GFG_BASE_URL": "/gfg",
+}
+
+
+def standin_env(base_url: str) -> Dict[str, str]:
+    """Environment variables pointing every scraper at a stand-in at `base_url`."""
+    base_url = base_url.rstrip("/")
+    return {name: base_url + prefix for name, prefix in BASE_URL_VARIABLES.items()}
+
+
+# ======================================================
+# FIXTURES
+# ======================================================
+
+def _synthetic_calendar_days(days: int = 365) -> List[Tuple[datetime, int]]:
+    rng = random.Random(0)
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return [(today - timedelta(days=day), rng.randint(0, 6)) for day in range(days)]
+
+
+def synthetic_fixtures() -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """Small valid response of every (platform, kind), used when none was recorded."""
+    days = _synthetic_calendar_days()
+    submission_calendar = {str(int((day - datetime(1970, 1, 1)).total_seconds())): count for day, count in days}
+
+    def json_response(body: Any) -> Dict[str, Any]:
+        return {"status": 200, "text": json.dumps(body), "content_type": "application/json"}
+
+    def html_response(body: str) -> Dict[str, Any]:
+        return {"status": 200, "text": body, "content_type": "text/html"}
+
+    return {
+        ("leetcode", "heatmap"): json_response({"data": {"matchedUser": {"userCalendar": {
+            "activeYears": [days[0][0].year], "streak": 3, "totalActiveDays": 200,
+            "submissionCalendar": json.dumps(submission_calendar),
+        }}}}),
+        ("leetcode", "recent"): json_response({"data": {"recentAcSubmissionList": []}}),
+        ("leetcode", "profile"): json_response({"data": {
+            "allQuestionsCount": [{"difficulty": "All", "count": 3300}],
+            "matchedUser": {
+                "username": "standin",
+                "profile": {"aboutMe": ""},
+                "submitStatsGlobal": {"acSubmissionNum": [
+                    {"difficulty": "All", "count": 412}, {"difficulty": "Easy", "count": 200},
+                    {"difficulty": "Medium", "count": 180}, {"difficulty": "Hard", "count": 32},
+                ]},
+                "badges": [],
+            },
+            "userContestRanking": {"attendedContestsCount": 20, "rating": 1650.5, "globalRanking": 90000,
+                                   "totalParticipants": 600000, "topPercentage": 15.0},
+            "userContestRankingHistory": [
+                {"attended": True, "rating": 1500 + n * 10, "ranking": 5000 + n,
+                 "contest": {"title": f"Weekly Contest {400 + n}", "startTime": 1700000000 + n * 604800}}
+                for n in range(20)
+            ],
+        }}),
+        ("github", "rest"): json_response({"login": "standin", "public_repos": 24}),
+        ("github", "graphql"): json_response({"data": {"user": {"contributionsCollection": {"contributionCalendar": {
+            "totalContributions": sum(count for _, count in days),
+            "weeks": [{"contributionDays": [
+                {"date": day.strftime("%Y-%m-%d"), "contributionCount": count} for day, count in days[i:i + 7]
+            ]} for i in range(0, len(days), 7)],
+        }}}}}),
+        ("codechef", "profile"): html_response(
+            "<html><body><div class='rating-header'>★★★</div>"
+            "<div class='rating-number'>1650</div>"
+            "<section class='rating-data-section problems-solved'><h3>Total Problems Solved: 120</h3></section>"
+            "</body></html>"
+        ),
+        ("gfg", "api"): json_response({"result": {
+            "Easy": {str(n): {} for n in range(60)},
+            "Medium": {str(n): {} for n in range(40)},
+            "Hard": {str(n): {} for n in range(5)},
+        }}),
+        ("gfg", "profile"): html_response(
+            "<html><body><h2 class='NewProfile_name__N_Nlw'>Stand In</h2>"
+            "<div class='ScoreContainer_value__7yy7h'>350</div></body></html>"
+        ),
+    }
+
+
+def iter_latest_records(root: str) -> Iterator[Dict[str, Any]]:
+    """Newest archived fetch record of every user in a raw response archive."""
+    from modules.raw_archive import RawArchive
+
+    archive = RawArchive(root)
+    for platform in sorted(os.listdir(root)) if os.path.isdir(root) else []:
+        platform_dir = os.path.join(root, platform)
+        for user in sorted(os.listdir(platform_dir)):
+            fetches = [
+                os.path.join(platform_dir, user, name)
+                for name in sorted(os.listdir(os.path.join(platform_dir, user)))
+                if name.endswith((".json.gz", ".json.zst"))
+            ]
+            if fetches:
+                yield archive.load(fetches[-1])
+
+
+class Fixtures:
+    """Recorded responses by (platform, kind) and username, loaded from a raw response archive."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.recorded: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+        self.synthetic = synthetic_fixtures()
+        if root:
+            self._load(root)
+
+    def _load(self, root: str) -> None:
+        for record in iter_latest_records(root):
+            for kind, response in record["responses"].items():
+                self.recorded.setdefault((record["platform"], kind), {})[record["username"].lower()] = response
+
+    def count(self) -> int:
+        return sum(len(users) for users in self.recorded.values())
+
+    def get(self, platform: str, kind: str, username: str) -> Dict[str, Any]:
+        users = self.recorded.get((platform, kind))
+        if users:
+            return users.get((username or "").lower()) or random.choice(list(users.values()))
+        return self.synthetic[(platform, kind)]
+
+
+# ======================================================
+# SERVER
+# ======================================================
+
+class FaultProfile:
+    """Latency and injected failures applied to every stand-in response."""
+
+    def __init__(self, latency: float = 0, jitter: float = 0, error_rate: float = 0,
+                 throttle_rate: float = 0, retry_after: float = 1,
+                 tail_rate: float = 0, tail_latency: float = 0):
+        self.latency = latency / 1000
+        self.jitter = jitter / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency / 1000
+
+    def delay(self) -> float:
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if self.tail_rate and random.random() < self.tail_rate:
+            delay += self.tail_latency
+        return max(0.0, delay)
+
+    def fault(self) -> Optional[int]:
+        roll = random.random()
+        if roll < self.error_rate:
+            return 503
+        if roll < self.error_rate + self.throttle_rate:
+            return 429
+        return None
+
+
+def create_app(fixtures: Fixtures, faults: FaultProfile):
+    """FastAPI app serving every upstream route under its BASE_URL_VARIABLES prefix."""
+    from fastapi import FastAPI, Request, Response
+
+    app = FastAPI(title="Upstream stand-in")
+    stats: Counter = Counter()
+    started = time.time()
+
+    async def respond(request: Request, platform: str, kind: str, username: str) -> Response:
+        stats[f"{platform}.{kind}"] += 1
+        await asyncio.sleep(faults.delay())
+
+        status = faults.fault()
+        if status == 429:
+            stats["injected_429"] += 1
+            return Response(status_code=429, headers={"Retry-After": f"{faults.retry_after:g}"})
+        if status is not None:
+            stats[f"injected_{status}"] += 1
+            return Response(status_code=status)
+
+        fixture = fixtures.get(platform, kind, username)
+        body = fixture["text"].encode("utf-8")
+        headers = {}
+        if (platform, kind) == ("github", "rest"):
+            # Lets the ETag cache (modules.etag_cache) be exercised
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            headers["ETag"] = etag
+            if request.headers.get("if-none-match") == etag:
+                stats["not_modified"] += 1
+                return Response(status_code=304, headers=headers)
+        media_type = fixture.get("content_type") or (
+            "text/html" if fixture["text"].lstrip().startswith("<") else "application/json"
+        )
+        return Response(content=body, status_code=fixture.get("status", 200), media_type=media_type, headers=headers)
+
+    @app.post("/leetcode/graphql")
+    async def leetcode_graphql(request: Request):
+        payload = await request.json()
+        query = payload.get("query", "")
+        if "userProfileCalendar" in query:
+            kind = "heatmap"
+        elif "recentAcSubmissionList" in query:
+            kind = "recent"
+        else:
+            kind = "profile"
+        return await respond(request, "leetcode", kind, payload.get("variables", {}).get("username", ""))
+
+    @app.get("/github/users/{username}")
+    async def github_rest(request: Request, username: str):
+        return await respond(request, "github", "rest", username)
+
+    @app.post("/github/graphql")
+    async def github_graphql(request: Request):
+        payload = await request.json()
+        return await respond(request, "github", "graphql", payload.get("variables", {}).get("login", ""))
+
+    @app.get("/codechef/users/{username}")
+    async def codechef_profile(request: Request, username: str):
+        return await respond(request, "codechef", "profile", username)
+
+    @app.post("/gfg-api/api/v1/user/problems/submissions/")
+    async def gfg_api(request: Request):
+        payload = await request.json()
+        return await respond(request, "gfg", "api", payload.get("handle", ""))
+
+    @app.get("/gfg/user/{username}/")
+    async def gfg_profile(request: Request, username: str):
+        return await respond(request, "gfg", "profile", username)
+
+    @app.get("/_stats")
+    def get_stats():
+        return {"uptime_seconds": round(time.time() - started, 1), "requests": dict(stats)}
+
+    return app
+
+
+# ======================================================
+# COMMANDS
+# ======================================================
+
+def record(fixtures_dir: str, targets: List[str]) -> None:
+    """Scrape each platform:username from the real upstream into the fixtures archive."""
+    os.environ["RAW_ARCHIVE_ENABLED"] = "true"
+    os.environ["RAW_ARCHIVE_DIR"] = fixtures_dir
+    os.environ["RAW_ARCHIVE_KEEP"] = "1"
+
+    from modules.codechef_module import get_codechef_profile
+    from modules.geeks_for_geeks_module import get_gfg_stats
+    from modules.github_module import get_github_profile
+    from modules.leetcode_module import get_leetcode_full_profile
+
+    scrapers = {
+        "leetcode": get_leetcode_full_profile,
+        "github": get_github_profile,
+        "codechef": get_codechef_profile,
+        "gfg": get_gfg_stats,
+    }
+    for target in targets:
+        platform, _, username = target.partition(":")
+        if platform not in scrapers or not username:
+            raise SystemExit(f"Expected platform:username with platform in {', '.join(scrapers)}, got '{target}'")
+        print(f"Recording {platform}:{username}...")
+        scrapers[platform](username)
+
+
+def serve(args: argparse.Namespace) -> None:
+    import uvicorn
+
+    fixtures = Fixtures(args.fixtures)
+    faults = FaultProfile(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after,
+        tail_rate=args.tail_rate, tail_latency=args.tail_latency
+    )
+    print(f"Replaying {fixtures.count()} recorded responses (synthetic ones for anything missing)")
+    print("Point the scrapers at the stand-in with:")
+    for name, value in standin_env(f"http://{args.host}:{args.port}").items():
+        print(f"  export {name}={value}")
+    uvicorn.run(create_app(fixtures, faults), host=args.host, port=args.port, log_level="warning")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="Record fixtures from the real upstreams")
+    record_parser.add_argument("--fixtures", required=True, help="Fixture (raw archive) directory")
+    record_parser.add_argument("targets", nargs="+", help="platform:username to record")
+
+    serve_parser = commands.add_parser("serve", help="Replay fixtures")
+    serve_parser.add_argument("--fixtures", help="Fixture (raw archive) directory; synthetic responses if omitted")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8090)
+    serve_parser.add_argument("--latency", type=float, default=50, help="Mean response latency (ms)")
+    serve_parser.add_argument("--jitter", type=float, default=0, help="Uniform +- latency jitter (ms)")
+    serve_parser.add_argument("--tail-rate", type=float, default=0, help="Fraction of responses given --tail-latency extra")
+    serve_parser.add_argument("--tail-latency", type=float, default=0, help="Extra latency of tail responses (ms)")
+    serve_parser.add_argument("--error-rate", type=float, default=0, help="Fraction of responses replaced by 503")
+    serve_parser.add_argument("--throttle-rate", type=float, default=0, help="Fraction of responses replaced by 429")
+    serve_parser.add_argument("--retry-after", type=float, default=1, help="Retry-After of injected 429s (s)")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record(args.fixtures, args.targets)
+    else:
+        serve(args)
+
+
+if __name__ == "__main__":
+    main()
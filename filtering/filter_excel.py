@@ -1,14 +1,19 @@
 """Say whether the given excel social links are valid or not"""
 
 import pandas as pd
-import requests
+import httpx
 import re
-import time
-import random
 from urllib.parse import urlparse
 import concurrent.futures
 from threading import Lock
 import threading
+import os
+import sys
+
+# Share the scraper's adaptive per-platform concurrency control and HTTP clients
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.adaptive_concurrency import adaptive_request
+from modules.http_client import get_client
 
 # Global counter for thread-safe operations
 print_lock = Lock()
@@ -72,7 +77,7 @@ def extract_username_from_url_or_text(platform, raw_input):
     
     return "NA"
 
-def validate_profile_url(platform, username, timeout=15, max_retries=3):
+def validate_profile_url(platform, username, timeout=15):
     """Validate if a profile exists by checking the URL with improved rate limiting"""
     if not username or username == "NA":
         return False, "NA - No username provided"
@@ -93,58 +98,35 @@ def validate_profile_url(platform, username, timeout=15, max_retries=3):
     if platform == "leetcode":
         return validate_leetcode_username(username)
     
-    # Retry logic for handling rate limits
-    for attempt in range(max_retries):
-        try:
-            # Add exponential backoff delay
-            if attempt > 0:
-                delay = (2 ** attempt) + random.uniform(0.5, 2.0)
-                time.sleep(delay)
-            
-            # Add headers to mimic a browser request
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,/;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Cache-Control': 'no-cache',
-                'Pragma': 'no-cache'
-            }
-            
-            response = requests.get(url, timeout=timeout, allow_redirects=True, headers=headers)
-            
-            if response.status_code == 200:
-                return True, "Valid"
-            elif response.status_code == 404:
-                return False, "Profile not found"
-            elif response.status_code == 403:
-                return True, "Valid (format checked - blocked by anti-bot)"
-            elif response.status_code == 429:
-                # Rate limited - continue to retry
-                if attempt < max_retries - 1:
-                    delay = (2 ** attempt) * 2 + random.uniform(1, 3)
-                    print(f"    Rate limited for {platform}:{username}, retrying in {delay:.1f}s...")
-                    time.sleep(delay)
-                    continue
-                else:
-                    # If all retries exhausted, assume valid for rate limit cases
-                    return True, f"Valid (rate limited - assuming good format)"
-            else:
-                return False, f"HTTP {response.status_code}"
-                
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                print(f"    Timeout for {platform}:{username}, retrying...")
-                continue
-            return False, "Timeout after retries"
-        except requests.exceptions.RequestException as e:
-            if attempt < max_retries - 1:
-                print(f"    Request error for {platform}:{username}, retrying...")
-                continue
-            return False, f"Error: {str(e)}"
+    # Add headers to mimic a browser request
+    headers = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,/;q=0.8',
+        'Accept-Language': 'en-US,en;q=0.5',
+        'Accept-Encoding': 'gzip, deflate',
+        'Cache-Control': 'no-cache',
+        'Pragma': 'no-cache'
+    }
+    
+    # Retries with backoff and Retry-After are handled by adaptive_request
+    try:
+        response = adaptive_request(platform, get_client(platform).get, url, timeout=timeout, headers=headers)
+    except httpx.TimeoutException:
+        return False, "Timeout after retries"
+    except httpx.HTTPError as e:
+        return False, f"Error: {str(e)}"
     
-    return False, "Failed after all retries"
+    if response.status_code == 200:
+        return True, "Valid"
+    elif response.status_code == 404:
+        return False, "Profile not found"
+    elif response.status_code == 403:
+        return True, "Valid (format checked - blocked by anti-bot)"
+    elif response.status_code == 429:
+        # Still rate limited after the retries, assume valid
+        return True, f"Valid (rate limited - assuming good format)"
+    else:
+        return False, f"HTTP {response.status_code}"
 
 def validate_leetcode_username(username):
     """Special validation for LeetCode usernames with basic format checking"""
@@ -213,9 +195,6 @@ def process_single_profile(row_data, platforms):
     invalid_platforms = []
     valid_count = 0
     
-    # Add a small random delay to avoid overwhelming servers
-    time.sleep(random.uniform(0.5, 1.5))
-    
     for platform in platforms:
         column_name = platform
         raw_value = normalize_na_values(row_data.get(column_name, "NA"))
@@ -306,7 +285,8 @@ def main():
         # Prepare for threaded processing
         results_dict = {}
         results_lock = threading.Lock()
-        max_workers = 5  # Reduced to avoid rate limiting
+        # Ceiling only: per-platform AIMD limits back off on 429s
+        max_workers = int(os.environ.get("FILTER_MAX_WORKERS", 16))
         
         # Create thread pool and submit tasks
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
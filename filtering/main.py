@@ -1,14 +1,19 @@
 import pandas as pd
-import requests
+import httpx
 import re
-import time
-import random
 from urllib.parse import urlparse
 import concurrent.futures
 from threading import Lock
 import threading
 import string
 import os
+import sys
+
+# Share the scraper's adaptive per-platform concurrency control and HTTP clients
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.adaptive_concurrency import adaptive_request
+from modules.http_client import get_client
+
 # GitHub Access Token (set your own token here)
 GITHUB_TOKEN =  os.environ.get("GITHUB_TOKEN", "").strip()
 
@@ -40,7 +45,7 @@ def extract_username_from_url_or_text(platform, raw_input):
             return match.group(1).strip()
     return raw_input.strip() if not any(x in raw_input for x in ['http', '/', '.com', '.org']) else "NA"
 
-def validate_profile_url(platform, username, timeout=15, max_retries=3):
+def validate_profile_url(platform, username, timeout=15):
     if not username or username == "NA":
         return False, "NA - No username provided"
     if platform == "leetcode":
@@ -58,34 +63,26 @@ def validate_profile_url(platform, username, timeout=15, max_retries=3):
     if not url:
         return False, "Invalid platform"
 
-    for attempt in range(max_retries):
-        try:
-            if attempt > 0:
-                time.sleep((2 ** attempt) + random.uniform(0.5, 2.0))
-
-            headers = {
-                'User-Agent': 'Mozilla/5.0',
-                'Accept': 'text/html',
-                'Connection': 'keep-alive'
-            }
+    headers = {
+        'User-Agent': 'Mozilla/5.0',
+        'Accept': 'text/html',
+    }
 
-            response = requests.get(url, timeout=timeout, headers=headers)
-            if response.status_code == 200:
-                return True, "Valid"
-            elif response.status_code == 404:
-                return False, "Profile not found"
-            elif response.status_code == 403:
-                return True, "Valid (403 - bot protection)"
-            elif response.status_code == 429:
-                time.sleep((2 ** attempt) + 1)
-                continue
-            else:
-                return False, f"HTTP {response.status_code}"
-        except requests.exceptions.RequestException as e:
-            if attempt < max_retries - 1:
-                continue
-            return False, f"Error: {e}"
-    return False, "Retries exhausted"
+    # Retries, Retry-After and backoff are handled by adaptive_request
+    try:
+        response = adaptive_request(platform, get_client(platform).get, url, timeout=timeout, headers=headers)
+    except httpx.HTTPError as e:
+        return False, f"Error: {e}"
+    if response.status_code == 200:
+        return True, "Valid"
+    elif response.status_code == 404:
+        return False, "Profile not found"
+    elif response.status_code == 403:
+        return True, "Valid (403 - bot protection)"
+    elif response.status_code == 429:
+        return False, "Rate limited"
+    else:
+        return False, f"HTTP {response.status_code}"
 
 def validate_leetcode_username(username):
     if not username or username == "NA":
@@ -105,7 +102,7 @@ def validate_github(username):
         "User-Agent": "GitHub-Username-Checker"
     }
     try:
-        response = requests.get(url, headers=headers)
+        response = adaptive_request("github", get_client("github").get, url, headers=headers)
         if response.status_code == 200:
             return True, "Valid"
         elif response.status_code == 404:
@@ -120,7 +117,7 @@ def validate_github(username):
 def validate_codechef(username):
     url = f"https://www.codechef.com/users/{username}"
     try:
-        response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
+        response = adaptive_request("codechef", get_client("codechef").get, url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
         if response.status_code == 200:
             if "404 - Page Not Found" in response.text or "User not found" in response.text:
                 return False, "Profile not found"
@@ -167,8 +164,6 @@ def process_single_profile(row_data, platforms):
     invalid_platforms = []
     valid_count = 0
 
-    time.sleep(random.uniform(0.5, 1.0))
-
     for platform in platforms:
         raw_value = normalize_na_values(row_data.get(platform, "NA"))
         if raw_value == "NA":
@@ -225,7 +220,8 @@ def main():
         platforms = ['leetcode', 'codechef', 'geeksforgeeks', 'github']
         results_dict = {}
         results_lock = threading.Lock()
-        max_workers = 5
+        # Ceiling only: per-platform AIMD limits back off on 429s
+        max_workers = int(os.environ.get("FILTER_MAX_WORKERS", 16))
 
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             future_to_idx = {
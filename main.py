@@ -1,21 +1,41 @@
-from fastapi import FastAPI, Query, Header, HTTPException
+from fastapi import FastAPI, Query, Header, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from modules.codechef_module import get_codechef_profile
-from modules.geeks_for_geeks_module import get_gfg_stats
-from modules.github_module import get_github_profile
-from modules.leetcode_module import get_leetcode_full_profile
+from modules import codechef_module, geeks_for_geeks_module, github_module, leetcode_module
+from modules.codechef_module import get_codechef_profile, get_codechef_profile_async
+from modules.geeks_for_geeks_module import get_gfg_stats, get_gfg_stats_async
+from modules.github_module import get_github_profile, get_github_profile_async
+from modules.leetcode_module import get_leetcode_full_profile, get_leetcode_full_profile_async
+from modules.raw_archive import get_raw_archive
+from modules.http_client import AsyncClientPool, get_client_pool
+from modules.calendar_codec import encode_calendar
+from utils.rate_limiter import get_rate_limiter
+from utils.adaptive_concurrency import get_adaptive_concurrency
+from utils.lanes import LaneScheduler
+from utils.async_engine import AsyncBatchEngine
+from utils.jobs import Job, JobManager
+from utils.task_stream import BoundedTaskStream, read_concurrently
+from utils.sharding import LeaseManager, default_sweep_id, shard_for
+from utils.staleness import DEFAULT_FRESHNESS_TTL_HOURS, StalenessScheduler, recent_activity
+from utils.run_journal import JournalRun, get_run_journal
+from utils.dedupe import duplicates_of, promote_duplicate
+from utils.write_stage import BATCH_WRITES, WRITE_BEHIND, FirestoreWriteStage, WriteBehindQueue
+from utils.delta import DELTA_UPDATES, delta_update
+from utils.storage import STORAGE_BACKEND, open_storage
+from utils.response_cache import cached_profile
 import os
+import asyncio
+import functools
 import uvicorn
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import threading
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
 import firebase_admin
 from firebase_admin import credentials, firestore
 from firebase_admin.firestore import DELETE_FIELD
 import json
-import time
 
 load_dotenv()
 
@@ -52,11 +72,43 @@ except ValueError:
 except Exception as e:
     logger.warning(f"⚠️ Error initializing Firebase: {str(e)}")
 
+# Document storage for the batch path: Firestore, or a local SQLite/in-memory
+# store for offline benchmarks (STORAGE_BACKEND, see utils.storage)
+storage = open_storage(STORAGE_BACKEND, db)
+
 # Load secret key for API security
 SCRAPING_SECRET_KEY = os.environ.get("SCRAPING_SECRET_KEY", "")
 if not SCRAPING_SECRET_KEY:
     logger.warning("⚠️ SCRAPING_SECRET_KEY not set. Set it in .env for production security.")
 
+# Default batch engine for /scrape-coding-stats: "threads" or "async"
+BATCH_ENGINE = os.environ.get("BATCH_ENGINE", "threads").strip().lower()
+
+# Background executor for batch scraping jobs (one sweep at a time by default)
+job_manager = JobManager(
+    max_workers=int(os.environ.get("JOB_MAX_CONCURRENT", 1)),
+    max_history=int(os.environ.get("JOB_HISTORY_SIZE", 50))
+)
+BATCH_JOB_KIND = "scrape-coding-stats"
+
+# Claim a Firestore lease per document even outside shard mode
+SCRAPE_LEASES = os.environ.get("SCRAPE_LEASES", "false").strip().lower() == "true"
+
+# Firestore page size and producer queue bound for streaming task creation
+TASK_PAGE_SIZE = int(os.environ.get("TASK_PAGE_SIZE", 300))
+TASK_QUEUE_SIZE = int(os.environ.get("TASK_QUEUE_SIZE", 500))
+
+# Partitions of coding_stats read by parallel cursors during task creation
+TASK_READERS = int(os.environ.get("TASK_READERS", 4))
+
+# Read only TASK_FIELDS when creating tasks instead of whole documents
+TASK_PROJECTION = os.environ.get("TASK_PROJECTION", "true").strip().lower() == "true"
+
+# Stored calendar format: "map" (day -> count, what dashboards read) or
+# "packed" (modules.calendar_codec). Only opt into "packed" once every reader
+# of coding_stats decodes it with decode_calendar()
+CALENDAR_ENCODING = os.environ.get("CALENDAR_ENCODING", "map").strip().lower()
+
 app = FastAPI()
 
 # Enable CORS
@@ -104,32 +156,90 @@ def home():
 # FIRESTORE BATCH SCRAPING ENDPOINT
 # ============================================================================
 
+def iter_scraping_tasks(
+    page_size: Optional[int] = None,
+    shard: Optional[int] = None,
+    shards: Optional[int] = None,
+    readers: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream scraping tasks from all coding_stats documents across all institutions.
+    Reads the coding_stats collection group from the storage backend
+    (utils.storage) one page at a time per cursor, so no cursor stays open
+    for the whole batch and only a few pages of DocumentSnapshots are held
+    in memory at once.
+    
+    The collection group is split into `readers` partitions (Firestore
+    partition queries) that are paged through concurrently, so task creation
+    time scales with the reader count rather than the document count. Tasks
+    from different partitions interleave; the scheduler reorders them anyway.
+    
+    Only TASK_FIELDS are fetched (a select() projection), so the stored
+    calendars and contest histories never leave Firestore; recent activity
+    comes from the recentActivity field written with each scrape.
+    
+    In shard mode only documents whose docId hashes to `shard` (see
+    utils.sharding.shard_for) are yielded.
+    
+    Args:
+        page_size: Documents per Firestore query page (default: TASK_PAGE_SIZE)
+        shard: Shard number to keep, in [0, shards)
+        shards: Total number of shards (None or 1 disables sharding)
+        readers: Partitions read concurrently (default: TASK_READERS)
+        
+    Yields:
+        Task dictionaries containing: institutionId, docId, platform, username,
+        firestoreRef, plus the scheduling signals lastUpdated, scrapingStatus
+        and recentActivity (calendar activity over the last 30 days), and the
+        stored payloadHash
+    """
+    if storage is None:
+        raise RuntimeError("Firestore database not initialized. Cannot create scraping tasks.")
+    
+    fields = TASK_FIELDS if TASK_PROJECTION else None
+    readers = readers or TASK_READERS
+    produced = 0
+    
+    partitions = storage.iter_partitions(
+        partitions=readers, fields=fields, page_size=page_size or TASK_PAGE_SIZE
+    )
+    if len(partitions) > 1:
+        logger.info(f"Reading coding_stats in {len(partitions)} partitions concurrently")
+    
+    for doc in read_concurrently(partitions, maxsize=TASK_QUEUE_SIZE, name="task-reader"):
+        if shards and shards > 1 and shard_for(doc.id, shards) != shard:
+            continue
+        produced += 1
+        data = doc.to_dict() or {}
+        activity = data.get(RECENT_ACTIVITY_FIELD)
+        if activity is None:
+            # Not scraped since the field was introduced (or projection off)
+            activity = recent_activity(data.get("calendar"))
+        yield {
+            "institutionId": data.get("institutionId"),
+            "docId": doc.id,
+            "platform": data.get("platform"),
+            "username": data.get("username"),
+            "firestoreRef": doc.reference,
+            "lastUpdated": data.get("lastUpdated"),
+            "scrapingStatus": data.get("scrapingStatus"),
+            "recentActivity": activity,
+            "payloadHash": data.get(PAYLOAD_HASH_FIELD)
+        }
+    
+    logger.info(f"Streamed {produced} scraping tasks from {storage.name}")
+
 def create_scraping_tasks() -> List[Dict[str, Any]]:
     """
     Create scraping tasks from all coding_stats documents across all institutions.
-    Uses Firestore collectionGroup query to fetch all documents efficiently.
+    Materializes iter_scraping_tasks() into a list; the batch endpoint streams
+    instead (see stream_scraping_tasks).
     
     Returns:
         List of task dictionaries containing: institutionId, docId, platform, username
     """
-    if db is None:
-        raise RuntimeError("Firestore database not initialized. Cannot create scraping tasks.")
-    
-    tasks = []
     try:
-        # Use collectionGroup query to fetch all coding_stats across all institutions
-        docs = db.collection_group("coding_stats").stream()
-        
-        for doc in docs:
-            task = {
-                "institutionId": doc.get("institutionId"),
-                "docId": doc.id,
-                "platform": doc.get("platform"),
-                "username": doc.get("username"),
-                "firestoreRef": doc.reference
-            }
-            tasks.append(task)
-        
+        tasks = list(iter_scraping_tasks())
         logger.info(f"Created {len(tasks)} scraping tasks from Firestore")
         return tasks
     
@@ -137,6 +247,36 @@ def create_scraping_tasks() -> List[Dict[str, Any]]:
         logger.error(f"Error creating scraping tasks: {str(e)}")
         raise
 
+def stream_scraping_tasks(
+    job: Optional[Job] = None,
+    shard: Optional[int] = None,
+    shards: Optional[int] = None
+) -> BoundedTaskStream:
+    """
+    Producer side of the batch pipeline: read tasks from Firestore in a
+    background thread into a bounded queue that the workers drain.
+    Scraping starts on the first document and memory stays flat regardless
+    of how many documents exist.
+    
+    Args:
+        job: Background job whose discovered total is updated as tasks arrive
+            and marked final once the collection has been read to the end
+        shard: Shard number to keep (shard mode only)
+        shards: Total number of shards (None disables sharding)
+        
+    Returns:
+        BoundedTaskStream to iterate (use as a context manager to stop the producer)
+    """
+    on_item = (lambda task: job.add_total()) if job is not None else None
+    # A final total lets /jobs/{job_id} report an ETA while the run is still going
+    on_exhausted = job.finalize_total if job is not None else None
+    return BoundedTaskStream(
+        iter_scraping_tasks(shard=shard, shards=shards),
+        maxsize=TASK_QUEUE_SIZE,
+        on_item=on_item,
+        on_exhausted=on_exhausted
+    )
+
 
 def flatten_codechef_data(scraper_output: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -250,7 +390,8 @@ def prepare_firestore_update(
 ) -> Dict[str, Any]:
     """
     Transform scraper output into Firestore document update format.
-    Flattens all platform data and preserves metadata fields.
+    Flattens all platform data and preserves metadata fields. The calendar
+    is packed (modules.calendar_codec) only if CALENDAR_ENCODING is "packed".
     
     Args:
         platform: Platform name ("leetcode", "github", "codechef", "gfg")
@@ -282,215 +423,1065 @@ def prepare_firestore_update(
     else:
         raise ValueError(f"Unknown platform: {platform}")
     
+    if CALENDAR_ENCODING == "packed" and "calendar" in update_data:
+        update_data["calendar"] = encode_calendar(update_data["calendar"])
+    
     return update_data
 
-def scrape_worker(task: Dict[str, Any]) -> Dict[str, Any]:
+# Document field holding the content hash of the last stored scrape payload
+PAYLOAD_HASH_FIELD = "payloadHash"
+
+# Document field holding recent_activity() of the stored calendar, so task
+# creation can rank documents without reading the calendar itself
+RECENT_ACTIVITY_FIELD = "recentActivity"
+
+# Bookkeeping fields excluded from the payload hash
+PAYLOAD_META_FIELDS = ("lastUpdated", "scrapingStatus", RECENT_ACTIVITY_FIELD)
+
+# Fields projected by iter_scraping_tasks
+TASK_FIELDS = [
+    "institutionId",
+    "platform",
+    "username",
+    "lastUpdated",
+    "scrapingStatus",
+    RECENT_ACTIVITY_FIELD,
+    PAYLOAD_HASH_FIELD
+]
+
+def payload_hash(update_data: Dict[str, Any]) -> str:
     """
-    Worker function to scrape data for a single platform and update Firestore.
-    Calls the appropriate scraper based on platform type.
+    Stable content hash of a platform payload as built by prepare_firestore_update.
+    Keys are sorted so dict ordering never changes the hash, and bookkeeping
+    fields such as lastUpdated are left out.
     
     Args:
-        task: Dictionary with institutionId, docId, platform, username, firestoreRef
+        update_data: Flattened Firestore update for one document
         
     Returns:
-        Dictionary with task status and results
+        Hex SHA-256 digest of the payload
     """
-    platform = task.get("platform")
-    username = task.get("username")
-    institution_id = task.get("institutionId")
-    firestore_ref = task.get("firestoreRef")
+    content = {key: value for key, value in update_data.items() if key not in PAYLOAD_META_FIELDS}
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+class BatchContext:
+    """
+    Per-run collaborators shared by the batch workers.
+    
+    Attributes:
+        leases: LeaseManager that claims each document before it is scraped,
+            or None when leases are disabled
+        journal: Run journal recording finished tasks for resume, or None
+        writer: Write stage buffering document writes into bulk commits, or
+            None to write each document inline
+        write_behind: Queue whose writer threads persist handed-off scrape
+            results, or None to persist on the scrape worker
+        on_result: Receives results whose write completed in the write stage
+            or write-behind queue (the worker's own return value is then only
+            a pending placeholder)
+    """
+    
+    def __init__(
+        self,
+        leases: Optional[LeaseManager] = None,
+        journal: Optional[JournalRun] = None,
+        writer: Optional[FirestoreWriteStage] = None,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        write_behind: Optional[WriteBehindQueue] = None
+    ):
+        self.leases = leases
+        self.journal = journal
+        self.writer = writer
+        self.write_behind = write_behind
+        self.on_result = on_result
+    
+    def write(
+        self,
+        task: Dict[str, Any],
+        data: Dict[str, Any],
+        on_done: Callable[[Optional[Exception]], None],
+        field_paths: bool = False
+    ) -> None:
+        """
+        Merge `data` into the task's document.
+        With a write stage the write is buffered and on_done(error) is called
+        once it commits; otherwise it is written inline and on_done has run
+        by the time this returns.
+        
+        With field_paths=True, `data` is keyed by Firestore field paths (see
+        utils.delta) and applied with update() instead of set(merge=True).
+        """
+        firestore_ref = task.get("firestoreRef")
+        if self.writer is not None:
+            if field_paths:
+                self.writer.update(firestore_ref, data, on_done)
+            else:
+                self.writer.set(firestore_ref, data, on_done)
+            return
+        
+        try:
+            if field_paths:
+                firestore_ref.update(data)
+            else:
+                # Use set() with merge=True to preserve existing metadata fields
+                firestore_ref.set(data, merge=True)
+        except Exception as e:
+            on_done(e)
+            return
+        on_done(None)
+    
+    def pending(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Worker return value for a result whose write may still be buffered."""
+        if self.writer is not None:
+            return {**result, "pending": True}
+        return result
+    
+    def report(self, result: Dict[str, Any]) -> None:
+        """Report a result once its buffered write has completed."""
+        if self.writer is not None and self.on_result is not None:
+            self.on_result(result)
+    
+    def hand_off(
+        self,
+        record: Callable[[Dict[str, Any], Any, "BatchContext"], Dict[str, Any]],
+        task: Dict[str, Any],
+        outcome: Any
+    ) -> Dict[str, Any]:
+        """
+        Persist a scrape outcome with `record` (record_group_success or
+        record_group_failure). With a write-behind queue this only queues the
+        work, blocking while the queue is full, and returns a pending
+        placeholder; the results are reported through on_result.
+        
+        Args:
+            record: Writes the outcome to the task's documents
+            task: Scraping task the outcome belongs to
+            outcome: Scraped data or the scrape error
+            
+        Returns:
+            The recorded result, or a pending placeholder
+        """
+        if self.write_behind is None:
+            return record(task, outcome, self)
+        
+        def persist() -> None:
+            try:
+                result = record(task, outcome, self)
+            except Exception as e:
+                result = record_group_failure(task, e, self)
+            # Buffered writes among them report themselves once committed
+            if self.on_result is not None:
+                self.on_result(result)
+        
+        self.write_behind.submit(persist)
+        return {**_new_task_result(task), "pending": True}
+    
+    def flush(self) -> None:
+        """Wait for all handed-off results and buffered writes of this run to complete."""
+        if self.write_behind is not None:
+            self.write_behind.close()
+        if self.writer is not None:
+            self.writer.close()
     
-    result = {
-        "institutionId": institution_id,
+    def mark_done(self, task: Dict[str, Any], outcome: str) -> None:
+        """Checkpoint a finished task in the run journal, if any."""
+        if self.journal is not None:
+            self.journal.mark_done(task, outcome)
+    
+    def completion_fields(self) -> Dict[str, Any]:
+        """Extra fields merged into every final document write of this run."""
+        if self.leases is not None:
+            return self.leases.completion_fields()
+        return {}
+
+def build_delta_update(task: Dict[str, Any], update_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Reduce a changed document's update to the fields that differ from the
+    stored snapshot (see utils.delta).
+    Only documents that already hold a scraped payload are diffed; the
+    stored snapshot costs one document read.
+    
+    Args:
+        task: Scraping task whose document is being updated
+        update_data: Full update as it would be merged with set()
+        
+    Returns:
+        Field-path keyed update, or None to write update_data in full
+    """
+    if not DELTA_UPDATES or not task.get("payloadHash"):
+        return None
+    
+    try:
+        snapshot = task.get("firestoreRef").get()
+    except Exception as e:
+        logger.warning(f"Could not read previous snapshot for delta update: {str(e)}")
+        return None
+    
+    if not snapshot.exists:
+        return None
+    return delta_update(snapshot.to_dict() or {}, update_data)
+
+def _new_task_result(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the default (failed) result dictionary for a task."""
+    return {
+        "institutionId": task.get("institutionId"),
         "docId": task.get("docId"),
-        "platform": platform,
-        "username": username,
+        "platform": task.get("platform"),
+        "username": task.get("username"),
         "success": False,
         "data": None,
         "error": None,
         "skipped": False
     }
+
+def record_scrape_success(
+    task: Dict[str, Any],
+    scraped_data: Dict[str, Any],
+    context: Optional[BatchContext] = None
+) -> Dict[str, Any]:
+    """
+    Write a successful scrape to the task's Firestore document.
+    Falls back to record_scrape_failure if the scraper output contains an
+    error or the write fails. With a write stage the write is buffered and
+    the final result is reported through the context once it commits.
+    
+    If the payload hashes the same as the one already stored on a
+    successfully scraped document, only lastUpdated (and recentActivity, if
+    it moved) is written; otherwise only the fields that differ from the
+    stored snapshot are sent.
+    
+    Args:
+        task: Scraping task the data belongs to
+        scraped_data: Raw output from the platform's scraper
+        context: Batch run context (leases etc.), if any
+        
+    Returns:
+        Dictionary with task status and results
+    """
+    platform = task.get("platform")
+    username = task.get("username")
+    institution_id = task.get("institutionId")
+    firestore_ref = task.get("firestoreRef")
+    context = context or BatchContext()
+    result = _new_task_result(task)
     
     try:
-        scraped_data = None
+        # Prepare update data with proper structure for this platform
+        update_data = prepare_firestore_update(platform, scraped_data, institution_id)
+        content_hash = payload_hash(update_data)
+        # The activity window slides even when the calendar does not change
+        activity = recent_activity(update_data.get("calendar"))
+        
+        delta = None
+        
+        if content_hash == task.get("payloadHash") and task.get("scrapingStatus") == "success":
+            # Unchanged since the last scrape: only refresh the timestamp
+            update_data = {"lastUpdated": update_data["lastUpdated"]}
+            if activity != task.get("recentActivity"):
+                update_data[RECENT_ACTIVITY_FIELD] = activity
+            result["unchanged"] = True
+            update_data.update(context.completion_fields())
+        else:
+            # Add successful status and remove any previous error field
+            update_data[PAYLOAD_HASH_FIELD] = content_hash
+            update_data[RECENT_ACTIVITY_FIELD] = activity
+            update_data["scrapingStatus"] = "success"
+            update_data["lastScrapingError"] = DELETE_FIELD
+            update_data.update(context.completion_fields())
+            # Send only the changed field paths (e.g. one new calendar day)
+            delta = build_delta_update(task, update_data)
+    
+    except Exception as e:
+        return record_scrape_failure(task, e, context)
+    
+    result["success"] = True
+    result["data"] = scraped_data
+    outcome = {"result": result}
+    
+    def on_written(error: Optional[Exception]) -> None:
+        if error is not None:
+            outcome["result"] = record_scrape_failure(task, error, context)
+            return
+        
+        context.mark_done(task, "successful")
+        logger.info(
+            f"✓ Platform: {platform} | Username: {username} | "
+            f"Institution: {institution_id} | Status: Success"
+        )
+        context.report(result)
+    
+    if delta is not None:
+        context.write(task, delta, on_written, field_paths=True)
+    else:
+        context.write(task, update_data, on_written)
+    
+    return context.pending(outcome["result"])
+
+def record_scrape_failure(
+    task: Dict[str, Any],
+    error: Exception,
+    context: Optional[BatchContext] = None
+) -> Dict[str, Any]:
+    """
+    Mark the task's Firestore document as failed with the error message.
+    
+    Args:
+        task: Scraping task that failed
+        error: Exception raised while scraping or storing
+        context: Batch run context (leases etc.), if any
+        
+    Returns:
+        Dictionary with task status and error
+    """
+    error_msg = str(error)
+    context = context or BatchContext()
+    result = _new_task_result(task)
+    result["error"] = error_msg
+    
+    def on_written(update_error: Optional[Exception]) -> None:
+        if update_error is not None:
+            logger.error(f"Failed to update error status in Firestore: {str(update_error)}")
+        context.mark_done(task, "failed")
+        context.report(result)
+    
+    # Update Firestore with error status (preserves metadata with merge=True)
+    error_update = {
+        "scrapingStatus": "failed",
+        "lastScrapingError": error_msg,
+        "lastUpdated": datetime.utcnow(),
+        **context.completion_fields()
+    }
+    context.write(task, error_update, on_written)
+    
+    logger.error(
+        f"✗ Platform: {task.get('platform')} | Username: {task.get('username')} | "
+        f"Institution: {task.get('institutionId')} | Error: {error_msg}"
+    )
+    
+    return context.pending(result)
+
+def record_scrape_skipped(task: Dict[str, Any], reason: str) -> Dict[str, Any]:
+    """
+    Build the result for a task that was not scraped (no Firestore write).
+    
+    Args:
+        task: Scraping task that was skipped
+        reason: Why the task was skipped
+        
+    Returns:
+        Dictionary with task status, marked skipped
+    """
+    result = _new_task_result(task)
+    result["skipped"] = True
+    result["error"] = reason
+    
+    logger.info(
+        f"↷ Platform: {task.get('platform')} | Username: {task.get('username')} | "
+        f"Institution: {task.get('institutionId')} | Skipped: {reason}"
+    )
+    
+    return result
+
+def claim_task(task: Dict[str, Any], context: BatchContext) -> Optional[str]:
+    """
+    Claim the task's document lease when leases are enabled.
+    
+    Args:
+        task: Scraping task about to be processed
+        context: Batch run context
+        
+    Returns:
+        None if the task may be scraped, otherwise the reason to skip it
+    """
+    if context.leases is None:
+        return None
+    try:
+        if context.leases.claim(task.get("firestoreRef")):
+            return None
+        return "Leased by another instance or already done this sweep"
+    except Exception as e:
+        return f"Lease claim failed: {str(e)}"
+
+def fan_out(
+    task: Dict[str, Any],
+    result: Dict[str, Any],
+    record: Callable[[Dict[str, Any]], Dict[str, Any]],
+    context: BatchContext
+) -> Dict[str, Any]:
+    """
+    Apply a task's outcome to the duplicate tasks collapsed into it
+    (same platform and username, see utils.dedupe).
+    Each duplicate document is claimed like any other task and written by
+    `record`; the duplicate results are attached under "duplicates".
+    
+    Args:
+        task: Leader task that was scraped
+        result: The leader's own result
+        record: Writes the outcome to one duplicate task's document
+        context: Batch run context
+        
+    Returns:
+        The leader's result
+    """
+    duplicates = duplicates_of(task)
+    if not duplicates:
+        return result
+    
+    duplicate_results = []
+    for duplicate in duplicates:
+        skip_reason = claim_task(duplicate, context)
+        if skip_reason:
+            duplicate_results.append(record_scrape_skipped(duplicate, skip_reason))
+        else:
+            duplicate_results.append(record(duplicate))
+    result["duplicates"] = duplicate_results
+    return result
+
+def record_group_success(
+    task: Dict[str, Any],
+    scraped_data: Dict[str, Any],
+    context: BatchContext
+) -> Dict[str, Any]:
+    """Write one scrape result to the task's document and all its duplicates."""
+    result = record_scrape_success(task, scraped_data, context)
+    return fan_out(
+        task,
+        result,
+        lambda duplicate: record_scrape_success(duplicate, scraped_data, context),
+        context
+    )
+
+def record_group_failure(
+    task: Dict[str, Any],
+    error: Exception,
+    context: BatchContext
+) -> Dict[str, Any]:
+    """Mark the task's document and all its duplicates as failed."""
+    result = record_scrape_failure(task, error, context)
+    return fan_out(
+        task,
+        result,
+        lambda duplicate: record_scrape_failure(duplicate, error, context),
+        context
+    )
+
+def scrape_worker(
+    task: Dict[str, Any],
+    timeout: Optional[float] = None,
+    context: Optional[BatchContext] = None
+) -> Dict[str, Any]:
+    """
+    Worker function to scrape data for a single platform and update Firestore.
+    Calls the appropriate scraper based on platform type, once per task
+    group: the result is also written to every duplicate collapsed into it.
+    
+    Args:
+        task: Dictionary with institutionId, docId, platform, username, firestoreRef
+        timeout: Per-request upstream timeout in seconds (scraper default if None)
+        context: Batch run context (leases etc.), if any
         
+    Returns:
+        Dictionary with task status and results
+    """
+    platform = task.get("platform")
+    username = task.get("username")
+    context = context or BatchContext()
+    
+    skip_reason = claim_task(task, context)
+    if skip_reason:
+        result = record_scrape_skipped(task, skip_reason)
+        # Another document of the group may still be ours to scrape
+        leader = promote_duplicate(task)
+        if leader is not None:
+            result["duplicates"] = [scrape_worker(leader, timeout, context)]
+        return result
+    
+    try:
         # Route to correct scraper function based on platform
         if platform == "leetcode":
-            scraped_data = get_leetcode_full_profile(username)
+            scraper = get_leetcode_full_profile
         elif platform == "github":
-            scraped_data = get_github_profile(username)
+            scraper = get_github_profile
         elif platform == "codechef":
-            scraped_data = get_codechef_profile(username)
+            scraper = get_codechef_profile
         elif platform == "gfg":
-            scraped_data = get_gfg_stats(username)
+            scraper = get_gfg_stats
         else:
             raise ValueError(f"Unknown platform: {platform}")
         
-        # Prepare update data with proper structure for this platform
-        update_data = prepare_firestore_update(platform, scraped_data, institution_id)
+        scraper_kwargs = {"timeout": timeout} if timeout is not None else {}
         
-        # Add successful status and remove any previous error field
-        update_data["scrapingStatus"] = "success"
-        update_data["lastScrapingError"] = DELETE_FIELD
+        # Wait for the platform's rate limiter first, then hold one of its
+        # adaptive concurrency slots around the upstream call only, so
+        # workers queued for a token don't occupy slots
+        get_rate_limiter().acquire(platform)
+        with get_adaptive_concurrency().slot(platform):
+            scraped_data = scraper(username, **scraper_kwargs)
+    
+    except Exception as e:
+        return context.hand_off(record_group_failure, task, e)
+    
+    # Persistence continues on the write-behind queue, if any
+    return context.hand_off(record_group_success, task, scraped_data)
+
+async def scrape_worker_async(
+    task: Dict[str, Any],
+    clients: AsyncClientPool,
+    timeout: Optional[float] = None,
+    context: Optional[BatchContext] = None
+) -> Dict[str, Any]:
+    """
+    Async counterpart of scrape_worker used by the asyncio batch engine.
+    Scrapes through the shared per-platform httpx.AsyncClient pool; the
+    blocking Firestore write runs in a worker thread.
+    
+    Args:
+        task: Dictionary with institutionId, docId, platform, username, firestoreRef
+        clients: Shared async client pool for this batch run
+        timeout: Per-request upstream timeout in seconds (scraper default if None)
+        context: Batch run context (leases etc.), if any
         
-        # Use set() with merge=True to preserve existing metadata fields
-        firestore_ref.set(update_data, merge=True)
+    Returns:
+        Dictionary with task status and results
+    """
+    platform = task.get("platform")
+    username = task.get("username")
+    context = context or BatchContext()
+    
+    skip_reason = await asyncio.to_thread(claim_task, task, context)
+    if skip_reason:
+        result = record_scrape_skipped(task, skip_reason)
+        # Another document of the group may still be ours to scrape
+        leader = promote_duplicate(task)
+        if leader is not None:
+            result["duplicates"] = [await scrape_worker_async(leader, clients, timeout, context)]
+        return result
+    
+    try:
+        scraper = ASYNC_SCRAPERS.get(platform)
+        if scraper is None:
+            raise ValueError(f"Unknown platform: {platform}")
         
-        result["success"] = True
-        result["data"] = scraped_data
+        scraper_kwargs = {"timeout": timeout} if timeout is not None else {}
+        client = await clients.get(platform)
         
-        logger.info(
-            f"✓ Platform: {platform} | Username: {username} | "
-            f"Institution: {institution_id} | Status: Success"
-        )
+        # Token first, then the concurrency slot around the upstream call only
+        await get_rate_limiter().acquire_async(platform)
+        async with get_adaptive_concurrency().slot_async(platform):
+            scraped_data = await scraper(client, username, **scraper_kwargs)
     
     except Exception as e:
-        error_msg = str(e)
-        result["error"] = error_msg
-        
-        # Update Firestore with error status (preserves metadata with merge=True)
-        try:
-            error_update = {
-                "scrapingStatus": "failed",
-                "lastScrapingError": error_msg,
-                "lastUpdated": datetime.utcnow()
-            }
-            firestore_ref.set(error_update, merge=True)
-        except Exception as update_error:
-            logger.error(f"Failed to update error status in Firestore: {str(update_error)}")
+        return await asyncio.to_thread(context.hand_off, record_group_failure, task, e)
+    
+    return await asyncio.to_thread(context.hand_off, record_group_success, task, scraped_data)
+
+ASYNC_SCRAPERS = {
+    "leetcode": get_leetcode_full_profile_async,
+    "github": get_github_profile_async,
+    "codechef": get_codechef_profile_async,
+    "gfg": get_gfg_stats_async,
+}
+
+# Rebuild a scraper's result from its archived raw responses (modules.raw_archive)
+ARCHIVE_PARSERS = {
+    "leetcode": leetcode_module.parse_archived_profile,
+    "github": github_module.parse_archived_profile,
+    "codechef": codechef_module.parse_archived_profile,
+    "gfg": geeks_for_geeks_module.parse_archived_profile,
+}
+
+def reparse_worker(
+    task: Dict[str, Any],
+    timeout: Optional[float] = None,
+    context: Optional[BatchContext] = None
+) -> Dict[str, Any]:
+    """
+    Counterpart of scrape_worker for the reparse engine: rebuilds the task's
+    payload from the newest archived fetch of its user instead of scraping,
+    so no request is sent. Tasks without an archived fetch, or whose archive
+    no longer parses, are skipped and their documents left untouched.
+    
+    Args:
+        task: Dictionary with institutionId, docId, platform, username, firestoreRef
+        timeout: Unused; accepted for the lane worker signature
+        context: Batch run context (leases etc.), if any
         
-        logger.error(
-            f"✗ Platform: {platform} | Username: {username} | "
-            f"Institution: {institution_id} | Error: {error_msg}"
+    Returns:
+        Dictionary with task status and results
+    """
+    platform = task.get("platform")
+    username = task.get("username")
+    context = context or BatchContext()
+    
+    skip_reason = claim_task(task, context)
+    if skip_reason:
+        result = record_scrape_skipped(task, skip_reason)
+        leader = promote_duplicate(task)
+        if leader is not None:
+            result["duplicates"] = [reparse_worker(leader, timeout, context)]
+        return result
+    
+    try:
+        parser = ARCHIVE_PARSERS.get(platform)
+        if parser is None:
+            raise ValueError(f"Unknown platform: {platform}")
+        archived = get_raw_archive().latest(platform, username)
+        if archived is None:
+            skip_reason = "No archived responses"
+        else:
+            scraped_data = parser(username, archived["responses"])
+    except Exception as e:
+        logger.error(f"Reparse of {platform}:{username} failed: {str(e)}")
+        skip_reason = f"Reparse failed: {str(e)}"
+    
+    if skip_reason:
+        return fan_out(
+            task,
+            record_scrape_skipped(task, skip_reason),
+            lambda duplicate: record_scrape_skipped(duplicate, skip_reason),
+            context
         )
     
-    return result
+    return context.hand_off(record_group_success, task, scraped_data)
+
+class BatchCounters:
+    """
+    Thread-safe success/failure/skip tallies for a batch run.
+    When a background Job is given, every outcome is also reported to it so
+    /jobs/{id} can show live progress.
+    """
+    
+    def __init__(self, job: Optional[Job] = None):
+        self.successful = 0
+        self.failed = 0
+        self.skipped = 0
+        # Successful scrapes whose payload matched the stored hash
+        self.unchanged = 0
+        self.job = job
+        self._lock = threading.Lock()
+    
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+        if self.job is not None:
+            self.job.record(outcome)
+    
+    def on_result(self, result: Dict[str, Any]) -> None:
+        # Results with a buffered write are counted when the write completes
+        if result.get("pending"):
+            pass
+        elif result.get("skipped"):
+            self._count("skipped")
+        elif result["success"]:
+            self._count("successful")
+            if result.get("unchanged"):
+                with self._lock:
+                    self.unchanged += 1
+        else:
+            self._count("failed")
+        
+        # Results fanned out to duplicate documents count individually
+        for duplicate_result in result.get("duplicates", []):
+            self.on_result(duplicate_result)
+    
+    def on_error(self, task: Dict[str, Any], error: Exception) -> None:
+        logger.error(f"Worker thread error: {str(error)}")
+        for _ in range(1 + len(duplicates_of(task))):
+            self._count("failed")
+    
+    @property
+    def total(self) -> int:
+        return self.successful + self.failed + self.skipped
+    
+    def summary(self, total_tasks: Optional[int] = None) -> Dict[str, Any]:
+        total_tasks = self.total if total_tasks is None else total_tasks
+        logger.info(
+            f"Batch scraping completed: {self.successful} successful "
+            f"({self.unchanged} unchanged), {self.failed} failed, "
+            f"{self.skipped} skipped out of {total_tasks} tasks"
+        )
+        return {
+            "total_tasks": total_tasks,
+            "successful": self.successful,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "timestamp": datetime.utcnow().isoformat()
+        }
 
 def process_scraping_tasks_concurrent(
-    tasks: List[Dict[str, Any]], 
-    max_workers: int = 5
+    tasks: Iterable[Dict[str, Any]], 
+    lane_config: Optional[Dict[str, Dict[str, float]]] = None,
+    counters: Optional[BatchCounters] = None,
+    context: Optional[BatchContext] = None
 ) -> Dict[str, Any]:
     """
-    Process scraping tasks concurrently using ThreadPoolExecutor.
-    Includes rate-limiting: sleep 1.5 minutes after every 5 completed tasks.
+    Process scraping tasks concurrently in per-platform worker lanes.
+    Each platform gets its own workers, queue and request timeout (see
+    utils.lanes), so slow upstreams cannot starve fast ones. Rate limiting is
+    handled per platform by the token buckets in utils.rate_limiter, which
+    each worker consults before scraping. How many of a lane's workers may
+    scrape at once is adapted to the upstream's 429s and latency by
+    utils.adaptive_concurrency.
     
     Args:
-        tasks: List of scraping tasks
-        max_workers: Maximum number of concurrent worker threads (default: 5)
+        tasks: Iterable of scraping tasks (a list or a streaming BoundedTaskStream)
+        lane_config: Optional per-platform lane settings overriding the defaults
+        counters: Optional BatchCounters to tally into (e.g. one reporting to a Job)
+        context: Batch run context passed to every worker (leases etc.)
         
     Returns:
         Dictionary with summary statistics and results
     """
-    results = []
-    successful = 0
-    failed = 0
-    skipped = 0
-    completed_count = 0  # Counter for rate-limiting
+    counters = counters or BatchCounters()
     
-    logger.info(f"Starting concurrent processing with {max_workers} workers for {len(tasks)} tasks")
+    logger.info("Starting platform-lane processing")
     
     try:
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {executor.submit(scrape_worker, task): task for task in tasks}
-            
-            for future in futures:
-                try:
-                    result = future.result()
-                    results.append(result)
-                    
-                    if result.get("skipped"):
-                        skipped += 1
-                    elif result["success"]:
-                        successful += 1
-                    else:
-                        failed += 1
-                    
-                    completed_count += 1
-                    
-                    # Rate-limiting: sleep after every 5 completed tasks
-                    if completed_count % 5 == 0:
-                        logger.info(f"Completed {completed_count} tasks. Pausing for 1.5 minutes to avoid rate limiting...")
-                        time.sleep(90)  # 1.5 minutes
-                        logger.info(f"Resuming after rate-limit pause. Continuing with remaining tasks...")
-                
-                except Exception as e:
-                    logger.error(f"Worker thread error: {str(e)}")
-                    failed += 1
-                    completed_count += 1
-                    
-                    # Rate-limiting: sleep after every 5 completed tasks (including failed ones)
-                    if completed_count % 5 == 0:
-                        logger.info(f"Completed {completed_count} tasks. Pausing for 1.5 minutes to avoid rate limiting...")
-                        time.sleep(90)  # 1.5 minutes
-                        logger.info(f"Resuming after rate-limit pause. Continuing with remaining tasks...")
+        worker = functools.partial(scrape_worker, context=context)
+        LaneScheduler(worker, lane_config).run(tasks, counters.on_result, counters.on_error)
+        if context is not None:
+            context.flush()
     
     except Exception as e:
         logger.error(f"Error during concurrent processing: {str(e)}")
         raise
     
-    # Summary
-    summary = {
-        "total_tasks": len(tasks),
-        "successful": successful,
-        "failed": failed,
-        "skipped": skipped,
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return counters.summary()
+
+def process_scraping_tasks_async(
+    tasks: Iterable[Dict[str, Any]],
+    lane_config: Optional[Dict[str, Dict[str, float]]] = None,
+    counters: Optional[BatchCounters] = None,
+    context: Optional[BatchContext] = None
+) -> Dict[str, Any]:
+    """
+    Process scraping tasks with the asyncio batch engine.
+    Drop-in replacement for process_scraping_tasks_concurrent that runs the
+    async scrapers as coroutines over shared httpx.AsyncClient pools. Must be
+    called from a thread without a running event loop.
+    
+    Args:
+        tasks: Iterable of scraping tasks (a list or a streaming BoundedTaskStream)
+        lane_config: Optional per-platform lane settings overriding the defaults
+        counters: Optional BatchCounters to tally into (e.g. one reporting to a Job)
+        context: Batch run context passed to every worker (leases etc.)
+        
+    Returns:
+        Dictionary with summary statistics and results
+    """
+    counters = counters or BatchCounters()
+    worker = functools.partial(scrape_worker_async, context=context)
+    engine = AsyncBatchEngine(worker, lane_config=lane_config)
+    
+    logger.info("Starting asyncio batch processing")
+    
+    try:
+        asyncio.run(engine.run(tasks, counters.on_result, counters.on_error))
+        if context is not None:
+            context.flush()
+    
+    except Exception as e:
+        logger.error(f"Error during async processing: {str(e)}")
+        raise
+    
+    return counters.summary()
+
+def process_archived_tasks(
+    tasks: Iterable[Dict[str, Any]],
+    lane_config: Optional[Dict[str, Dict[str, float]]] = None,
+    counters: Optional[BatchCounters] = None,
+    context: Optional[BatchContext] = None
+) -> Dict[str, Any]:
+    """
+    Rebuild every task's payload from the raw response archive.
+    Same lanes and write path as process_scraping_tasks_concurrent, but the
+    workers parse archived responses (reparse_worker) instead of scraping,
+    without rate limits or adaptive concurrency. Used to apply a parser fix
+    to stored data at CPU speed.
+    
+    Args:
+        tasks: Iterable of scraping tasks (a list or a streaming BoundedTaskStream)
+        lane_config: Optional per-platform lane settings overriding the defaults
+        counters: Optional BatchCounters to tally into (e.g. one reporting to a Job)
+        context: Batch run context passed to every worker (leases etc.)
+        
+    Returns:
+        Dictionary with summary statistics and results
+    """
+    counters = counters or BatchCounters()
+    
+    logger.info(f"Starting reparse from the raw response archive ({get_raw_archive().root})")
+    
+    try:
+        worker = functools.partial(reparse_worker, context=context)
+        LaneScheduler(worker, lane_config).run(tasks, counters.on_result, counters.on_error)
+        if context is not None:
+            context.flush()
+    
+    except Exception as e:
+        logger.error(f"Error during reparse processing: {str(e)}")
+        raise
+    
+    return counters.summary()
+
+BATCH_PROCESSORS = {
+    "threads": process_scraping_tasks_concurrent,
+    "async": process_scraping_tasks_async,
+    "reparse": process_archived_tasks,
+}
+
+# Contexts of batch runs in progress, flushed if the server shuts down mid-run
+_active_contexts = set()
+_active_contexts_lock = threading.Lock()
+
+@app.on_event("shutdown")
+def flush_active_batches():
+    """Persist every handed-off result and buffered write before the process exits."""
+    with _active_contexts_lock:
+        contexts = list(_active_contexts)
+    for context in contexts:
+        logger.info("Flushing pending writes of an unfinished batch run before shutdown")
+        context.flush()
+
+@app.on_event("shutdown")
+def close_http_clients():
+    """Close the pooled scraper connections."""
+    get_client_pool().close()
+
+def run_batch_scrape(options: Dict[str, Any], job: Optional[Job] = None) -> Dict[str, Any]:
+    """
+    Run one full batch scrape: stream tasks from Firestore and process them.
+    
+    Args:
+        options: Batch options as validated by the endpoint:
+            engine: Batch engine name, a key of BATCH_PROCESSORS
+            shard, shards: Shard of the collection to process (None = all)
+            lease: Claim a Firestore lease on each document before scraping
+            sweep: Lease sweep id (default: current ISO week)
+            ttl_hours: Skip documents successfully scraped within this many hours
+            run_id: Journal run id to resume (default: latest unfinished run
+                of the same sweep and shard)
+            resume: Resume an unfinished run; False starts a fresh one
+        job: Background job to report progress to, if running as one
+    
+    Returns:
+        Dictionary with batch processing results and statistics
+    """
+    engine = options["engine"]
+    shard, shards = options.get("shard"), options.get("shards")
+    leases = LeaseManager(db, sweep_id=options.get("sweep")) if options.get("lease") else None
+    
+    # Checkpoint finished tasks so a restarted run continues where it died
+    run_key = f"{options.get('sweep') or default_sweep_id()}:{shard}/{shards}"
+    journal = get_run_journal().start_run(
+        run_key, run_id=options.get("run_id"), resume=options.get("resume", True)
+    )
+    counters = BatchCounters(job)
+    
+    # Persist results on write-behind threads and buffer the document writes
+    # into BulkWriter commits, so workers go straight to the next scrape
+    writer = FirestoreWriteStage(storage) if BATCH_WRITES else None
+    write_behind = WriteBehindQueue() if WRITE_BEHIND else None
+    context = BatchContext(
+        leases=leases,
+        journal=journal,
+        writer=writer,
+        on_result=counters.on_result,
+        write_behind=write_behind
+    )
     
     logger.info(
-        f"Batch scraping completed: {successful} successful, {failed} failed, {skipped} skipped out of {len(tasks)} tasks"
+        f"Starting batch scraping operation ({engine} engine, run {journal.run_id}"
+        + (f", shard {shard}/{shards}" if shards else "")
+        + (f", leases for sweep {leases.sweep_id} as {leases.owner}" if leases else "")
+        + (", batched writes" if writer else "")
+        + (", write-behind" if write_behind else "")
+        + ")"
     )
     
-    return summary
+    def skip_task(task: Dict[str, Any], reason: str) -> None:
+        counters.on_result(record_scrape_skipped(task, reason))
+    
+    def pending_tasks(stream: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for task in stream:
+            if journal.is_done(task):
+                skip_task(task, f"Already scraped successfully in run {journal.run_id}")
+            else:
+                yield task
+    
+    # Step 1 + 2: Stream tasks from Firestore into the workers as they are
+    # read, dropping tasks this run already finished and fresh documents,
+    # and ordering the rest by staleness
+    with _active_contexts_lock:
+        _active_contexts.add(context)
+    try:
+        with stream_scraping_tasks(job, shard=shard, shards=shards) as stream:
+            tasks = StalenessScheduler(
+                pending_tasks(stream), ttl_hours=options["ttl_hours"], on_skip=skip_task
+            )
+            summary = BATCH_PROCESSORS[engine](tasks, counters=counters, context=context)
+    finally:
+        context.flush()
+        with _active_contexts_lock:
+            _active_contexts.discard(context)
+    
+    journal.finish()
+    if job is not None:
+        # Normally already done when the task stream ran out (fallback)
+        job.finalize_total()
+    
+    if summary["total_tasks"] == 0:
+        logger.warning("No scraping tasks found in Firestore")
+        return {
+            "status": "no_tasks",
+            "message": "No coding_stats documents found",
+            "total_tasks": 0
+        }
+    
+    # Step 3: Return results
+    return {
+        "status": "completed",
+        "message": "Batch scraping completed successfully",
+        **options,
+        "run_id": journal.run_id,
+        "resumed_tasks": journal.already_done,
+        # False: the journal is in the temp directory and a redeploy loses it
+        "journal_persistent": not journal.journal.ephemeral,
+        "concurrency": get_adaptive_concurrency().snapshot(),
+        **summary
+    }
 
 @app.get("/scrape-coding-stats")
-def scrape_coding_stats(x_secret_key: str = Header(..., description="Secret key for endpoint security")):
+def scrape_coding_stats(
+    response: Response,
+    x_secret_key: str = Header(..., description="Secret key for endpoint security"),
+    engine: Optional[str] = Query(None, description="Batch engine: 'threads', 'async', or 'reparse' to rebuild payloads from the raw response archive (default: BATCH_ENGINE env)"),
+    wait: bool = Query(False, description="Run inside the request and return the final summary"),
+    shard: Optional[int] = Query(None, ge=0, description="Shard number to process, in [0, shards)"),
+    shards: Optional[int] = Query(None, ge=1, description="Total number of shards"),
+    lease: Optional[bool] = Query(None, description="Claim a Firestore lease per document (default: on in shard mode, else SCRAPE_LEASES env)"),
+    sweep: Optional[str] = Query(None, description="Lease sweep id shared by all instances (default: current ISO week)"),
+    ttl_hours: Optional[float] = Query(None, ge=0, description="Skip documents scraped within this many hours; 0 re-scrapes all (default: SCRAPE_FRESHNESS_TTL_HOURS env, 0 for reparse)"),
+    run_id: Optional[str] = Query(None, description="Run journal id to resume (default: latest unfinished run of this sweep and shard)"),
+    resume: bool = Query(True, description="Resume an interrupted run from its journal; false starts over")
+):
     """
     Scrape coding statistics for all users across all institutions.
     Uses Firestore collectionGroup query to fetch all coding_stats documents
     and processes them concurrently.
     
+    By default the batch is enqueued as a background job and a job id is
+    returned immediately (HTTP 202); poll /jobs/{job_id} for progress. If a
+    batch job with the same options is already queued or running, its id is
+    returned instead of starting a second sweep; one with different options
+    (engine, shard, sweep, ...) is reported with HTTP 409 and its params.
+    Pass wait=true to run the batch inside the request as before.
+    
+    Shard mode (shard=3&shards=8) processes only documents whose docId
+    hashes to the given shard, so several instances can split one sweep.
+    Leases (on by default in shard mode) make each instance claim a
+    document before scraping it, so overlapping instances never scrape
+    the same document twice in one sweep.
+    
+    Documents successfully scraped within ttl_hours are skipped; the rest
+    are scraped stalest and most recently active first. Documents sharing
+    a platform and username are scraped once and all receive the result.
+    
+    engine=reparse sends no requests: each document is rebuilt from the
+    newest fetch in the raw response archive (RAW_ARCHIVE_ENABLED, see
+    modules.raw_archive), e.g. after a parser fix.
+    
+    Finished documents are checkpointed in a run journal (utils.run_journal).
+    If a run dies partway through, the next call for the same sweep and
+    shard resumes it and skips documents already done; resume=false starts
+    over.
+    
     Headers Required:
         X-Secret-Key: Must match SCRAPING_SECRET_KEY environment variable
     
     Returns:
-        Dictionary with batch processing results and statistics
+        Job reference, or the batch processing results when wait=true
     """
     # Verify secret key header
     verify_secret_header(x_secret_key)
     
-    # Check if Firebase is initialized
-    if db is None:
+    # Check if Firebase (or a local storage backend) is initialized
+    if storage is None:
         return {
             "status": "error",
             "message": "Firebase not initialized. Set FIREBASE_CREDENTIALS_JSON environment variable.",
             "timestamp": datetime.utcnow().isoformat()
         }
     
-    try:
-        logger.info("Starting batch scraping operation from /scrape-coding-stats endpoint")
-        
-        # Step 1: Create tasks from Firestore collectionGroup query
-        tasks = create_scraping_tasks()
-        
-        if not tasks:
-            logger.warning("No scraping tasks found in Firestore")
-            return {
-                "status": "no_tasks",
-                "message": "No coding_stats documents found",
-                "total_tasks": 0
-            }
-        
-        # Step 2: Process tasks concurrently
-        summary = process_scraping_tasks_concurrent(tasks, max_workers=5)
-        
-        # Step 3: Return results
+    engine = (engine or BATCH_ENGINE).lower()
+    if engine not in BATCH_PROCESSORS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown batch engine '{engine}'. Use one of: {', '.join(BATCH_PROCESSORS)}"
+        )
+    
+    if (shard is None) != (shards is None) or (shards is not None and shard >= shards):
+        raise HTTPException(
+            status_code=400,
+            detail="shard and shards must be given together with 0 <= shard < shards"
+        )
+    
+    if lease is None:
+        lease = (shards is not None or SCRAPE_LEASES) and storage.supports_transactions
+    elif lease and not storage.supports_transactions:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Leases need the Firestore backend (STORAGE_BACKEND is '{storage.name}')"
+        )
+    
+    # A reparse gets its own leases and run journal, apart from the scrape sweep
+    if engine == "reparse" and sweep is None:
+        sweep = f"{default_sweep_id()}-reparse"
+    
+    options = {
+        "engine": engine,
+        "shard": shard,
+        "shards": shards,
+        "lease": lease,
+        "sweep": sweep,
+        "ttl_hours": ttl_hours if ttl_hours is not None else (0 if engine == "reparse" else DEFAULT_FRESHNESS_TTL_HOURS),
+        "run_id": run_id,
+        "resume": resume
+    }
+    
+    if not wait:
+        # Check and enqueue atomically, so overlapping calls queue one sweep
+        job, created = job_manager.submit_unique(
+            BATCH_JOB_KIND,
+            lambda job: run_batch_scrape(options, job),
+            params=options
+        )
+        if not created and job.params != options:
+            # Only one batch runs at a time; don't pass off a different one as this request's
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "message": "A batch job with different options is already running",
+                    "job_id": job.id,
+                    "status_url": f"/jobs/{job.id}",
+                    "params": job.params
+                }
+            )
+        status = "queued" if created else "already_running"
+    
+        response.status_code = 202
         return {
-            "status": "completed",
-            "message": "Batch scraping completed successfully",
-            **summary
+            "status": status,
+            "job_id": job.id,
+            "status_url": f"/jobs/{job.id}",
+            "timestamp": datetime.utcnow().isoformat()
         }
     
+    try:
+        return run_batch_scrape(options)
+    
     except Exception as e:
         error_msg = f"Batch scraping failed: {str(e)}"
         logger.error(error_msg)
@@ -500,11 +1491,36 @@ def scrape_coding_stats(x_secret_key: str = Header(..., description="Secret key
             "timestamp": datetime.utcnow().isoformat()
         }
 
+@app.get("/jobs")
+def list_jobs(x_secret_key: str = Header(..., description="Secret key for endpoint security")):
+    """
+    List recent background jobs, newest first.
+    
+    Headers Required:
+        X-Secret-Key: Must match SCRAPING_SECRET_KEY environment variable
+    """
+    verify_secret_header(x_secret_key)
+    return {"jobs": [job.to_dict() for job in reversed(job_manager.list())]}
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str, x_secret_key: str = Header(..., description="Secret key for endpoint security")):
+    """
+    Report status, progress counters, throughput and ETA of a background job.
+    
+    Headers Required:
+        X-Secret-Key: Must match SCRAPING_SECRET_KEY environment variable
+    """
+    verify_secret_header(x_secret_key)
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
+
 # --- LeetCode API ---
 @app.get("/leetcode")
 def leetcode_stats(username: str = Query(..., description="LeetCode username")):
     try:
-        stats = get_leetcode_full_profile(username)
+        stats = cached_profile("leetcode", username, lambda: get_leetcode_full_profile(username))
         return stats
     except Exception as e:
         return {"error": str(e)}
@@ -512,7 +1528,7 @@ def leetcode_stats(username: str = Query(..., description="LeetCode username")):
 # --- CodeChef API ---
 @app.get("/codechef")
 def codechef_stats(username: str = Query(..., description="CodeChef username")):
-    result = get_codechef_profile(username)
+    result = cached_profile("codechef", username, lambda: get_codechef_profile(username))
     
     if "error" in result.get("codechef", {}):
         return {"error": result["codechef"]["error"]}
@@ -540,7 +1556,7 @@ def codechef_stats(username: str = Query(..., description="CodeChef username")):
 @app.get("/gfg")
 def gfg_stats(username: str = Query(..., description="GeeksForGeeks username")):
     try:
-        stats = get_gfg_stats(username)
+        stats = cached_profile("gfg", username, lambda: get_gfg_stats(username))
         return stats
     except Exception as e:
         return {"error": str(e)}
@@ -548,7 +1564,7 @@ def gfg_stats(username: str = Query(..., description="GeeksForGeeks username")):
 # --- GitHub API ---
 @app.get("/github")
 def github_stats(username: str = Query(..., description="GitHub username")):
-    result = get_github_profile(username)
+    result = cached_profile("github", username, lambda: get_github_profile(username))
     return result
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+"""
+Calendar (heatmap) keys and the packed storage encoding.
+
+The scrapers return calendars as dicts of day -> count: LeetCode and GitHub
+key them by YYYY-MM-DD, CodeChef by the day's UTC midnight in epoch seconds.
+Stored that way a year of calendar is 366 map entries, most of the
+document. With CALENDAR_ENCODING=packed (opt-in, since readers of the
+stored map must switch to decode_calendar() first) prepare_firestore_update
+packs it into the first day plus one unsigned varint per day, base64 encoded:
+
+    {"encoding": "daily-varint-v1", "start": "2025-10-16", "counts": "AAMBAA..."}
+
+A day with fewer than 128 submissions costs one byte, so a year fits in
+about 500 characters. decode_calendar() turns either form back into a
+YYYY-MM-DD keyed dict.
+"""
+
+import base64
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Union
+
+PACKED_CALENDAR_ENCODING = "daily-varint-v1"
+
+DAY_FORMAT = "%Y-%m-%d"
+
+
+# ======================================================
+# DAY KEYS
+# ======================================================
+
+def day_key(timestamp: Union[int, float, str]) -> str:
+    """YYYY-MM-DD (UTC) of an epoch-seconds timestamp."""
+    return datetime.fromtimestamp(int(timestamp), tz=timezone.utc).strftime(DAY_FORMAT)
+
+
+def epoch_key(day: str) -> str:
+    """Epoch seconds of a YYYY-MM-DD day's UTC midnight, as a string key."""
+    parsed = datetime.strptime(day, DAY_FORMAT).replace(tzinfo=timezone.utc)
+    return str(int(parsed.timestamp()))
+
+
+def parse_day(key: Any) -> Optional[date]:
+    """
+    Parse a calendar key: YYYY-MM-DD (LeetCode, GitHub) or epoch seconds (CodeChef).
+
+    Returns:
+        The UTC date, or None if the key is neither
+    """
+    key = str(key)
+    try:
+        if key.isdigit():
+            return datetime.fromtimestamp(int(key), tz=timezone.utc).date()
+        # fromisoformat parses YYYY-MM-DD far faster than strptime
+        return date.fromisoformat(key)
+    except (ValueError, OverflowError, OSError):
+        return None
+
+
+# ======================================================
+# PACKED ENCODING
+# ======================================================
+
+def _write_varint(value: int, out: bytearray) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varints(data: bytes):
+    value = shift = 0
+    for byte in data:
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+        yield value
+        value = shift = 0
+    if shift:
+        raise ValueError("Truncated varint in packed calendar")
+
+
+def is_packed(calendar: Any) -> bool:
+    return isinstance(calendar, dict) and calendar.get("encoding") == PACKED_CALENDAR_ENCODING
+
+
+def encode_calendar(calendar: Any) -> Any:
+    """
+    Pack a day -> count calendar into the storage encoding.
+
+    Days between the first and last key that are missing count as zero;
+    keys that are not days and non-numeric counts are dropped.
+
+    Args:
+        calendar: Scraper calendar (YYYY-MM-DD or epoch-second keys), or an
+            already packed calendar
+
+    Returns:
+        Packed calendar dict; packed and non-dict values are returned as-is
+    """
+    if not isinstance(calendar, dict) or is_packed(calendar):
+        return calendar
+
+    counts: Dict[date, int] = {}
+    for key, count in calendar.items():
+        day = parse_day(key)
+        if day is None or not isinstance(count, (int, float)):
+            continue
+        counts[day] = counts.get(day, 0) + max(0, int(count))
+
+    if not counts:
+        return {"encoding": PACKED_CALENDAR_ENCODING, "start": None, "counts": ""}
+
+    start, end = min(counts), max(counts)
+    packed = bytearray()
+    for offset in range((end - start).days + 1):
+        _write_varint(counts.get(start + timedelta(days=offset), 0), packed)
+
+    return {
+        "encoding": PACKED_CALENDAR_ENCODING,
+        "start": start.isoformat(),
+        "counts": base64.b64encode(bytes(packed)).decode("ascii"),
+    }
+
+
+def decode_calendar(calendar: Any) -> Dict[str, int]:
+    """
+    Read a stored calendar in either form.
+
+    Args:
+        calendar: Packed calendar, or a legacy day -> count dict
+
+    Returns:
+        Dict of YYYY-MM-DD -> count (packed calendars include zero days;
+        empty for missing or invalid values)
+    """
+    if not isinstance(calendar, dict):
+        return {}
+
+    if not is_packed(calendar):
+        decoded = {}
+        for key, count in calendar.items():
+            day = parse_day(key)
+            if day is not None and isinstance(count, (int, float)):
+                decoded[day.isoformat()] = int(count)
+        return decoded
+
+    if not calendar.get("start"):
+        return {}
+    try:
+        start = date.fromisoformat(calendar["start"])
+        counts = base64.b64decode(calendar.get("counts") or "")
+        return {
+            (start + timedelta(days=offset)).isoformat(): count
+            for offset, count in enumerate(_read_varints(counts))
+        }
+    except (ValueError, TypeError):
+        return {}
@@ -1,11 +1,19 @@
-import requests
+import os
+import asyncio
+import httpx
 from bs4 import BeautifulSoup
-from datetime import datetime, timezone
 import re
 from collections import defaultdict
-from .headers_config import get_headers
+from .calendar_codec import epoch_key
+from .raw_archive import archive_responses, archive_responses_async
+from .resilience import async_request, request
 
-def get_codechef_profile(username):
+# Point at a stand-in (benchmarks/upstream_standin.py) for offline load tests
+CODECHEF_BASE_URL = os.environ.get("CODECHEF_BASE_URL", "https://www.codechef.com").rstrip("/")
+CODECHEF_PROFILE_URL = CODECHEF_BASE_URL + "/users/{username}"
+
+
+def get_codechef_profile(username, timeout=10):
     """
     Scrapes CodeChef profile data including:
     - Stars, rating, max rating
@@ -16,16 +24,46 @@ def get_codechef_profile(username):
     - Contest history details
     - Participated contest details with rankings, scores, and dates
     """
-    url = f"https://www.codechef.com/users/{username}"
-    headers = get_headers("codechef")
+    url = CODECHEF_PROFILE_URL.format(username=username)
 
     try:
-        res = requests.get(url, headers=headers, timeout=10)
+        res = request("codechef", "GET", url, timeout=timeout)
         res.raise_for_status()
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return {"codechef": {"error": f"Request failed: {str(e)}"}}
 
-    soup = BeautifulSoup(res.text, "html.parser")
+    archive_responses("codechef", username, {"profile": res})
+    return parse_codechef_profile(res.text, username)
+
+
+async def get_codechef_profile_async(client, username, timeout=10):
+    """
+    Async variant of get_codechef_profile using a shared httpx.AsyncClient.
+    HTML parsing runs in a worker thread so it does not block the event loop.
+    """
+    url = CODECHEF_PROFILE_URL.format(username=username)
+
+    try:
+        res = await async_request(client, "codechef", "GET", url, timeout=timeout)
+        res.raise_for_status()
+    except httpx.HTTPError as e:
+        return {"codechef": {"error": f"Request failed: {str(e)}"}}
+
+    await archive_responses_async("codechef", username, {"profile": res})
+    return await asyncio.to_thread(parse_codechef_profile, res.text, username)
+
+
+def parse_archived_profile(username, responses):
+    """
+    Rebuild get_codechef_profile's result from archived responses
+    (modules.raw_archive) without any request.
+    """
+    return parse_codechef_profile(responses["profile"]["text"], username)
+
+
+def parse_codechef_profile(html, username):
+    """Parse a CodeChef profile page into the get_codechef_profile structure."""
+    soup = BeautifulSoup(html, "html.parser")
     profile = {}
     profile["username"] = username
     # ⭐ Stars
@@ -175,8 +213,7 @@ def get_codechef_profile(username):
         dt_str = rect["data-date"]
         cnt = int(rect.get("data-count", "0") or 0)
         if cnt:
-            dt = datetime.strptime(dt_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-            heatmap[str(int(dt.timestamp()))] = cnt
+            heatmap[epoch_key(dt_str)] = cnt
     profile["calendar"] = dict(heatmap)
 
     # 📝 Contest Details and Participated Contest Details
@@ -0,0 +1,205 @@
+"""
+Conditional-request (ETag / Last-Modified) cache for upstream GET requests.
+
+GitHub answers a GET carrying a matching If-None-Match or If-Modified-Since
+with 304 Not Modified, which is faster than a full response and does not
+count against the rate limit. The cache keeps the validators and body of
+each URL's last 200 response in a SQLite file, so they survive restarts:
+
+    headers.update(conditional_headers(url))
+    resp = resolve(url, client.get(url, headers=headers))
+
+resolve() stores fresh 200 responses and turns a 304 back into a 200
+carrying the cached body, so callers handle both the same way. Both helpers
+are no-ops when ETAG_CACHE_ENABLED is false. They run SQLite queries, so
+async callers use conditional_headers_async() and resolve_async(), which
+run them in a worker thread instead of on the event loop.
+"""
+
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+import tempfile
+import threading
+from typing import Dict, NamedTuple, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+ETAG_CACHE_ENABLED = os.environ.get("ETAG_CACHE_ENABLED", "true").strip().lower() == "true"
+
+ETAG_CACHE_PATH = os.environ.get(
+    "ETAG_CACHE_PATH",
+    os.path.join(tempfile.gettempdir(), "http_etag_cache.sqlite3")
+)
+
+# Least recently used URLs beyond this many are dropped
+ETAG_CACHE_MAX_ENTRIES = int(os.environ.get("ETAG_CACHE_MAX_ENTRIES", 100000))
+
+# Check the entry count every this many stores
+_PRUNE_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_type TEXT,
+    body BLOB NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_use ON responses (used_at);
+"""
+
+
+class CachedResponse(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_type: Optional[str]
+    body: bytes
+
+
+class ETagCache:
+    """Validators and bodies of the last 200 response per URL. Thread-safe."""
+
+    def __init__(self, path: str = ETAG_CACHE_PATH, max_entries: int = ETAG_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stores = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, content_type, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Request headers that let the upstream answer 304 for `url`.
+
+        Returns:
+            If-None-Match and/or If-Modified-Since, or {} if nothing is cached
+        """
+        cached = self.lookup(url)
+        if cached is None:
+            return {}
+        headers = {}
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        return headers
+
+    def store(self, url: str, response: httpx.Response) -> None:
+        """Remember a 200 response if it carries a validator."""
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, content_type, body, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, response.headers.get("content-type"), response.content, time.time())
+            )
+            self._stores += 1
+            if self._stores % _PRUNE_EVERY == 0:
+                self._prune()
+            self._conn.commit()
+
+    def resolve(self, url: str, response: httpx.Response) -> httpx.Response:
+        """
+        Update the cache from a response to a conditional GET of `url`.
+
+        Args:
+            url: Cache key the conditional headers were built for
+            response: Upstream response
+
+        Returns:
+            The response itself, or for a 304 a 200 response rebuilt from
+            the cached body
+        """
+        if response.status_code == 200:
+            self.store(url, response)
+            return response
+        if response.status_code != 304:
+            return response
+
+        cached = self.lookup(url)
+        if cached is None:
+            # Validators were sent by the caller, not taken from the cache
+            return response
+        with self._lock:
+            self._conn.execute("UPDATE responses SET used_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        headers = {"content-type": cached.content_type} if cached.content_type else {}
+        return httpx.Response(200, headers=headers, content=cached.body, request=response.request)
+
+    def _prune(self) -> None:
+        # Called with the lock held
+        self._conn.execute(
+            "DELETE FROM responses WHERE url NOT IN "
+            "(SELECT url FROM responses ORDER BY used_at DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache: Optional[ETagCache] = None
+_default_lock = threading.Lock()
+
+
+def get_etag_cache() -> Optional[ETagCache]:
+    """Get the process-wide ETagCache, or None if disabled or unavailable."""
+    global _default_cache, ETAG_CACHE_ENABLED
+    with _default_lock:
+        if _default_cache is None and ETAG_CACHE_ENABLED:
+            try:
+                _default_cache = ETagCache()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ ETag cache unavailable at {ETAG_CACHE_PATH}: {str(e)}")
+                ETAG_CACHE_ENABLED = False
+        return _default_cache
+
+
+def conditional_headers(url: str) -> Dict[str, str]:
+    """Conditional request headers for `url` from the process-wide cache."""
+    cache = get_etag_cache()
+    return cache.conditional_headers(url) if cache is not None else {}
+
+
+def resolve(url: str, response: httpx.Response) -> httpx.Response:
+    """ETagCache.resolve() on the process-wide cache; returns `response` if disabled."""
+    cache = get_etag_cache()
+    return cache.resolve(url, response) if cache is not None else response
+
+
+async def conditional_headers_async(url: str) -> Dict[str, str]:
+    """conditional_headers() off the event loop."""
+    if not ETAG_CACHE_ENABLED:
+        return {}
+    return await asyncio.to_thread(conditional_headers, url)
+
+
+async def resolve_async(url: str, response: httpx.Response) -> httpx.Response:
+    """resolve() off the event loop."""
+    if not ETAG_CACHE_ENABLED:
+        return response
+    return await asyncio.to_thread(resolve, url, response)
@@ -10,8 +10,14 @@ logger = logging.getLogger(__name__)
 
 from utils.config import (
     fetch_user_complete,
+    parse_api_response,
+    scrape_profile_page,
+    GFG_SUBMISSION_API,
+    GFG_PROFILE_PAGE,
     HEADERS
 )
+from modules.raw_archive import archive_responses, archive_responses_async
+from modules.resilience import async_request, request
 
 app = FastAPI(title="GFG Scraper API", version="1.0.0")
 
@@ -65,15 +71,51 @@ def format_gfg_response(raw_data: dict) -> dict:
     }
 
 
+# ======================================================
+# PARSING
+# ======================================================
+
+def _profile_html(status: int, text: str):
+    """Profile page HTML if it was fetched successfully, else None"""
+    return text if status == 200 else None
+
+
+def parse_gfg_responses(username: str, api_text: str, profile_html=None) -> dict:
+    """Build the formatted GFG stats from raw upstream responses
+    
+    The single GFG parser: live scrapes (sync and async) and archive
+    reparses (parse_archived_profile) all go through it, so a parser fix
+    changes both the same way.
+    
+    Args:
+        username: GFG username
+        api_text: Body of the submissions API response
+        profile_html: Profile page HTML, or None if it could not be fetched
+        
+    Returns:
+        Formatted GFG stats dictionary
+    """
+    api_data = parse_api_response(api_text)
+    if "error" in api_data:
+        return {"error": api_data["error"]}
+    
+    profile_data = {}
+    if profile_html is not None:
+        profile_data = scrape_profile_page(profile_html, username)
+    
+    return format_gfg_response({"user": username, **api_data, **profile_data})
+
+
 # ======================================================
 # EXPORTABLE FUNCTION
 # ======================================================
 
-def get_gfg_stats(username: str) -> dict:
+def get_gfg_stats(username: str, timeout: float = 20) -> dict:
     """Get GFG stats for a user (synchronous wrapper)
     
     Args:
         username: GFG username
+        timeout: Timeout in seconds for each upstream request
         
     Returns:
         Formatted GFG stats dictionary
@@ -84,14 +126,6 @@ def get_gfg_stats(username: str) -> dict:
         
         logger.info(f"Fetching GFG stats for {username}")
         
-        # Use synchronous requests
-        import json
-        import re
-        from bs4 import BeautifulSoup
-        
-        GFG_SUBMISSION_API = "https://practiceapi.geeksforgeeks.org/api/v1/user/problems/submissions/"
-        GFG_PROFILE_PAGE = "https://www.geeksforgeeks.org/user/{username}/"
-        
         # Step 1: Fetch API data
         payload = {
             "handle": username,
@@ -100,117 +134,91 @@ def get_gfg_stats(username: str) -> dict:
             "month": ""
         }
         
-        api_res = httpx.post(GFG_SUBMISSION_API, json=payload, headers=HEADERS, timeout=20)
+        api_res = request("gfg", "POST", GFG_SUBMISSION_API, json=payload, headers=HEADERS, timeout=timeout)
         
         if api_res.status_code != 200:
             return {
                 "error": f"API error: status {api_res.status_code}"
             }
         
-        # Parse API response
-        try:
-            api_data_json = json.loads(api_res.text)
-            result = api_data_json.get("result", {})
-            
-            basic = len(result.get("Basic", {}))
-            easy = len(result.get("Easy", {}))
-            medium = len(result.get("Medium", {}))
-            hard = len(result.get("Hard", {}))
-            
-            api_data = {
-                "basic": basic,
-                "easy": easy,
-                "medium": medium,
-                "hard": hard,
-                "total": basic + easy + medium + hard,
-            }
-        except Exception as e:
-            logger.error(f"Error parsing API response: {e}")
-            return {"error": str(e)}
-        
         # Step 2: Fetch profile page
         url = GFG_PROFILE_PAGE.format(username=username)
-        profile_res = httpx.get(url, headers=HEADERS, timeout=20)
+        profile_res = request("gfg", "GET", url, headers=HEADERS, timeout=timeout)
+        
+        archive_responses("gfg", username, {"api": api_res, "profile": profile_res})
+        
+        return parse_gfg_responses(username, api_res.text, _profile_html(profile_res.status_code, profile_res.text))
+    
+    except Exception as e:
+        logger.error(f"Error fetching GFG stats for {username}: {e}")
+        return {"error": str(e)}
+
+
+async def get_gfg_stats_async(client: httpx.AsyncClient, username: str, timeout: float = 20) -> dict:
+    """Get GFG stats for a user using a shared httpx.AsyncClient
+    
+    Async variant of get_gfg_stats returning the same formatted structure.
+    Profile page parsing runs in a worker thread to keep the event loop free.
+    
+    Args:
+        client: Shared async HTTP client
+        username: GFG username
+        timeout: Timeout in seconds for each upstream request
+        
+    Returns:
+        Formatted GFG stats dictionary
+    """
+    try:
+        if not username or username.strip() == "":
+            return {"error": "Username is required"}
         
-        profile_data = {}
-        if profile_res.status_code == 200:
-            try:
-                soup = BeautifulSoup(profile_res.text, 'lxml')
-                
-                # Extract Full Name
-                name_elem = soup.find('h2', class_='NewProfile_name__N_Nlw')
-                if name_elem:
-                    profile_data['fullName'] = name_elem.get_text(strip=True)
-                
-                # Extract Profile Picture URL
-                img_elem = soup.find('img', class_=re.compile(r'rounded-full', re.I))
-                if img_elem and img_elem.get('src'):
-                    src = img_elem['src']
-                    if src.startswith('http'):
-                        profile_data['profilePicture'] = src
-                    elif src.startswith('/'):
-                        profile_data['profilePicture'] = 'https://www.geeksforgeeks.org' + src
-                    else:
-                        profile_data['profilePicture'] = 'https://www.geeksforgeeks.org/' + src
-                
-                # Extract Institute Name
-                qualifications = soup.find('div', class_=re.compile(r'[Qq]ualification', re.I))
-                if qualifications:
-                    p_tag = qualifications.find('p')
-                    if p_tag:
-                        institute_text = p_tag.get_text(strip=True)
-                        if institute_text and len(institute_text) < 100:
-                            profile_data['institute'] = institute_text
-                
-                # Extract Coding Score
-                score_elements = soup.find_all(class_="ScoreContainer_value__7yy7h")
-                if len(score_elements) > 0:
-                    score_text = score_elements[0].get_text(strip=True)
-                    score_match = re.search(r'(\d+)', score_text)
-                    if score_match:
-                        profile_data['codingScore'] = int(score_match.group(1))
-                
-                # Extract Institute Rank
-                if len(score_elements) > 2:
-                    rank_text = score_elements[2].get_text(strip=True)
-                    rank_match = re.search(r'(\d+)', rank_text)
-                    if rank_match:
-                        profile_data['instituteRank'] = int(rank_match.group(1))
-                
-                # Extract Max Streak
-                streak_values = soup.find_all(class_="PotdContainer_statValue__nt1dr")
-                if len(streak_values) > 0:
-                    max_streak_text = streak_values[0].get_text(strip=True)
-                    max_streak_match = re.search(r'(\d+)', max_streak_text)
-                    if max_streak_match:
-                        profile_data['maxStreak'] = int(max_streak_match.group(1))
-                
-                # Extract Current POTD Streak
-                potd_text_elem = soup.find(string=re.compile(r'\d+\s*Day\s*POTD\s*Streak', re.I))
-                if potd_text_elem:
-                    potd_text = potd_text_elem.get_text(strip=True)
-                    potd_match = re.search(r'(\d+)\s*Day', potd_text, re.I)
-                    if potd_match:
-                        profile_data['currentStreak'] = int(potd_match.group(1))
-            except Exception as e:
-                logger.debug(f"Error scraping profile page: {e}")
+        logger.info(f"Fetching GFG stats for {username}")
         
-        # Combine all data
-        complete_data = {
-            "user": username,
-            **api_data,
-            **profile_data
+        # Step 1: Fetch API data
+        payload = {
+            "handle": username,
+            "requestType": "",
+            "year": "",
+            "month": ""
         }
         
-        # Format the response
-        formatted_result = format_gfg_response(complete_data)
-        return formatted_result
+        api_res = await async_request(client, "gfg", "POST", GFG_SUBMISSION_API, json=payload, headers=HEADERS, timeout=timeout)
+        
+        if api_res.status_code != 200:
+            return {
+                "error": f"API error: status {api_res.status_code}"
+            }
+        
+        # Step 2: Fetch profile page
+        url = GFG_PROFILE_PAGE.format(username=username)
+        profile_res = await async_request(client, "gfg", "GET", url, headers=HEADERS, timeout=timeout)
+        
+        await archive_responses_async("gfg", username, {"api": api_res, "profile": profile_res})
+        
+        return await asyncio.to_thread(
+            parse_gfg_responses, username, api_res.text, _profile_html(profile_res.status_code, profile_res.text)
+        )
     
     except Exception as e:
         logger.error(f"Error fetching GFG stats for {username}: {e}")
         return {"error": str(e)}
 
 
+def parse_archived_profile(username: str, responses: dict) -> dict:
+    """Rebuild get_gfg_stats's result from archived responses (modules.raw_archive) without any request
+    
+    Args:
+        username: GFG username
+        responses: Archived "api" and "profile" responses
+        
+    Returns:
+        Formatted GFG stats dictionary
+    """
+    profile = responses.get("profile")
+    profile_html = _profile_html(profile["status"], profile["text"]) if profile else None
+    return parse_gfg_responses(username, responses["api"]["text"], profile_html)
+
+
 # ======================================================
 # API ENDPOINTS
 # ======================================================
@@ -1,44 +1,19 @@
 import os
-import requests
+import json
 from dotenv import load_dotenv
-from .headers_config import get_headers
+from .etag_cache import conditional_headers, conditional_headers_async, resolve, resolve_async
+from .raw_archive import archive_responses, archive_responses_async
+from .resilience import async_request, request
 
 load_dotenv()
 
-GITHUB_GRAPHQL = "https://api.github.com/graphql"
-GITHUB_REST = "https://api.github.com/users"
+# Point at a stand-in (benchmarks/upstream_standin.py) for offline load tests
+GITHUB_API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL = f"{GITHUB_API_URL}/graphql"
+GITHUB_REST = f"{GITHUB_API_URL}/users"
 GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "").strip()
 
-
-def get_github_profile(username):
-    username = username.strip()
-    if not username:
-        return {"github": {"error": "Invalid or empty username"}}
-
-    # --- Step 1: Get public repos using REST API ---
-    rest_url = f"{GITHUB_REST}/{username}"
-    public_repos = 0  # Default fallback
-
-    try:
-        rest_headers = get_headers("github").copy()
-        if GITHUB_TOKEN:
-            rest_headers["Authorization"] = f"token {GITHUB_TOKEN}"
-
-        rest_resp = requests.get(rest_url, headers=rest_headers, timeout=10)
-        rest_resp.raise_for_status()
-        rest_data = rest_resp.json()
-        public_repos = rest_data.get("public_repos", 0)
-
-    except Exception as e:
-        print(f"[REST API Error] {e}")
-        public_repos = 0
-
-    # --- Step 2: Get contributions heatmap using GraphQL ---
-    calendar = {}
-    total_contributions = 0
-
-    if GITHUB_TOKEN:
-        graphql_query = """
+CONTRIBUTIONS_QUERY = """
         query($login: String!) {
           user(login: $login) {
             contributionsCollection {
@@ -55,46 +30,48 @@ def get_github_profile(username):
           }
         }
         """
-        headers = {
-            "Authorization": f"Bearer {GITHUB_TOKEN}",
-            "User-Agent": "Mozilla/5.0"
-        }
-        variables = {"login": username}
 
-        try:
-            graphql_resp = requests.post(
-                GITHUB_GRAPHQL,
-                json={"query": graphql_query, "variables": variables},
-                headers=headers,
-                timeout=10
-            )
-            graphql_resp.raise_for_status()
-            data = graphql_resp.json()
 
-            user = data.get("data", {}).get("user")
-            if user:
-                contribs = user["contributionsCollection"]["contributionCalendar"]
-                total_contributions = contribs.get("totalContributions", 0)
+def _rest_headers(validators):
+    # The pooled client already sends the github header preset; a cached
+    # ETag lets GitHub answer 304, which does not count against the rate limit
+    rest_headers = dict(validators)
+    if GITHUB_TOKEN:
+        rest_headers["Authorization"] = f"token {GITHUB_TOKEN}"
+    return rest_headers
 
-                for week in contribs.get("weeks", []):
-                    for day in week["contributionDays"]:
-                        date = day["date"]
-                        count = day["contributionCount"]
-                        calendar[date] = count  # INCLUDE even if count is 0
 
-        except Exception as e:
-            print(f"[GraphQL Error] {e}")
-            return {
-                "github": {
-                    "profile": {
-                        "public_repos": public_repos,
-                        "total_contributions": 0
-                    },
-                    "calendar": {},
-                    "error": "Failed to fetch contributions. Token may be invalid or expired."
-                }
-            }
+def _graphql_headers():
+    return {
+        "Authorization": f"Bearer {GITHUB_TOKEN}",
+        "User-Agent": "Mozilla/5.0"
+    }
+
+
+def _graphql_payload(username):
+    return {"query": CONTRIBUTIONS_QUERY, "variables": {"login": username}}
+
+
+def _parse_contributions(data):
+    """Return (total_contributions, calendar) from a GraphQL response body."""
+    calendar = {}
+    total_contributions = 0
+
+    user = data.get("data", {}).get("user")
+    if user:
+        contribs = user["contributionsCollection"]["contributionCalendar"]
+        total_contributions = contribs.get("totalContributions", 0)
+
+        for week in contribs.get("weeks", []):
+            for day in week["contributionDays"]:
+                date = day["date"]
+                count = day["contributionCount"]
+                calendar[date] = count  # INCLUDE even if count is 0
+
+    return total_contributions, calendar
+
 
+def _build_profile(public_repos, total_contributions, calendar):
     return {
         "github": {
             "profile": {
@@ -106,6 +83,137 @@ def get_github_profile(username):
     }
 
 
+def _rest_error(e):
+    return {"github": {"error": f"Failed to fetch profile: {str(e)}"}}
+
+
+def _contributions_error(public_repos):
+    return {
+        "github": {
+            "profile": {
+                "public_repos": public_repos,
+                "total_contributions": 0
+            },
+            "calendar": {},
+            "error": "Failed to fetch contributions. Token may be invalid or expired."
+        }
+    }
+
+
+def get_github_profile(username, timeout=10):
+    username = username.strip()
+    if not username:
+        return {"github": {"error": "Invalid or empty username"}}
+
+    # --- Step 1: Get public repos using REST API ---
+    rest_url = f"{GITHUB_REST}/{username}"
+    responses = {}
+
+    try:
+        rest_headers = _rest_headers(conditional_headers(rest_url))
+        rest_resp = request("github", "GET", rest_url, headers=rest_headers, timeout=timeout)
+        rest_resp = resolve(rest_url, rest_resp)
+        rest_resp.raise_for_status()
+        responses["rest"] = rest_resp
+        rest_data = rest_resp.json()
+        public_repos = rest_data.get("public_repos", 0)
+
+    except Exception as e:
+        # Marked as an error so it is neither stored over real data nor cached
+        print(f"[REST API Error] {e}")
+        return _rest_error(e)
+
+    # --- Step 2: Get contributions heatmap using GraphQL ---
+    calendar = {}
+    total_contributions = 0
+
+    if GITHUB_TOKEN:
+        try:
+            graphql_resp = request(
+                "github", "POST", GITHUB_GRAPHQL,
+                json=_graphql_payload(username),
+                headers=_graphql_headers(),
+                timeout=timeout
+            )
+            graphql_resp.raise_for_status()
+            responses["graphql"] = graphql_resp
+            total_contributions, calendar = _parse_contributions(graphql_resp.json())
+
+        except Exception as e:
+            print(f"[GraphQL Error] {e}")
+            return _contributions_error(public_repos)
+
+    if responses:
+        archive_responses("github", username, responses)
+    return _build_profile(public_repos, total_contributions, calendar)
+
+
+async def get_github_profile_async(client, username, timeout=10):
+    """
+    Async variant of get_github_profile using a shared httpx.AsyncClient.
+    Issues the same REST and GraphQL calls and returns the same structure.
+    """
+    username = username.strip()
+    if not username:
+        return {"github": {"error": "Invalid or empty username"}}
+
+    rest_url = f"{GITHUB_REST}/{username}"
+    responses = {}
+
+    try:
+        # The ETag cache is SQLite; keep its queries off the event loop
+        rest_headers = _rest_headers(await conditional_headers_async(rest_url))
+        rest_resp = await async_request(client, "github", "GET", rest_url, headers=rest_headers, timeout=timeout)
+        rest_resp = await resolve_async(rest_url, rest_resp)
+        rest_resp.raise_for_status()
+        responses["rest"] = rest_resp
+        public_repos = rest_resp.json().get("public_repos", 0)
+
+    except Exception as e:
+        print(f"[REST API Error] {e}")
+        return _rest_error(e)
+
+    calendar = {}
+    total_contributions = 0
+
+    if GITHUB_TOKEN:
+        try:
+            graphql_resp = await async_request(
+                client, "github", "POST", GITHUB_GRAPHQL,
+                json=_graphql_payload(username),
+                headers=_graphql_headers(),
+                timeout=timeout
+            )
+            graphql_resp.raise_for_status()
+            responses["graphql"] = graphql_resp
+            total_contributions, calendar = _parse_contributions(graphql_resp.json())
+
+        except Exception as e:
+            print(f"[GraphQL Error] {e}")
+            return _contributions_error(public_repos)
+
+    if responses:
+        await archive_responses_async("github", username, responses)
+    return _build_profile(public_repos, total_contributions, calendar)
+
+
+def parse_archived_profile(username, responses):
+    """
+    Rebuild get_github_profile's result from archived responses
+    (modules.raw_archive) without any request.
+    """
+    public_repos = 0
+    if "rest" in responses:
+        public_repos = json.loads(responses["rest"]["text"]).get("public_repos", 0)
+
+    calendar = {}
+    total_contributions = 0
+    if "graphql" in responses:
+        total_contributions, calendar = _parse_contributions(json.loads(responses["graphql"]["text"]))
+
+    return _build_profile(public_repos, total_contributions, calendar)
+
+
 # Test call (only for development)
 if __name__ == "__main__":
     print(get_github_profile("yuvasrisai18"))
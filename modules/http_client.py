@@ -0,0 +1,160 @@
+"""
+Shared HTTP client pools for the scraper modules.
+
+Every scraper request goes through a client kept per platform, so repeat
+requests to leetcode.com, api.github.com, codechef.com and geeksforgeeks.org
+reuse keep-alive connections (and, with the h2 package installed, multiplex
+over HTTP/2) instead of paying a TCP+TLS handshake each time. Clients carry
+the platform's headers from headers_config.get_headers; headers passed per
+request are merged over them.
+
+ClientPool serves the threaded scrapers and the filtering scripts; use
+get_client(platform) for the process-wide one. AsyncClientPool is bound to
+the event loop it is used in, so create one per asyncio run and close it
+with aclose() when the run finishes.
+"""
+
+import os
+import asyncio
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .headers_config import get_headers
+
+try:
+    import h2  # noqa: F401
+    H2_AVAILABLE = True
+except ImportError:
+    H2_AVAILABLE = False
+
+# Negotiate HTTP/2 with hosts that offer it (needs the h2 package)
+HTTP2_ENABLED = os.environ.get("HTTP2_ENABLED", "true").strip().lower() == "true" and H2_AVAILABLE
+
+# Keep-alive connection limits per platform pool
+DEFAULT_POOL_LIMITS = {
+    "leetcode": {"max_connections": 20, "max_keepalive_connections": 10},
+    "github": {"max_connections": 50, "max_keepalive_connections": 20},
+    "codechef": {"max_connections": 10, "max_keepalive_connections": 5},
+    "gfg": {"max_connections": 20, "max_keepalive_connections": 10},
+}
+
+FALLBACK_POOL_LIMITS = {"max_connections": 10, "max_keepalive_connections": 5}
+
+PLATFORM_ALIASES = {"geeksforgeeks": "gfg"}
+
+# Connection management belongs to the pool (and HTTP/2 has no such headers),
+# so these are left out of the presets
+HOP_BY_HOP_HEADERS = {"connection", "keep-alive"}
+
+
+def _normalize_platform(platform: str) -> str:
+    platform = (platform or "").lower()
+    return PLATFORM_ALIASES.get(platform, platform)
+
+
+def _client_options(platform: str, timeout: float, limits: Dict[str, Dict[str, int]]) -> Dict[str, Any]:
+    """Constructor arguments shared by the sync and async clients of a platform."""
+    headers = {
+        name: value for name, value in get_headers(platform).items()
+        if name.lower() not in HOP_BY_HOP_HEADERS
+    }
+    return {
+        "headers": headers,
+        "follow_redirects": True,
+        "http2": HTTP2_ENABLED,
+        "limits": httpx.Limits(**limits.get(platform, FALLBACK_POOL_LIMITS)),
+        "timeout": timeout,
+    }
+
+
+class ClientPool:
+    """One httpx.Client per platform, created on first use and safe to share across threads."""
+
+    def __init__(self, timeout: float = 20, limits: Optional[Dict[str, Dict[str, int]]] = None):
+        self.timeout = timeout
+        self.limits = limits if limits is not None else DEFAULT_POOL_LIMITS
+        self._clients: Dict[str, httpx.Client] = {}
+        self._lock = threading.Lock()
+
+    def get(self, platform: str) -> httpx.Client:
+        """
+        Get the shared client for a platform.
+
+        Args:
+            platform: Platform name ("leetcode", "github", "codechef", "gfg";
+                "geeksforgeeks" is accepted for gfg)
+
+        Returns:
+            httpx.Client with the platform's default headers
+        """
+        platform = _normalize_platform(platform)
+        with self._lock:
+            client = self._clients.get(platform)
+            if client is None:
+                client = httpx.Client(**_client_options(platform, self.timeout, self.limits))
+                self._clients[platform] = client
+            return client
+
+    def close(self) -> None:
+        """Close every client in the pool; later get() calls open new ones."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+
+_default_pool: Optional[ClientPool] = None
+_default_lock = threading.Lock()
+
+
+def get_client_pool() -> ClientPool:
+    """Get the process-wide ClientPool, creating it on first use."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = ClientPool()
+        return _default_pool
+
+
+def get_client(platform: str) -> httpx.Client:
+    """Shared client of the process-wide pool for a platform."""
+    return get_client_pool().get(platform)
+
+
+class AsyncClientPool:
+    """One httpx.AsyncClient per platform, created on first use."""
+
+    def __init__(self, timeout: float = 20, limits: Optional[Dict[str, Dict[str, int]]] = None):
+        self.timeout = timeout
+        self.limits = limits if limits is not None else DEFAULT_POOL_LIMITS
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._lock = asyncio.Lock()
+
+    async def get(self, platform: str) -> httpx.AsyncClient:
+        """
+        Get the shared client for a platform.
+
+        Args:
+            platform: Platform name ("leetcode", "github", "codechef", "gfg")
+
+        Returns:
+            httpx.AsyncClient with the platform's default headers
+        """
+        platform = _normalize_platform(platform)
+        async with self._lock:
+            client = self._clients.get(platform)
+            if client is None:
+                client = httpx.AsyncClient(**_client_options(platform, self.timeout, self.limits))
+                self._clients[platform] = client
+            return client
+
+    async def aclose(self) -> None:
+        """Close every client in the pool."""
+        async with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            await client.aclose()
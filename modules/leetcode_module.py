@@ -1,30 +1,18 @@
-import requests
+import os
+import json
+import logging
 from datetime import datetime, timedelta
-from collections import defaultdict
+from .calendar_codec import day_key
+from .raw_archive import archive_responses, archive_responses_async
+from .resilience import async_request, request
 
-def get_leetcode_full_profile(username):
-    url = "https://leetcode.com/graphql"
-    headers = {
-        "Content-Type": "application/json",
-        "Referer": f"https://leetcode.com/{username}/",
-        "User-Agent": "Mozilla/5.0"
-    }
+logger = logging.getLogger(__name__)
 
-    result = {
-        "calendar": {},
-        "profile": {
-            "username": username,
-            "problems_solved": [],
-            "badges": [],
-            "contest_history": [],
-            "contest_ranking": {}
-        }
-    }
+# Point at a stand-in (benchmarks/upstream_standin.py) for offline load tests
+LEETCODE_BASE_URL = os.environ.get("LEETCODE_BASE_URL", "https://leetcode.com").rstrip("/")
+LEETCODE_GRAPHQL = f"{LEETCODE_BASE_URL}/graphql"
 
-    try:
-        # Heatmap - Try to get submission calendar data
-        heatmap_query = {
-            "query": """
+HEATMAP_QUERY = """
             query userProfileCalendar($username: String!, $year: Int!) {
               matchedUser(username: $username) {
                 userCalendar(year: $year) {
@@ -35,78 +23,18 @@ def get_leetcode_full_profile(username):
                 }
               }
             }
-            """,
-            "variables": {"username": username, "year": datetime.now().year}
-        }
-        
-        resp = requests.post(url, json=heatmap_query, headers=headers, timeout=10)
-        resp.raise_for_status()
-        calendar_data = resp.json().get("data", {})
-        
-        # Initialize calendar for the past year
-        today = datetime.now()
-        start_date = today - timedelta(days=365)
-        calendar = {}
-        current_date = start_date
-        while current_date <= today:
-            date_str = current_date.strftime("%Y-%m-%d")
-            calendar[date_str] = 0
-            current_date += timedelta(days=1)
-        
-        # Try to parse submission calendar if available
-        user_data = calendar_data.get("matchedUser")
-        if user_data and user_data.get("userCalendar"):
-            submission_calendar = user_data["userCalendar"].get("submissionCalendar")
-            if submission_calendar:
-                # submissionCalendar is a JSON string with timestamp: count pairs
-                import json
-                try:
-                    calendar_dict = json.loads(submission_calendar)
-                    for timestamp_str, count in calendar_dict.items():
-                        ts = int(timestamp_str)
-                        date = datetime.utcfromtimestamp(ts)
-                        date_str = date.strftime("%Y-%m-%d")
-                        if date_str in calendar:
-                            calendar[date_str] = count
-                except:
-                    print("Failed to parse submission calendar, falling back to recent submissions")
-        
-        # Fallback: Use recent submissions if calendar data not available
-        if not any(count > 0 for count in calendar.values()):
-            print("No calendar data found, trying recent submissions approach...")
-            fallback_query = {
-                "query": """
+            """
+
+RECENT_AC_QUERY = """
                 query recentAc($username: String!) {
                   recentAcSubmissionList(username: $username, limit: 5000) {
                     timestamp
                   }
                 }
-                """,
-                "variables": {"username": username}
-            }
-            resp2 = requests.post(url, json=fallback_query, headers=headers, timeout=10)
-            resp2.raise_for_status()
-            
-            subs = resp2.json().get("data", {}).get("recentAcSubmissionList", [])
-            submission_count = 0
-            
-            for sub in subs:
-                ts = int(sub["timestamp"])
-                submission_date = datetime.utcfromtimestamp(ts)
-                date_str = submission_date.strftime("%Y-%m-%d")
-                
-                if date_str in calendar:
-                    calendar[date_str] += 1
-                    submission_count += 1
-            
-            print(f"Fallback: Processed {submission_count} submissions from {len(subs)} total")
-        
-        result["calendar"] = calendar
+                """
 
-        # Full profile including badges and contests
-        # Update profile_query to include aboutMe
-        profile_query = {
-            "query": """
+# Full profile including badges and contests
+PROFILE_QUERY = """
             query userProfile($username: String!) {
               allQuestionsCount {
                 difficulty
@@ -146,60 +74,226 @@ def get_leetcode_full_profile(username):
                 }
               }
             }
-            """,
-            "variables": {"username": username}
+            """
+
+
+def _build_headers(username):
+    return {
+        "Content-Type": "application/json",
+        "Referer": f"https://leetcode.com/{username}/",
+        "User-Agent": "Mozilla/5.0"
+    }
+
+
+def _empty_result(username):
+    return {
+        "calendar": {},
+        "profile": {
+            "username": username,
+            "problems_solved": [],
+            "badges": [],
+            "contest_history": [],
+            "contest_ranking": {}
         }
+    }
+
+
+def _heatmap_payload(username):
+    return {
+        "query": HEATMAP_QUERY,
+        "variables": {"username": username, "year": datetime.now().year}
+    }
+
+
+def _recent_ac_payload(username):
+    return {"query": RECENT_AC_QUERY, "variables": {"username": username}}
+
+
+def _profile_payload(username):
+    return {"query": PROFILE_QUERY, "variables": {"username": username}}
 
-        resp2 = requests.post(url, json=profile_query, headers=headers, timeout=10)
+
+def _build_calendar(calendar_data):
+    """Zero-filled past-year calendar populated from the heatmap response."""
+    # Initialize calendar for the past year
+    today = datetime.now()
+    start_date = today - timedelta(days=365)
+    calendar = {}
+    current_date = start_date
+    while current_date <= today:
+        date_str = current_date.strftime("%Y-%m-%d")
+        calendar[date_str] = 0
+        current_date += timedelta(days=1)
+    
+    # Try to parse submission calendar if available
+    user_data = calendar_data.get("matchedUser")
+    if user_data and user_data.get("userCalendar"):
+        submission_calendar = user_data["userCalendar"].get("submissionCalendar")
+        if submission_calendar:
+            # submissionCalendar is a JSON string with timestamp: count pairs
+            try:
+                calendar_dict = json.loads(submission_calendar)
+                for timestamp_str, count in calendar_dict.items():
+                    date_str = day_key(timestamp_str)
+                    if date_str in calendar:
+                        calendar[date_str] = count
+            except:
+                print("Failed to parse submission calendar, falling back to recent submissions")
+
+    return calendar
+
+
+def _calendar_is_empty(calendar):
+    return not any(count > 0 for count in calendar.values())
+
+
+def _apply_recent_submissions(calendar, subs):
+    """Fallback: count recent accepted submissions into the calendar."""
+    submission_count = 0
+    
+    for sub in subs:
+        date_str = day_key(sub["timestamp"])
+        
+        if date_str in calendar:
+            calendar[date_str] += 1
+            submission_count += 1
+    
+    print(f"Fallback: Processed {submission_count} submissions from {len(subs)} total")
+
+
+def _apply_profile(result, pd):
+    """Fill result["profile"] from the userProfile query response data."""
+    mu = pd.get("matchedUser", {})
+    result["profile"]["username"] = mu.get("username", "")
+    result["profile"]["bio"] = mu.get("profile", {}).get("aboutMe", "")
+
+
+    # Problems solved
+    ac = mu.get("submitStatsGlobal", {}).get("acSubmissionNum", [])
+    result["profile"]["problems_solved"] = [
+        {"difficulty": item["difficulty"], "count": item["count"]}
+        for item in ac
+    ]
+
+    # Badges
+    result["profile"]["badges"] = [
+        {"id": b.get("id"), "displayName": b.get("displayName"), "icon": b.get("icon")}
+        for b in mu.get("badges", [])
+    ]
+
+    # Contest ranking
+    cr = pd.get("userContestRanking", {})
+    if cr:
+        result["profile"]["contest_ranking"] = {
+            "attendedContestsCount": cr.get("attendedContestsCount", 0),
+            "rating": cr.get("rating", 0),
+            "globalRanking": cr.get("globalRanking", 0),
+            "totalParticipants": cr.get("totalParticipants", 0),
+            "topPercentage": cr.get("topPercentage", 0)
+        }
+
+    # Contest history
+    history = pd.get("userContestRankingHistory", [])
+    result["profile"]["contest_history"] = [
+        {
+            "title": h["contest"].get("title"),
+            "startTime": datetime.utcfromtimestamp(int(h["contest"]["startTime"])).strftime("%Y-%m-%d"),
+            "rating": h.get("rating"),
+            "ranking": h.get("ranking")
+        }
+        for h in history if h.get("attended")
+    ]
+
+
+def get_leetcode_full_profile(username, timeout=10):
+    url = LEETCODE_GRAPHQL
+    headers = _build_headers(username)
+    result = _empty_result(username)
+
+    try:
+        # Heatmap - Try to get submission calendar data
+        resp = request("leetcode", "POST", url, json=_heatmap_payload(username), headers=headers, timeout=timeout)
+        resp.raise_for_status()
+        responses = {"heatmap": resp}
+        calendar = _build_calendar(resp.json().get("data", {}))
+        
+        # Fallback: Use recent submissions if calendar data not available
+        if _calendar_is_empty(calendar):
+            print("No calendar data found, trying recent submissions approach...")
+            resp2 = request("leetcode", "POST", url, json=_recent_ac_payload(username), headers=headers, timeout=timeout)
+            resp2.raise_for_status()
+            responses["recent"] = resp2
+            _apply_recent_submissions(calendar, resp2.json().get("data", {}).get("recentAcSubmissionList", []))
+        
+        result["calendar"] = calendar
+
+        resp2 = request("leetcode", "POST", url, json=_profile_payload(username), headers=headers, timeout=timeout)
         resp2.raise_for_status()
-        pd = resp2.json().get("data", {})
-
-        mu = pd.get("matchedUser", {})
-        result["profile"]["username"] = mu.get("username", "")
-        result["profile"]["bio"] = mu.get("profile", {}).get("aboutMe", "")
-
-
-        # Problems solved
-        ac = mu.get("submitStatsGlobal", {}).get("acSubmissionNum", [])
-        result["profile"]["problems_solved"] = [
-            {"difficulty": item["difficulty"], "count": item["count"]}
-            for item in ac
-        ]
-
-        # Badges
-        result["profile"]["badges"] = [
-            {"id": b.get("id"), "displayName": b.get("displayName"), "icon": b.get("icon")}
-            for b in mu.get("badges", [])
-        ]
-
-        # Contest ranking
-        cr = pd.get("userContestRanking", {})
-        if cr:
-            result["profile"]["contest_ranking"] = {
-                "attendedContestsCount": cr.get("attendedContestsCount", 0),
-                "rating": cr.get("rating", 0),
-                "globalRanking": cr.get("globalRanking", 0),
-                "totalParticipants": cr.get("totalParticipants", 0),
-                "topPercentage": cr.get("topPercentage", 0)
-            }
+        responses["profile"] = resp2
+        _apply_profile(result, resp2.json().get("data", {}))
+        archive_responses("leetcode", username, responses)
 
-        # Contest history
-        history = pd.get("userContestRankingHistory", [])
-        result["profile"]["contest_history"] = [
-            {
-                "title": h["contest"].get("title"),
-                "startTime": datetime.utcfromtimestamp(int(h["contest"]["startTime"])).strftime("%Y-%m-%d"),
-                "rating": h.get("rating"),
-                "ranking": h.get("ranking")
-            }
-            for h in history if h.get("attended")
-        ]
+    except Exception as e:
+        # An error result, not the empty profile, so the batch records a
+        # failure (and the response cache skips it) instead of storing zeros
+        logger.error(f"Error fetching LeetCode profile for {username}: {e}")
+        return {"error": str(e)}
+
+    return result
+
+
+async def get_leetcode_full_profile_async(client, username, timeout=10):
+    """
+    Async variant of get_leetcode_full_profile using a shared httpx.AsyncClient.
+    Issues the same GraphQL queries and returns the same structure.
+    """
+    url = LEETCODE_GRAPHQL
+    headers = _build_headers(username)
+    result = _empty_result(username)
+
+    try:
+        resp = await async_request(client, "leetcode", "POST", url, json=_heatmap_payload(username), headers=headers, timeout=timeout)
+        resp.raise_for_status()
+        responses = {"heatmap": resp}
+        calendar = _build_calendar(resp.json().get("data", {}))
+
+        if _calendar_is_empty(calendar):
+            print("No calendar data found, trying recent submissions approach...")
+            resp2 = await async_request(client, "leetcode", "POST", url, json=_recent_ac_payload(username), headers=headers, timeout=timeout)
+            resp2.raise_for_status()
+            responses["recent"] = resp2
+            _apply_recent_submissions(calendar, resp2.json().get("data", {}).get("recentAcSubmissionList", []))
+
+        result["calendar"] = calendar
+
+        resp2 = await async_request(client, "leetcode", "POST", url, json=_profile_payload(username), headers=headers, timeout=timeout)
+        resp2.raise_for_status()
+        responses["profile"] = resp2
+        _apply_profile(result, resp2.json().get("data", {}))
+        await archive_responses_async("leetcode", username, responses)
 
     except Exception as e:
-        print("Error:", e)
+        logger.error(f"Error fetching LeetCode profile for {username}: {e}")
+        return {"error": str(e)}
+
+    return result
+
 
+def parse_archived_profile(username, responses):
+    """
+    Rebuild get_leetcode_full_profile's result from archived responses
+    (modules.raw_archive) without any request.
+    """
+    result = _empty_result(username)
+    calendar = _build_calendar(json.loads(responses["heatmap"]["text"]).get("data", {}))
+    if "recent" in responses:
+        recent = json.loads(responses["recent"]["text"]).get("data", {})
+        _apply_recent_submissions(calendar, recent.get("recentAcSubmissionList", []))
+    result["calendar"] = calendar
+    _apply_profile(result, json.loads(responses["profile"]["text"]).get("data", {}))
     return result
 
+
 if __name__ == "__main__":
     from pprint import pprint
     pprint(get_leetcode_full_profile("Yuva_SriSai_18"))
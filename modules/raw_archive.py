@@ -0,0 +1,205 @@
+"""
+Compressed on-disk archive of raw upstream responses.
+
+With RAW_ARCHIVE_ENABLED=true every successful scrape also saves the raw
+HTML/JSON responses it parsed, one compressed file per fetch:
+
+    {RAW_ARCHIVE_DIR}/codechef/alice/20261016T101502123456Z.json.gz
+
+    {"platform": "codechef", "username": "alice", "fetched_at": "...",
+     "responses": {"profile": {"url": "...", "status": 200, "text": "<html>..."}}}
+
+Files are zstd compressed when the zstandard package is installed, gzip
+otherwise (RAW_ARCHIVE_COMPRESSION picks one explicitly); both are read back
+regardless. Only the newest RAW_ARCHIVE_KEEP fetches per user are kept.
+
+After a parser fix, the "reparse" batch engine in main.py rebuilds every
+document from the newest archived fetch with each scraper module's
+parse_archived_profile(), without any network I/O. Live scrapes and
+reparses share their parsers; benchmarks/reparse_parity_check.py verifies
+they produce the same result for the same archived responses.
+"""
+
+import os
+import gzip
+import json
+import asyncio
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Save the raw responses of every successful scrape
+RAW_ARCHIVE_ENABLED = os.environ.get("RAW_ARCHIVE_ENABLED", "false").strip().lower() == "true"
+
+RAW_ARCHIVE_DIR = os.environ.get(
+    "RAW_ARCHIVE_DIR",
+    os.path.join(tempfile.gettempdir(), "raw_archive")
+)
+
+# "zstd" or "gzip"
+RAW_ARCHIVE_COMPRESSION = os.environ.get(
+    "RAW_ARCHIVE_COMPRESSION", "zstd" if zstandard is not None else "gzip"
+).strip().lower()
+
+# Fetches kept per (platform, username); 0 keeps all
+RAW_ARCHIVE_KEEP = int(os.environ.get("RAW_ARCHIVE_KEEP", 3))
+
+FETCH_TIME_FORMAT = "%Y%m%dT%H%M%S%fZ"
+
+_EXTENSIONS = {"zstd": ".json.zst", "gzip": ".json.gz"}
+
+
+def _compress(data: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(path: str, data: bytes) -> bytes:
+    if path.endswith(_EXTENSIONS["zstd"]):
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _raw_response(response: Any) -> Dict[str, Any]:
+    """Archived form of an httpx/requests response."""
+    return {
+        "url": str(response.url),
+        "status": response.status_code,
+        "text": response.text,
+    }
+
+
+class RawArchive:
+    """Per-user directories of compressed fetch records. Thread-safe."""
+
+    def __init__(self, root: str = RAW_ARCHIVE_DIR, compression: str = RAW_ARCHIVE_COMPRESSION,
+                 keep: int = RAW_ARCHIVE_KEEP):
+        if compression not in _EXTENSIONS:
+            raise ValueError(f"Unknown RAW_ARCHIVE_COMPRESSION '{compression}'. Use zstd or gzip")
+        if compression == "zstd" and zstandard is None:
+            logger.warning("⚠️ zstandard not installed, archiving raw responses with gzip")
+            compression = "gzip"
+        self.root = root
+        self.compression = compression
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def _user_dir(self, platform: str, username: str) -> str:
+        # Quoting keeps usernames from escaping the archive directory
+        return os.path.join(self.root, quote(platform.lower(), safe=""), quote(username.strip().lower(), safe=""))
+
+    def save(self, platform: str, username: str, responses: Dict[str, Any],
+             fetched_at: Optional[datetime] = None) -> str:
+        """
+        Archive the responses of one fetch.
+
+        Args:
+            platform: Platform name
+            username: Platform username
+            responses: Response name -> httpx/requests response, or an
+                already archived {"url", "status", "text"} dict; None
+                values (requests that were not made) are left out
+            fetched_at: Fetch time (default: now)
+
+        Returns:
+            Path of the written file
+        """
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        record = {
+            "platform": platform,
+            "username": username,
+            "fetched_at": fetched_at.isoformat(),
+            "responses": {
+                name: response if isinstance(response, dict) else _raw_response(response)
+                for name, response in responses.items() if response is not None
+            },
+        }
+        data = _compress(json.dumps(record).encode("utf-8"), self.compression)
+
+        directory = self._user_dir(platform, username)
+        path = os.path.join(directory, fetched_at.strftime(FETCH_TIME_FORMAT) + _EXTENSIONS[self.compression])
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename, so readers never see a partial file
+        temp_path = path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+        if self.keep > 0:
+            with self._lock:
+                for old in self.fetches(platform, username)[:-self.keep]:
+                    try:
+                        os.remove(old)
+                    except OSError:
+                        pass
+        return path
+
+    def fetches(self, platform: str, username: str) -> List[str]:
+        """Paths of a user's archived fetches, oldest first."""
+        directory = self._user_dir(platform, username)
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(directory, name) for name in sorted(names)
+            if name.endswith(tuple(_EXTENSIONS.values()))
+        ]
+
+    def load(self, path: str) -> Dict[str, Any]:
+        with open(path, "rb") as f:
+            return json.loads(_decompress(path, f.read()))
+
+    def latest(self, platform: str, username: str) -> Optional[Dict[str, Any]]:
+        """Newest archived fetch of a user, or None if there is none."""
+        fetches = self.fetches(platform, username)
+        return self.load(fetches[-1]) if fetches else None
+
+
+_default_archive: Optional[RawArchive] = None
+_default_lock = threading.Lock()
+
+
+def get_raw_archive() -> RawArchive:
+    """Get the process-wide RawArchive, creating it on first use."""
+    global _default_archive
+    with _default_lock:
+        if _default_archive is None:
+            _default_archive = RawArchive()
+        return _default_archive
+
+
+def archive_responses(platform: str, username: str, responses: Dict[str, Any]) -> None:
+    """
+    Archive a successful fetch if RAW_ARCHIVE_ENABLED. Failures are logged,
+    never raised, so archiving cannot fail a scrape.
+    """
+    if not RAW_ARCHIVE_ENABLED:
+        return
+    try:
+        get_raw_archive().save(platform, username, responses)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not archive {platform} responses for {username}: {str(e)}")
+
+
+async def archive_responses_async(platform: str, username: str, responses: Dict[str, Any]) -> None:
+    """archive_responses() off the event loop."""
+    if RAW_ARCHIVE_ENABLED:
+        await asyncio.to_thread(archive_responses, platform, username, responses)
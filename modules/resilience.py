@@ -0,0 +1,310 @@
+"""
+Shared retry, Retry-After and circuit-breaker policy for upstream requests.
+
+Every scraper request goes through request() / async_request() (or call() /
+async_call() for a custom send function), which:
+
+- reports each attempt to modules.upstream_status, so the adaptive
+  concurrency controller sees retried failures too
+- retries transport failures and 429/5xx responses up to RETRY_MAX_ATTEMPTS
+  times with full-jitter exponential backoff, waiting for the upstream's
+  Retry-After instead when it sends one
+- keeps a circuit breaker per platform: after CIRCUIT_FAILURE_THRESHOLD
+  consecutive failed attempts (transport failures, 5xx) the circuit opens
+  and requests fail immediately with CircuitOpenError for
+  CIRCUIT_RESET_SECONDS; then a single probe request decides whether it
+  closes again. A Retry-After longer than RETRY_AFTER_MAX opens it for that
+  long as well.
+
+During an outage a batch run thus fails its remaining tasks for the
+platform in microseconds instead of each waiting out its timeouts.
+Set RETRY_MAX_ATTEMPTS=1 to disable retries and CIRCUIT_FAILURE_THRESHOLD=0
+to disable the breaker.
+"""
+
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from .http_client import get_client
+from .upstream_status import record_exception, record_response
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", 3))
+RETRY_BASE_DELAY = float(os.environ.get("RETRY_BASE_DELAY", 0.5))
+RETRY_MAX_DELAY = float(os.environ.get("RETRY_MAX_DELAY", 8))
+
+# Longest Retry-After (seconds) waited for; longer ones open the circuit
+RETRY_AFTER_MAX = float(os.environ.get("RETRY_AFTER_MAX", 30))
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", 30))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+PLATFORM_ALIASES = {"geeksforgeeks": "gfg"}
+
+
+class CircuitOpenError(httpx.HTTPError):
+    """A request was refused without being sent because the platform's circuit is open."""
+
+    def __init__(self, platform: str, retry_in: float):
+        super().__init__(f"{platform} circuit open after repeated upstream failures, retry in {retry_in:.0f}s")
+        self.platform = platform
+        self.retry_in = retry_in
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value: Delay in seconds or an HTTP date
+
+    Returns:
+        Seconds to wait (0 for dates in the past), or None if missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+# ======================================================
+# CIRCUIT BREAKER
+# ======================================================
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker of one platform. Thread-safe."""
+
+    def __init__(self, platform: str, threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.platform = platform
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self._open = False
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; lets one probe through once the open period ends."""
+        if self.threshold <= 0:
+            return True
+        with self._lock:
+            if not self._open:
+                return True
+            if time.monotonic() < self._open_until or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def retry_in(self) -> float:
+        with self._lock:
+            return self._retry_in()
+
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._open
+
+    def success(self) -> None:
+        with self._lock:
+            if self._open:
+                logger.info(f"✓ {self.platform} circuit closed")
+            self.failures = 0
+            self._open = False
+            self._probing = False
+
+    def failure(self) -> None:
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            self.failures += 1
+            if self._probing or (not self._open and self.failures >= self.threshold):
+                self._trip(self.reset_seconds, f"{self.failures} consecutive failures")
+
+    def hold(self, seconds: float) -> None:
+        """Open the circuit for `seconds`, e.g. for a long Retry-After."""
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            self._trip(max(seconds, self._retry_in()), "Retry-After")
+
+    def release(self) -> None:
+        """End a probe that produced neither a success nor a failure."""
+        with self._lock:
+            self._probing = False
+
+    def _retry_in(self) -> float:
+        # Called with the lock held
+        return max(0.0, self._open_until - time.monotonic()) if self._open else 0.0
+
+    def _trip(self, seconds: float, reason: str) -> None:
+        # Called with the lock held
+        if not self._open or self._probing:
+            logger.warning(f"⚡ {self.platform} circuit open for {seconds:g}s ({reason})")
+        self._open = True
+        self._probing = False
+        self._open_until = time.monotonic() + seconds
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(platform: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker of a platform, creating it on first use."""
+    platform = PLATFORM_ALIASES.get(platform.lower(), platform.lower())
+    with _breakers_lock:
+        breaker = _breakers.get(platform)
+        if breaker is None:
+            breaker = CircuitBreaker(platform)
+            _breakers[platform] = breaker
+        return breaker
+
+
+# ======================================================
+# REQUESTS
+# ======================================================
+
+def _retry_delay(breaker: CircuitBreaker, response: Any, attempt: int) -> Optional[float]:
+    """
+    Update the breaker from a response and decide whether to retry it.
+
+    Returns:
+        Seconds to wait before the next attempt, or None to return the response
+    """
+    status = response.status_code
+    if status >= 500:
+        breaker.failure()
+    else:
+        # Anything else, 429 included, means the upstream is up
+        breaker.success()
+    if status not in RETRY_STATUSES:
+        return None
+
+    retry_after = parse_retry_after(response.headers.get("retry-after"))
+    if retry_after is None:
+        return backoff_delay(attempt)
+    if retry_after > RETRY_AFTER_MAX:
+        breaker.hold(retry_after)
+        return None
+    return retry_after
+
+
+def call(platform: str, send: Callable[[], Any], attempts: Optional[int] = None) -> Any:
+    """
+    Send a request under the platform's retry and circuit-breaker policy.
+
+    Args:
+        platform: Platform name ("leetcode", "github", "codechef", "gfg")
+        send: Sends the request and returns its httpx/requests response
+        attempts: Maximum attempts (default RETRY_MAX_ATTEMPTS)
+
+    Returns:
+        The last response; it may still be an error status
+
+    Raises:
+        CircuitOpenError: The circuit is open and nothing was sent
+        httpx.TransportError: The last attempt failed to get a response
+    """
+    platform = PLATFORM_ALIASES.get(platform.lower(), platform.lower())
+    breaker = get_circuit_breaker(platform)
+    attempts = max(1, attempts or RETRY_MAX_ATTEMPTS)
+
+    for attempt in range(1, attempts + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(platform, breaker.retry_in())
+        try:
+            response = record_response(platform, send())
+        except httpx.TransportError as e:
+            record_exception(platform, e)
+            breaker.failure()
+            if attempt == attempts or breaker.is_open():
+                raise
+            delay = backoff_delay(attempt)
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            delay = _retry_delay(breaker, response, attempt)
+            if delay is None or attempt == attempts or breaker.is_open():
+                return response
+            response.close()
+        time.sleep(delay)
+
+
+async def async_call(platform: str, send: Callable[[], Awaitable[Any]], attempts: Optional[int] = None) -> Any:
+    """
+    Async variant of call(): `send` returns a coroutine and waits use asyncio.sleep.
+    """
+    platform = PLATFORM_ALIASES.get(platform.lower(), platform.lower())
+    breaker = get_circuit_breaker(platform)
+    attempts = max(1, attempts or RETRY_MAX_ATTEMPTS)
+
+    for attempt in range(1, attempts + 1):
+        if not breaker.allow():
+            raise CircuitOpenError(platform, breaker.retry_in())
+        try:
+            response = record_response(platform, await send())
+        except httpx.TransportError as e:
+            record_exception(platform, e)
+            breaker.failure()
+            if attempt == attempts or breaker.is_open():
+                raise
+            delay = backoff_delay(attempt)
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            delay = _retry_delay(breaker, response, attempt)
+            if delay is None or attempt == attempts or breaker.is_open():
+                return response
+            await response.aclose()
+        await asyncio.sleep(delay)
+
+
+def request(platform: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Send a request over the platform's pooled client (http_client.get_client) with call().
+
+    Args:
+        platform: Platform name
+        method: HTTP method
+        url: Request URL
+        **kwargs: Passed to httpx.Client.request (headers, json, timeout, ...)
+    """
+    client = get_client(platform)
+    return call(platform, lambda: client.request(method, url, **kwargs))
+
+
+async def async_request(client: httpx.AsyncClient, platform: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request over `client` with async_call()."""
+    return await async_call(platform, lambda: client.request(method, url, **kwargs))
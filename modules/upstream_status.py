@@ -0,0 +1,89 @@
+"""
+Structured reporting of upstream HTTP outcomes.
+
+The scrapers turn upstream failures into platform-specific error shapes (an
+exception, a printed "Error:", a status string), which hides throttling from
+anything trying to react to it. Every scraper therefore also reports each
+response's status code and latency here, and transport failures (timeouts,
+refused connections) as a status of None. Interested components, such as the
+adaptive concurrency controller, subscribe with add_listener().
+
+Listeners are called synchronously on the requesting thread or event loop, so
+they must be cheap and must not raise.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, List, Optional
+
+import httpx
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Responses meaning "slow down"
+THROTTLE_STATUSES = (429, 503)
+
+# Listener signature: (platform, status or None, elapsed seconds or None)
+StatusListener = Callable[[str, Optional[int], Optional[float]], None]
+
+_listeners: List[StatusListener] = []
+_listeners_lock = threading.Lock()
+
+
+def add_listener(listener: StatusListener) -> None:
+    """Subscribe to upstream outcomes of every platform."""
+    with _listeners_lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def remove_listener(listener: StatusListener) -> None:
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def record(platform: str, status: Optional[int], elapsed: Optional[float]) -> None:
+    """
+    Publish one upstream outcome to all listeners.
+
+    Args:
+        platform: Platform name ("leetcode", "github", "codechef", "gfg")
+        status: HTTP status code, or None if no response was received
+        elapsed: Seconds from sending the request to receiving the response
+    """
+    with _listeners_lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        try:
+            listener(platform, status, elapsed)
+        except Exception as e:
+            logger.error(f"Upstream status listener failed: {str(e)}")
+
+
+def record_response(platform: str, response: Any) -> Any:
+    """
+    Publish a requests or httpx response and return it unchanged, so calls
+    can be wrapped inline: resp = record_response("github", requests.get(...)).
+    """
+    elapsed = getattr(response, "elapsed", None)
+    try:
+        seconds = elapsed.total_seconds() if elapsed is not None else None
+    except RuntimeError:
+        # httpx only knows elapsed once the response has been read
+        seconds = None
+    record(platform, response.status_code, seconds)
+    return response
+
+
+def record_exception(platform: str, error: BaseException) -> None:
+    """
+    Publish a failed request if `error` is a transport failure.
+
+    HTTP status errors were already published with their response, and
+    parsing errors say nothing about the upstream's health, so both are
+    ignored.
+    """
+    if isinstance(error, (requests.Timeout, requests.ConnectionError, httpx.TransportError)):
+        record(platform, None, None)
@@ -0,0 +1,294 @@
+"""
+Adaptive (AIMD) per-platform concurrency control.
+
+A fixed worker count is either too timid for an upstream that is healthy today
+or too aggressive for one that is throttling. Each platform instead gets an
+AIMDLimiter fed by the upstream outcomes the scrapers report through
+modules.upstream_status:
+
+- additive increase: every healthy, fast response grows the limit by
+  1/limit, i.e. about +1 per round of requests, as long as the limit is
+  actually the bottleneck
+- multiplicative decrease: a 429/503 or a transport failure (timeout,
+  refused connection) multiplies the limit by AIMD_DECREASE_FACTOR, at most
+  once per cooldown so a burst of throttled responses counts as one signal
+- responses slower than the platform's latency target hold the limit
+
+The lane worker counts (utils.lanes, utils.async_engine) remain the ceilings;
+the limiters decide how many of those workers may hit the upstream at once.
+Limits can be tuned per platform with environment variables, e.g.:
+
+    AIMD_CODECHEF_INITIAL=1
+    AIMD_CODECHEF_MAX=4
+    AIMD_CODECHEF_LATENCY_TARGET=5
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Optional
+
+from modules.resilience import call
+from modules.upstream_status import THROTTLE_STATUSES, add_listener
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+DEFAULT_AIMD_CONFIG = {
+    "leetcode": {"initial": 2, "min": 1, "max": 8, "latency_target": 3.0},
+    "github": {"initial": 4, "min": 1, "max": 32, "latency_target": 2.0},
+    "codechef": {"initial": 1, "min": 1, "max": 4, "latency_target": 5.0},
+    "gfg": {"initial": 2, "min": 1, "max": 8, "latency_target": 5.0},
+}
+
+# Used for platforms missing from DEFAULT_AIMD_CONFIG
+FALLBACK_AIMD_CONFIG = {"initial": 1, "min": 1, "max": 2, "latency_target": 5.0}
+
+# Platform names used outside the scrapers (e.g. the filtering scripts)
+PLATFORM_ALIASES = {"geeksforgeeks": "gfg"}
+
+AIMD_ENABLED = os.environ.get("AIMD_ENABLED", "true").strip().lower() == "true"
+AIMD_DECREASE_FACTOR = float(os.environ.get("AIMD_DECREASE_FACTOR", 0.5))
+
+
+def load_aimd_config() -> Dict[str, Dict[str, float]]:
+    """
+    Build the per-platform AIMD table, applying environment overrides.
+
+    Returns:
+        Dictionary mapping platform name to {"initial", "min", "max", "latency_target"}
+    """
+    config = {}
+    for platform, defaults in DEFAULT_AIMD_CONFIG.items():
+        prefix = f"AIMD_{platform.upper()}"
+        config[platform] = {
+            key: float(os.environ.get(f"{prefix}_{key.upper()}", default))
+            for key, default in defaults.items()
+        }
+    return config
+
+
+def _normalize_platform(platform: str) -> str:
+    platform = (platform or "").lower()
+    return PLATFORM_ALIASES.get(platform, platform)
+
+
+# ======================================================
+# LIMITER
+# ======================================================
+
+class AIMDLimiter:
+    """
+    Concurrency limit for one platform, adjusted by AIMD. Thread-safe.
+
+    Callers take a slot with acquire()/acquire_async() before issuing
+    requests and give it back with release().
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial: float,
+        minimum: float,
+        maximum: float,
+        latency_target: Optional[float] = None,
+        decrease_factor: float = AIMD_DECREASE_FACTOR
+    ):
+        if minimum < 1 or maximum < minimum:
+            raise ValueError("AIMD limits must satisfy 1 <= min <= max")
+
+        self.name = name
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.limit = min(max(initial, minimum), maximum)
+        self.in_flight = 0
+        self.throttled = 0
+        # One decrease per cooldown: responses to requests sent before the
+        # first throttle signal must not shrink the limit again
+        self.cooldown = latency_target or 1.0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free under the current limit."""
+        with self._cond:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a slot is free and take it.
+
+        Args:
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if a slot was taken, False if the timeout expired first
+        """
+        with self._cond:
+            acquired = self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout)
+            if acquired:
+                self.in_flight += 1
+            return acquired
+
+    async def acquire_async(self, poll_interval: float = 0.05) -> None:
+        """Wait without blocking the event loop until a slot is free and take it."""
+        while not self.try_acquire():
+            await asyncio.sleep(poll_interval)
+
+    def release(self) -> None:
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            self._cond.notify()
+
+    def on_response(self, status: Optional[int], elapsed: Optional[float]) -> None:
+        """
+        Adjust the limit from one upstream outcome.
+
+        Args:
+            status: HTTP status code, or None for a transport failure
+            elapsed: Response latency in seconds, if known
+        """
+        with self._cond:
+            if status is None or status in THROTTLE_STATUSES:
+                self.throttled += 1
+                now = time.monotonic()
+                if now - self._last_decrease < self.cooldown:
+                    return
+                self._last_decrease = now
+                previous = self.limit
+                self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                logger.warning(
+                    f"{self.name} upstream {'failed' if status is None else f'returned {status}'}: "
+                    f"concurrency {previous:.1f} -> {self.limit:.1f}"
+                )
+                return
+
+            slow = (
+                self.latency_target is not None
+                and elapsed is not None
+                and elapsed > self.latency_target
+            )
+            # Only grow while the limit is what holds the workers back
+            if status < 500 and not slow and self.in_flight >= int(self.limit):
+                grown = min(self.maximum, self.limit + 1 / self.limit)
+                if int(grown) > int(self.limit):
+                    self._cond.notify()
+                self.limit = grown
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "throttled": self.throttled,
+            }
+
+
+# ======================================================
+# CONTROLLER
+# ======================================================
+
+class AdaptiveConcurrency:
+    """
+    Holds one AIMDLimiter per platform and feeds it the outcomes published
+    through modules.upstream_status.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Dict[str, float]]] = None, enabled: bool = AIMD_ENABLED):
+        self.config = config if config is not None else load_aimd_config()
+        self.enabled = enabled
+        self._limiters: Dict[str, AIMDLimiter] = {}
+        self._lock = threading.Lock()
+        add_listener(self.on_response)
+
+    def limiter(self, platform: str) -> AIMDLimiter:
+        """Get (creating on first use) the limiter for a platform."""
+        platform = _normalize_platform(platform)
+        with self._lock:
+            if platform not in self._limiters:
+                config = self.config.get(platform, FALLBACK_AIMD_CONFIG)
+                self._limiters[platform] = AIMDLimiter(
+                    platform or "unknown",
+                    initial=config["initial"],
+                    minimum=config["min"],
+                    maximum=config["max"],
+                    latency_target=config.get("latency_target")
+                )
+            return self._limiters[platform]
+
+    def on_response(self, platform: str, status: Optional[int], elapsed: Optional[float]) -> None:
+        self.limiter(platform).on_response(status, elapsed)
+
+    @contextmanager
+    def slot(self, platform: str):
+        """Hold one of the platform's concurrency slots for the duration of the block."""
+        if not self.enabled:
+            yield
+            return
+        limiter = self.limiter(platform)
+        limiter.acquire()
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    @asynccontextmanager
+    async def slot_async(self, platform: str):
+        """Async counterpart of slot()."""
+        if not self.enabled:
+            yield
+            return
+        limiter = self.limiter(platform)
+        await limiter.acquire_async()
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Current limit, in-flight count and throttle count per platform."""
+        with self._lock:
+            limiters = dict(self._limiters)
+        return {platform: limiter.snapshot() for platform, limiter in limiters.items()}
+
+
+_default_controller: Optional[AdaptiveConcurrency] = None
+_default_lock = threading.Lock()
+
+
+def get_adaptive_concurrency() -> AdaptiveConcurrency:
+    """Get the process-wide AdaptiveConcurrency, creating it on first use."""
+    global _default_controller
+    with _default_lock:
+        if _default_controller is None:
+            _default_controller = AdaptiveConcurrency()
+        return _default_controller
+
+
+def adaptive_request(platform: str, request_fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Issue one HTTP request under the platform's adaptive limit and the shared
+    retry and circuit-breaker policy (modules.resilience), reporting each
+    attempt, for callers that do not go through the scraper modules.
+
+    Args:
+        platform: Platform name
+        request_fn: e.g. get_client(platform).get
+        *args, **kwargs: Passed to request_fn
+
+    Returns:
+        The response of request_fn's last attempt
+    """
+    with get_adaptive_concurrency().slot(platform):
+        return call(_normalize_platform(platform), lambda: request_fn(*args, **kwargs))
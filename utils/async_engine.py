@@ -0,0 +1,168 @@
+"""
+Asyncio batch engine for the scraper.
+
+Counterpart of utils.lanes for the async scrapers: every platform gets its own
+lane made of a bounded asyncio.Queue drained by a fixed number of consumer
+coroutines, all sharing one httpx.AsyncClient per platform. Hundreds of
+in-flight requests then cost coroutines rather than OS threads. As in
+utils.lanes, a full lane queue overflows into a bounded buffer, so one slow
+platform does not starve the other lanes; the feeder only waits once that
+lane's overflow buffer (overflow_size tasks) is full as well.
+
+Per-platform concurrency can be overridden with environment variables:
+
+    ASYNC_GITHUB_CONCURRENCY=50
+"""
+
+import os
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from modules.http_client import AsyncClientPool
+from utils.lanes import DEFAULT_OVERFLOW_SIZE, FALLBACK_LANE, FALLBACK_LANE_CONFIG, load_lane_config
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+DEFAULT_ASYNC_CONCURRENCY = {
+    "leetcode": 20,
+    "github": 50,
+    "codechef": 10,
+    "gfg": 20,
+    FALLBACK_LANE: 1,
+}
+
+# Sentinel telling a lane consumer to exit
+_STOP = object()
+
+AsyncWorkerFn = Callable[[Dict[str, Any], AsyncClientPool, float], Awaitable[Dict[str, Any]]]
+
+
+def load_async_concurrency() -> Dict[str, int]:
+    """
+    Build the per-platform coroutine concurrency table, applying env overrides.
+
+    Returns:
+        Dictionary mapping lane name to number of consumer coroutines
+    """
+    return {
+        platform: int(os.environ.get(f"ASYNC_{platform.upper()}_CONCURRENCY", default))
+        for platform, default in DEFAULT_ASYNC_CONCURRENCY.items()
+    }
+
+
+# ======================================================
+# ENGINE
+# ======================================================
+
+class AsyncBatchEngine:
+    """Runs an async worker over tasks in per-platform coroutine lanes."""
+
+    def __init__(
+        self,
+        worker_fn: AsyncWorkerFn,
+        concurrency: Optional[Dict[str, int]] = None,
+        lane_config: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        self.worker_fn = worker_fn
+        self.concurrency = concurrency if concurrency is not None else load_async_concurrency()
+        self.lane_config = lane_config if lane_config is not None else load_lane_config()
+
+    def _lane_name(self, task: Dict[str, Any]) -> str:
+        platform = (task.get("platform") or "").lower()
+        return platform if platform in self.lane_config else FALLBACK_LANE
+
+    async def run(
+        self,
+        tasks: Iterable[Dict[str, Any]],
+        on_result: Callable[[Dict[str, Any]], None],
+        on_error: Callable[[Dict[str, Any], Exception], None]
+    ) -> None:
+        """
+        Process every task through its platform lane and wait for completion.
+
+        Args:
+            tasks: Iterable of task dictionaries with a "platform" key; may
+                block between items
+            on_result: Called with each worker_fn return value
+            on_error: Called with (task, exception) when worker_fn raises
+        """
+        pool = AsyncClientPool()
+        queues: Dict[str, asyncio.Queue] = {}
+        overflows: Dict[str, deque] = {}
+        overflow_limits: Dict[str, int] = {}
+        # Notified when a lane's overflow buffer has room again
+        overflow_space: Dict[str, asyncio.Condition] = {}
+        consumers = []
+
+        async def put(name: str, task: Any) -> None:
+            lane_queue, overflow = queues[name], overflows[name]
+            if len(overflow) >= overflow_limits[name]:
+                async with overflow_space[name]:
+                    await overflow_space[name].wait_for(lambda: len(overflow) < overflow_limits[name])
+            # Once anything overflowed, later tasks queue behind it to keep order
+            if not overflow:
+                try:
+                    lane_queue.put_nowait(task)
+                    return
+                except asyncio.QueueFull:
+                    pass
+            overflow.append(task)
+
+        async def consume(name: str, timeout: float) -> None:
+            lane_queue, overflow = queues[name], overflows[name]
+            while True:
+                task = await lane_queue.get()
+                if overflow and not lane_queue.full():
+                    while overflow and not lane_queue.full():
+                        lane_queue.put_nowait(overflow.popleft())
+                    async with overflow_space[name]:
+                        overflow_space[name].notify_all()
+                if task is _STOP:
+                    return
+                try:
+                    on_result(await self.worker_fn(task, pool, timeout))
+                except Exception as e:
+                    try:
+                        on_error(task, e)
+                    except Exception:
+                        logger.exception(f"Error handler failed in async {name} lane")
+
+        # Tasks may come from a blocking stream (e.g. BoundedTaskStream), so
+        # pull them in a worker thread instead of on the event loop.
+        task_iter = iter(tasks)
+
+        try:
+            while True:
+                task = await asyncio.to_thread(next, task_iter, _STOP)
+                if task is _STOP:
+                    break
+                name = self._lane_name(task)
+                if name not in queues:
+                    config = self.lane_config.get(name, FALLBACK_LANE_CONFIG)
+                    queues[name] = asyncio.Queue(maxsize=max(1, int(config["queue_size"])))
+                    overflows[name] = deque()
+                    overflow_limits[name] = max(1, int(config.get("overflow_size", DEFAULT_OVERFLOW_SIZE)))
+                    overflow_space[name] = asyncio.Condition()
+                    count = max(1, self.concurrency.get(name, 1))
+                    for _ in range(count):
+                        consumers.append(asyncio.create_task(
+                            consume(name, float(config["timeout"]))
+                        ))
+                    logger.info(f"Started async {name} lane with {count} coroutines")
+                await put(name, task)
+
+            for name in queues:
+                for _ in range(max(1, self.concurrency.get(name, 1))):
+                    await put(name, _STOP)
+
+            await asyncio.gather(*consumers)
+        finally:
+            for consumer in consumers:
+                consumer.cancel()
+            await pool.aclose()
@@ -2,6 +2,7 @@
 GFG Scraper - BeautifulSoup based (API + UI scraping)
 """
 
+import os
 import asyncio
 import logging
 import json
@@ -18,8 +19,12 @@ logger = logging.getLogger(__name__)
 # CONFIG
 # ======================================================
 
-GFG_SUBMISSION_API = "https://practiceapi.geeksforgeeks.org/api/v1/user/problems/submissions/"
-GFG_PROFILE_PAGE = "https://www.geeksforgeeks.org/user/{username}/"
+# Point at a stand-in (benchmarks/upstream_standin.py) for offline load tests
+GFG_API_BASE_URL = os.environ.get("GFG_API_BASE_URL", "https://practiceapi.geeksforgeeks.org").rstrip("/")
+GFG_BASE_URL = os.environ.get("GFG_BASE_URL", "https://www.geeksforgeeks.org").rstrip("/")
+
+GFG_SUBMISSION_API = f"{GFG_API_BASE_URL}/api/v1/user/problems/submissions/"
+GFG_PROFILE_PAGE = GFG_BASE_URL + "/user/{username}/"
 
 MAX_CONCURRENT_REQUESTS = 10
 BATCH_SIZE = 10
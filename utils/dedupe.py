@@ -0,0 +1,60 @@
+"""
+Collapsing of duplicate scrape tasks.
+
+The same handle often appears in several coding_stats documents (a student
+registered under two institutions, a re-import). Tasks that share a
+(platform, normalized username) key are collapsed into one: the first task
+leads, the others ride along in its "duplicates" list, the profile is scraped
+once and the result is fanned out to every document.
+"""
+
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Collapse duplicate (platform, username) tasks within the scheduling window
+SCRAPE_DEDUPE = os.environ.get("SCRAPE_DEDUPE", "true").strip().lower() == "true"
+
+DUPLICATES_FIELD = "duplicates"
+
+
+def dedupe_key(task: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    Key identifying the upstream profile a task scrapes.
+
+    Usernames on all supported platforms are case-insensitive, so they are
+    compared stripped and lowercased.
+
+    Returns:
+        (platform, username) tuple, or None if either is missing
+    """
+    platform = (task.get("platform") or "").strip().lower()
+    username = (task.get("username") or "").strip().lower()
+    if not platform or not username:
+        return None
+    return platform, username
+
+
+def add_duplicate(leader: Dict[str, Any], task: Dict[str, Any]) -> None:
+    """Attach `task` to `leader` so it receives the leader's scrape result."""
+    leader.setdefault(DUPLICATES_FIELD, []).append(task)
+
+
+def duplicates_of(task: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Tasks collapsed into `task` (empty if none)."""
+    return task.get(DUPLICATES_FIELD) or []
+
+
+def promote_duplicate(task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Make the first duplicate of `task` the leader of the remaining ones,
+    for when the original leader cannot be processed.
+
+    Returns:
+        New leader task, or None if `task` has no duplicates
+    """
+    duplicates = duplicates_of(task)
+    if not duplicates:
+        return None
+    leader = dict(duplicates[0])
+    leader[DUPLICATES_FIELD] = duplicates[1:]
+    return leader
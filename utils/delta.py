@@ -0,0 +1,95 @@
+"""
+Field-level delta updates for coding_stats documents.
+
+When a scrape does change, it is usually a calendar day or a contest or two,
+yet a set(merge=True) resends the whole 366-entry calendar and every contest.
+delta_update() compares the new update with the stored document and keeps
+only what changed, keyed by Firestore field path, for use with update():
+
+    {"calendar.`2026-10-16`": 3, "problems_solved": 412}
+
+Semantics match the set(merge=True) it replaces: map keys missing from the
+new scrape are left untouched, and arrays are written whole, except that an
+array which only grew at the end is extended with ArrayUnion.
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from firebase_admin.firestore import DELETE_FIELD, ArrayUnion
+from google.cloud.firestore_v1.field_path import FieldPath
+
+# Write changed documents as field-level deltas (false: full merge writes)
+DELTA_UPDATES = os.environ.get("DELTA_UPDATES", "true").strip().lower() == "true"
+
+# Above this many changed paths a full merge write is sent instead
+DELTA_MAX_PATHS = int(os.environ.get("DELTA_MAX_PATHS", 200))
+
+
+def _field_path(parts: Tuple[str, ...]) -> str:
+    """Encode path segments as a Firestore field path, quoting as needed."""
+    return FieldPath(*parts).to_api_repr()
+
+
+def _appended(previous: list, current: list) -> Optional[list]:
+    """
+    Items appended to `previous` to give `current`, if that is all that
+    changed and ArrayUnion would reproduce `current` exactly.
+    """
+    if not previous or len(current) <= len(previous) or current[:len(previous)] != previous:
+        return None
+    added = current[len(previous):]
+    # ArrayUnion skips values already present, so duplicates would be lost
+    for index, item in enumerate(added):
+        if item in previous or item in added[:index]:
+            return None
+    return added
+
+
+def _diff(previous: Any, current: Any, parts: Tuple[str, ...], out: Dict[str, Any]) -> None:
+    if isinstance(current, dict) and isinstance(previous, dict):
+        for key, value in current.items():
+            key = str(key)
+            if key not in previous:
+                out[_field_path(parts + (key,))] = value
+            elif previous[key] != value:
+                _diff(previous[key], value, parts + (key,), out)
+        return
+
+    if isinstance(current, list) and isinstance(previous, list):
+        added = _appended(previous, current)
+        if added is not None:
+            out[_field_path(parts)] = ArrayUnion(added)
+            return
+
+    out[_field_path(parts)] = current
+
+
+def delta_update(previous: Dict[str, Any], update: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Reduce a merge update to the field paths that differ from the stored document.
+
+    Args:
+        previous: Stored document data (DocumentSnapshot.to_dict())
+        update: Full update that would be written with set(merge=True);
+            sentinels such as DELETE_FIELD are passed through
+
+    Returns:
+        Field-path keyed dictionary for DocumentReference.update(), or None
+        when more than DELTA_MAX_PATHS paths changed and a full write is
+        cheaper
+    """
+    out: Dict[str, Any] = {}
+    for key, value in update.items():
+        if key in previous and previous[key] == value:
+            continue
+        if value is DELETE_FIELD and key not in previous:
+            continue
+        if key in previous and isinstance(value, (dict, list)):
+            _diff(previous[key], value, (key,), out)
+        else:
+            out[_field_path((key,))] = value
+
+    if len(out) > DELTA_MAX_PATHS:
+        return None
+    return out
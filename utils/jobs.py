@@ -0,0 +1,240 @@
+"""
+Background job management for long-running batch scrapes.
+
+The /scrape-coding-stats endpoint enqueues a job on a managed executor and
+returns immediately; callers poll /jobs/{id} for progress counters,
+throughput and ETA instead of holding an HTTP request open for the whole run.
+"""
+
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class Job:
+    """Progress and outcome of one background job. Safe to update from any thread."""
+
+    def __init__(self, kind: str, params: Optional[Dict[str, Any]] = None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params or {}
+        self.status = QUEUED
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.total: Optional[int] = None
+        self.total_final = False
+        self.successful = 0
+        self.failed = 0
+        self.skipped = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def completed(self) -> int:
+        return self.successful + self.failed + self.skipped
+
+    def set_total(self, total: int) -> None:
+        """Set the final number of tasks the job will process."""
+        with self._lock:
+            self.total = total
+            self.total_final = True
+
+    def add_total(self, count: int = 1) -> None:
+        """Count newly discovered tasks while the task stream is still being read."""
+        with self._lock:
+            self.total = (self.total or 0) + count
+
+    def finalize_total(self) -> None:
+        """Mark the discovered total as complete (the task stream is exhausted)."""
+        with self._lock:
+            self.total = self.total or 0
+            self.total_final = True
+
+    def record(self, outcome: str) -> None:
+        """
+        Count one finished task.
+
+        Args:
+            outcome: "successful", "failed" or "skipped"
+        """
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Snapshot of the job for the status endpoint.
+
+        Returns:
+            Dictionary with status, counters, throughput (tasks/second) and
+            ETA in seconds (None until the total is final and a rate is known)
+        """
+        with self._lock:
+            completed = self.completed
+            end = self.finished_at or datetime.utcnow()
+            elapsed = (end - self.started_at).total_seconds() if self.started_at else 0.0
+            throughput = completed / elapsed if elapsed > 0 else 0.0
+
+            eta = None
+            if self.status == RUNNING and self.total_final and throughput > 0:
+                eta = round(max(0, self.total - completed) / throughput, 1)
+            elif self.status == COMPLETED:
+                eta = 0.0
+
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "params": self.params,
+                "status": self.status,
+                "created_at": self.created_at.isoformat(),
+                "started_at": self.started_at.isoformat() if self.started_at else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+                "progress": {
+                    "total": self.total,
+                    "total_final": self.total_final,
+                    "completed": completed,
+                    "successful": self.successful,
+                    "failed": self.failed,
+                    "skipped": self.skipped,
+                },
+                "elapsed_seconds": round(elapsed, 1),
+                "throughput_per_second": round(throughput, 3),
+                "eta_seconds": eta,
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded background executor and keeps recent job records.
+
+    Only the most recent `max_history` jobs are retained; older finished jobs
+    are forgotten.
+    """
+
+    def __init__(self, max_workers: int = 1, max_history: int = 50):
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[[Job], Optional[Dict[str, Any]]],
+        params: Optional[Dict[str, Any]] = None
+    ) -> Job:
+        """
+        Enqueue a job.
+
+        Args:
+            kind: Job type label (e.g. "scrape-coding-stats")
+            fn: Called with the Job on the executor; its return value becomes
+                the job result
+            params: Parameters recorded on the job for display
+
+        Returns:
+            The queued Job
+        """
+        job = Job(kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._start(job, fn)
+        return job
+
+    def submit_unique(
+        self,
+        kind: str,
+        fn: Callable[[Job], Optional[Dict[str, Any]]],
+        params: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Job, bool]:
+        """
+        Enqueue a job unless one of the same kind is already queued or running.
+
+        The check and the insert happen under one lock, so concurrent callers
+        never queue two jobs of the kind.
+
+        Args:
+            kind: Job type label
+            fn: Called with the Job on the executor
+            params: Parameters recorded on the job
+
+        Returns:
+            (job, created): the new job and True, or the active job of the
+            kind and False; compare its params to tell a duplicate request
+            from a conflicting one
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and job.status in ACTIVE_STATES:
+                    return job, False
+            job = Job(kind, params)
+            self._jobs[job.id] = job
+            self._prune()
+        self._start(job, fn)
+        return job, True
+
+    def _start(self, job: Job, fn: Callable[[Job], Optional[Dict[str, Any]]]) -> None:
+        self._executor.submit(self._run, job, fn)
+        logger.info(f"Queued {job.kind} job {job.id}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def active(self, kind: str) -> Optional[Job]:
+        """Get a queued or running job of the given kind, if any."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.kind == kind and job.status in ACTIVE_STATES:
+                    return job
+        return None
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _prune(self) -> None:
+        """Drop the oldest finished jobs beyond max_history (caller holds the lock)."""
+        excess = len(self._jobs) - self.max_history
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].status not in ACTIVE_STATES:
+                del self._jobs[job_id]
+                excess -= 1
+
+    def _run(self, job: Job, fn: Callable[[Job], Optional[Dict[str, Any]]]) -> None:
+        job.status = RUNNING
+        job.started_at = datetime.utcnow()
+        logger.info(f"Started {job.kind} job {job.id}")
+        try:
+            job.result = fn(job)
+            job.status = COMPLETED
+            logger.info(f"Completed {job.kind} job {job.id}")
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+            logger.error(f"{job.kind} job {job.id} failed: {str(e)}")
+        finally:
+            job.finished_at = datetime.utcnow()
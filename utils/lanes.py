@@ -0,0 +1,247 @@
+"""
+Platform-partitioned worker lanes for the batch scraper.
+
+Every platform gets its own lane: a bounded task queue drained by a dedicated
+set of worker threads, with its own upstream request timeout. A backlog of
+slow CodeChef HTML pages then only occupies the CodeChef lane while LeetCode,
+GitHub and GFG keep moving, so total batch time approaches the slowest
+platform's time instead of the sum of all of them.
+
+Tasks arriving while a lane's queue is full wait in the lane's bounded
+overflow buffer, and the lane's workers move them into the queue as it
+drains, so the single task feeder keeps the other lanes busy while one
+platform is slow or throttled. Only when a lane's overflow buffer is full
+too does the feeder block, which keeps memory bounded (at most queue_size +
+overflow_size tasks per lane) instead of draining the whole task stream into
+a stalled lane.
+
+Lane settings can be overridden per platform with environment variables:
+
+    LANE_CODECHEF_WORKERS=2
+    LANE_CODECHEF_QUEUE_SIZE=500
+    LANE_CODECHEF_OVERFLOW_SIZE=2000
+    LANE_CODECHEF_TIMEOUT=10
+"""
+
+import os
+import queue
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Workers are a ceiling: utils.adaptive_concurrency decides how many of them
+# may scrape at once based on the upstream's 429s and latency
+DEFAULT_LANE_CONFIG = {
+    "leetcode": {"workers": 8, "queue_size": 1000, "timeout": 10},
+    "github": {"workers": 16, "queue_size": 1000, "timeout": 10},
+    "codechef": {"workers": 4, "queue_size": 1000, "timeout": 10},
+    "gfg": {"workers": 8, "queue_size": 1000, "timeout": 20},
+}
+
+# Tasks a lane may hold beyond its queue before the feeder blocks
+DEFAULT_OVERFLOW_SIZE = 5000
+
+# Lane used for tasks whose platform has no configured lane
+FALLBACK_LANE = "other"
+FALLBACK_LANE_CONFIG = {"workers": 1, "queue_size": 1000, "timeout": 10}
+
+# Sentinel telling a lane worker to exit
+_STOP = object()
+
+
+def load_lane_config() -> Dict[str, Dict[str, float]]:
+    """
+    Build the per-platform lane table, applying environment overrides.
+
+    Returns:
+        Dictionary mapping lane name to {"workers", "queue_size",
+        "overflow_size", "timeout"}
+    """
+    config = {}
+    for platform, defaults in {**DEFAULT_LANE_CONFIG, FALLBACK_LANE: FALLBACK_LANE_CONFIG}.items():
+        prefix = f"LANE_{platform.upper()}"
+        config[platform] = {
+            "workers": int(os.environ.get(f"{prefix}_WORKERS", defaults["workers"])),
+            "queue_size": int(os.environ.get(f"{prefix}_QUEUE_SIZE", defaults["queue_size"])),
+            "overflow_size": int(os.environ.get(
+                f"{prefix}_OVERFLOW_SIZE", defaults.get("overflow_size", DEFAULT_OVERFLOW_SIZE)
+            )),
+            "timeout": float(os.environ.get(f"{prefix}_TIMEOUT", defaults["timeout"])),
+        }
+    return config
+
+
+# ======================================================
+# LANE
+# ======================================================
+
+class PlatformLane:
+    """
+    A bounded queue with a bounded overflow buffer, plus a fixed pool of
+    worker threads for one platform.
+
+    Each task is passed to worker_fn(task, timeout); its return value goes to
+    on_result, and any exception raised by worker_fn or on_result goes to
+    on_error.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        worker_fn: Callable[[Dict[str, Any], float], Dict[str, Any]],
+        on_result: Callable[[Dict[str, Any]], None],
+        on_error: Callable[[Dict[str, Any], Exception], None],
+        workers: int,
+        queue_size: int,
+        timeout: float,
+        overflow_size: int = DEFAULT_OVERFLOW_SIZE
+    ):
+        self.name = name
+        self.worker_fn = worker_fn
+        self.on_result = on_result
+        self.on_error = on_error
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        self.overflow: "deque[Any]" = deque()
+        self.overflow_size = max(1, overflow_size)
+        # Guards the overflow buffer; notified when it has room again
+        self._overflow_space = threading.Condition()
+        self._threads = []
+
+    def start(self) -> None:
+        """Start the lane's worker threads."""
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._run,
+                name=f"lane-{self.name}-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def put(self, task: Dict[str, Any]) -> None:
+        """Queue a task; it overflows if the queue is full, blocking only while the overflow is full too."""
+        with self._overflow_space:
+            while len(self.overflow) >= self.overflow_size:
+                self._overflow_space.wait()
+            # Once anything overflowed, later tasks queue behind it to keep order
+            if not self.overflow:
+                try:
+                    self.queue.put_nowait(task)
+                    return
+                except queue.Full:
+                    pass
+            self.overflow.append(task)
+
+    def _refill(self) -> None:
+        """Move overflowed tasks into the queue while it has room."""
+        with self._overflow_space:
+            moved = False
+            while self.overflow and not self.queue.full():
+                self.queue.put_nowait(self.overflow.popleft())
+                moved = True
+            if moved:
+                self._overflow_space.notify_all()
+
+    def close(self) -> None:
+        """Signal the workers to exit once the queue is drained."""
+        for _ in self._threads:
+            self.put(_STOP)
+
+    def join(self) -> None:
+        """Wait for all worker threads to exit."""
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            task = self.queue.get()
+            # Refilled after every get, so the queue never runs empty while
+            # tasks wait in the overflow buffer
+            self._refill()
+            if task is _STOP:
+                return
+            try:
+                self.on_result(self.worker_fn(task, self.timeout))
+            except Exception as e:
+                try:
+                    self.on_error(task, e)
+                except Exception:
+                    # A dead worker would leave join() waiting forever
+                    logger.exception(f"Error handler failed in {self.name} lane")
+
+
+# ======================================================
+# SCHEDULER
+# ======================================================
+
+class LaneScheduler:
+    """Routes scraping tasks to their platform's lane and runs all lanes."""
+
+    def __init__(
+        self,
+        worker_fn: Callable[[Dict[str, Any], float], Dict[str, Any]],
+        lane_config: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        self.worker_fn = worker_fn
+        self.lane_config = lane_config if lane_config is not None else load_lane_config()
+
+    def _lane_name(self, task: Dict[str, Any]) -> str:
+        platform = (task.get("platform") or "").lower()
+        return platform if platform in self.lane_config else FALLBACK_LANE
+
+    def run(
+        self,
+        tasks: Iterable[Dict[str, Any]],
+        on_result: Callable[[Dict[str, Any]], None],
+        on_error: Callable[[Dict[str, Any], Exception], None]
+    ) -> None:
+        """
+        Process every task through its platform lane and wait for completion.
+
+        Lanes are created lazily, so platforms with no tasks start no threads.
+        on_result and on_error are called from lane worker threads.
+
+        Args:
+            tasks: Iterable of task dictionaries with a "platform" key
+            on_result: Called with each worker_fn return value
+            on_error: Called with (task, exception) when worker_fn raises
+        """
+        lanes: Dict[str, PlatformLane] = {}
+
+        try:
+            for task in tasks:
+                name = self._lane_name(task)
+                lane = lanes.get(name)
+                if lane is None:
+                    config = self.lane_config.get(name, FALLBACK_LANE_CONFIG)
+                    lane = PlatformLane(
+                        name,
+                        self.worker_fn,
+                        on_result,
+                        on_error,
+                        workers=int(config["workers"]),
+                        queue_size=int(config["queue_size"]),
+                        timeout=float(config["timeout"]),
+                        overflow_size=int(config.get("overflow_size", DEFAULT_OVERFLOW_SIZE))
+                    )
+                    lane.start()
+                    lanes[name] = lane
+                    logger.info(
+                        f"Started {name} lane: {lane.workers} workers, "
+                        f"{lane.timeout}s timeout"
+                    )
+                lane.put(task)
+        finally:
+            for lane in lanes.values():
+                lane.close()
+            for lane in lanes.values():
+                lane.join()
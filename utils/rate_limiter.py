@@ -0,0 +1,212 @@
+"""
+Per-platform token-bucket rate limiting for the batch scraper.
+
+Each platform (leetcode, github, codechef, gfg) gets its own bucket so that
+GitHub's generous API quota is not throttled down to the pace CodeChef's HTML
+pages tolerate. Rates and bursts can be tuned per deployment with environment
+variables, e.g.:
+
+    RATE_LIMIT_CODECHEF_RATE=0.2     # tokens (scrapes) per second
+    RATE_LIMIT_CODECHEF_BURST=2      # maximum tokens saved up while idle
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# One token is spent per scrape (i.e. per scraper call, which may issue
+# several HTTP requests). Rates are in tokens per second.
+DEFAULT_RATE_LIMITS = {
+    "leetcode": {"rate": 0.25, "burst": 3},
+    "github": {"rate": 1.0, "burst": 10},
+    "codechef": {"rate": 0.2, "burst": 2},
+    "gfg": {"rate": 0.5, "burst": 3},
+}
+
+# Used for platforms missing from DEFAULT_RATE_LIMITS
+FALLBACK_RATE_LIMIT = {"rate": 0.2, "burst": 1}
+
+
+def load_rate_limits() -> Dict[str, Dict[str, float]]:
+    """
+    Build the per-platform rate limit table, applying environment overrides.
+
+    Returns:
+        Dictionary mapping platform name to {"rate": float, "burst": float}
+    """
+    limits = {}
+    for platform, defaults in DEFAULT_RATE_LIMITS.items():
+        prefix = f"RATE_LIMIT_{platform.upper()}"
+        limits[platform] = {
+            "rate": float(os.environ.get(f"{prefix}_RATE", defaults["rate"])),
+            "burst": float(os.environ.get(f"{prefix}_BURST", defaults["burst"])),
+        }
+    return limits
+
+
+# ======================================================
+# TOKEN BUCKET
+# ======================================================
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at `rate` per second up to `burst`. Callers
+    block in acquire() until a token is available, so a full bucket allows a
+    short burst and the long-run throughput converges on `rate`.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        if burst < 1:
+            raise ValueError("Token bucket burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add tokens earned since the last refill (caller holds the lock)."""
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens if available without blocking.
+
+        Args:
+            tokens: Number of tokens to take
+
+        Returns:
+            0.0 if the tokens were taken, otherwise the seconds to wait
+            before they will be available
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1, timeout: Optional[float] = None) -> bool:
+        """
+        Block until tokens are available and take them.
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the tokens were taken, False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1) -> None:
+        """
+        Wait without blocking the event loop until tokens are available.
+
+        Args:
+            tokens: Number of tokens to take
+        """
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return
+            await asyncio.sleep(wait)
+
+
+# ======================================================
+# PLATFORM RATE LIMITER
+# ======================================================
+
+class PlatformRateLimiter:
+    """Holds one TokenBucket per platform."""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        self.limits = limits if limits is not None else load_rate_limits()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, platform: str) -> TokenBucket:
+        """
+        Get (creating on first use) the token bucket for a platform.
+
+        Args:
+            platform: Platform name ("leetcode", "github", "codechef", "gfg")
+
+        Returns:
+            TokenBucket for the platform
+        """
+        platform = (platform or "").lower()
+        with self._lock:
+            if platform not in self._buckets:
+                config = self.limits.get(platform, FALLBACK_RATE_LIMIT)
+                self._buckets[platform] = TokenBucket(config["rate"], config["burst"])
+                logger.info(
+                    f"Rate limiter for {platform or 'unknown'}: "
+                    f"{config['rate']}/s, burst {config['burst']}"
+                )
+            return self._buckets[platform]
+
+    def acquire(self, platform: str, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the platform's bucket grants a token.
+
+        Args:
+            platform: Platform name
+            timeout: Maximum seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if a token was granted, False on timeout
+        """
+        return self.bucket(platform).acquire(timeout=timeout)
+
+    async def acquire_async(self, platform: str) -> None:
+        """
+        Wait without blocking the event loop until the platform grants a token.
+
+        Args:
+            platform: Platform name
+        """
+        await self.bucket(platform).acquire_async()
+
+
+_default_limiter: Optional[PlatformRateLimiter] = None
+_default_lock = threading.Lock()
+
+
+def get_rate_limiter() -> PlatformRateLimiter:
+    """Get the process-wide PlatformRateLimiter, creating it on first use."""
+    global _default_limiter
+    with _default_lock:
+        if _default_limiter is None:
+            _default_limiter = PlatformRateLimiter()
+        return _default_limiter
@@ -0,0 +1,235 @@
+"""
+In-process response cache for the on-demand profile endpoints.
+
+/leetcode, /codechef, /gfg and /github scrape live on every hit, so a class
+refreshing the same dashboard repeats identical upstream scrapes. The cache
+keeps each (platform, username) result with a per-platform TTL:
+
+- fresh (younger than the TTL): served from memory
+- stale (within RESPONSE_CACHE_STALE_SECONDS past the TTL): served from
+  memory while one background refresh replaces it
+- older or missing: scraped on the calling thread and stored
+
+Entries are evicted least recently used beyond RESPONSE_CACHE_MAX_ENTRIES.
+Error results are returned but never stored. TTLs are configured per
+platform with environment variables, e.g.:
+
+    RESPONSE_CACHE_TTL_LEETCODE=300   # seconds a result stays fresh
+
+Scrapes of the same profile that overlap (concurrent misses, a miss during a
+refresh) are coalesced into one by utils.single_flight, also when the cache
+itself is disabled.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "true").strip().lower() == "true"
+
+# Seconds a scraped profile is served without revalidation
+DEFAULT_CACHE_TTLS = {
+    "leetcode": 300,
+    "github": 600,
+    "codechef": 600,
+    "gfg": 600,
+}
+
+FALLBACK_CACHE_TTL = 300
+
+# How long past its TTL an entry may still be served while it refreshes
+RESPONSE_CACHE_STALE_SECONDS = float(os.environ.get("RESPONSE_CACHE_STALE_SECONDS", 3600))
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 5000))
+
+# Share one in-flight scrape between concurrent lookups of the same profile
+SINGLE_FLIGHT_ENABLED = os.environ.get("SINGLE_FLIGHT_ENABLED", "true").strip().lower() == "true"
+
+# Threads running stale-while-revalidate refreshes
+RESPONSE_CACHE_REFRESH_WORKERS = int(os.environ.get("RESPONSE_CACHE_REFRESH_WORKERS", 4))
+
+
+def load_cache_ttls() -> Dict[str, float]:
+    """
+    Build the per-platform TTL table, applying environment overrides.
+
+    Returns:
+        Dictionary mapping platform name to TTL in seconds
+    """
+    return {
+        platform: float(os.environ.get(f"RESPONSE_CACHE_TTL_{platform.upper()}", default))
+        for platform, default in DEFAULT_CACHE_TTLS.items()
+    }
+
+
+def is_error_result(result: Any) -> bool:
+    """
+    Whether a scraper result reports a failure: {"error": ...} at the top
+    level or inside the platform's wrapper, e.g. {"codechef": {"error": ...}}.
+    Scrapers return such a result for every failed or partial fetch (never
+    an empty profile), so it is the only failure marker the cache checks.
+    """
+    if not isinstance(result, dict):
+        return True
+    if "error" in result:
+        return True
+    return any(isinstance(value, dict) and "error" in value for value in result.values())
+
+
+# ======================================================
+# CACHE
+# ======================================================
+
+class ResponseCache:
+    """TTL + LRU cache of scraper results with stale-while-revalidate. Thread-safe."""
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        stale_seconds: float = RESPONSE_CACHE_STALE_SECONDS,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        refresh_workers: int = RESPONSE_CACHE_REFRESH_WORKERS
+    ):
+        self.ttls = ttls if ttls is not None else load_cache_ttls()
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        # key -> (stored at monotonic time, result)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: Set[Tuple[str, str]] = set()
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(
+            max_workers=max(1, refresh_workers),
+            thread_name_prefix="cache-refresh"
+        )
+        self.hits = self.stale_hits = self.misses = 0
+
+    @staticmethod
+    def key(platform: str, username: str) -> Tuple[str, str]:
+        return platform.lower(), username.strip().lower()
+
+    def get_or_fetch(self, platform: str, username: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Get a user's result from the cache, scraping it if needed.
+
+        Args:
+            platform: Platform name ("leetcode", "github", "codechef", "gfg")
+            username: Platform username (case-insensitive)
+            fetch: Scrapes and returns the result; called on this thread on a
+                miss, or on a refresh thread for a stale entry
+
+        Returns:
+            Cached or freshly scraped result
+        """
+        key = self.key(platform, username)
+        ttl = self.ttls.get(key[0], FALLBACK_CACHE_TTL)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[0]
+                if age < ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                if age < ttl + self.stale_seconds:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        self._refresher.submit(self._refresh, key, fetch)
+                    return entry[1]
+            self.misses += 1
+
+        result = fetch()
+        self._store(key, result)
+        return result
+
+    def _refresh(self, key: Tuple[str, str], fetch: Callable[[], Any]) -> None:
+        try:
+            if not self._store(key, fetch()):
+                logger.warning(f"Background refresh of {key[0]}:{key[1]} failed, keeping the stale result")
+        except Exception as e:
+            logger.warning(f"Background refresh of {key[0]}:{key[1]} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _store(self, key: Tuple[str, str], result: Any) -> bool:
+        """Store a result unless it is an error; returns whether it was stored."""
+        # A failed scrape keeps serving the previous (stale) result instead
+        if is_error_result(result):
+            return False
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, platform: str, username: str) -> None:
+        with self._lock:
+            self._entries.pop(self.key(platform, username), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+            }
+
+    def close(self) -> None:
+        """Stop the refresh threads, letting running refreshes finish."""
+        self._refresher.shutdown(wait=False)
+
+
+_default_cache: Optional[ResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Get the process-wide ResponseCache, or None if RESPONSE_CACHE_ENABLED is false."""
+    global _default_cache
+    if not RESPONSE_CACHE_ENABLED:
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
+
+
+_profile_flights = SingleFlight()
+
+
+def cached_profile(platform: str, username: str, fetch: Callable[[], Any]) -> Any:
+    """
+    Serve a profile through the process-wide cache, or call fetch() if it is
+    disabled. Overlapping fetches of the same profile share one scrape.
+    """
+    if SINGLE_FLIGHT_ENABLED:
+        key = ResponseCache.key(platform, username)
+        scrape = fetch
+        fetch = lambda: _profile_flights.do(key, scrape)
+
+    cache = get_response_cache()
+    if cache is None:
+        return fetch()
+    return cache.get_or_fetch(platform, username, fetch)
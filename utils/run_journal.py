@@ -0,0 +1,217 @@
+"""
+Durable run journal for checkpoint/resume of batch scrapes.
+
+Every processed task is recorded in a local SQLite file under its run id, so a
+batch killed partway through (platform timeout, deploy, OOM) can be restarted
+and continue with the remaining documents instead of starting over. Only
+successful tasks are skipped on resume; failed ones are tried again:
+
+    runs(run_id, run_key, status, started_at, finished_at)
+    done(run_id, task_id, outcome, finished_at)
+
+A run is identified by a run key (sweep id plus shard). Starting a run resumes
+the latest unfinished run with the same key, or begins a new one when the
+previous run completed.
+
+The journal location is set with RUN_JOURNAL_PATH. It must point at
+persistent storage (a mounted volume) for resume to work across deploys: on
+Vercel, Render and similar hosts the system temp directory, the fallback
+when RUN_JOURNAL_PATH is unset, is wiped on every redeploy or new instance,
+so a journal there only survives restarts of the same instance. Opening a
+journal in the temp directory logs a warning saying so.
+"""
+
+import os
+import uuid
+import sqlite3
+import logging
+import tempfile
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Should be on a persistent volume; see the module docstring
+DEFAULT_JOURNAL_PATH = os.environ.get(
+    "RUN_JOURNAL_PATH",
+    os.path.join(tempfile.gettempdir(), "scrape_run_journal.sqlite3")
+)
+
+# Run states
+RUNNING = "running"
+COMPLETED = "completed"
+
+# Task outcome that counts as done; failed tasks are retried on resume
+SUCCESSFUL = "successful"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    run_key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_key ON runs (run_key, started_at);
+CREATE TABLE IF NOT EXISTS done (
+    run_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    PRIMARY KEY (run_id, task_id)
+);
+"""
+
+
+def is_ephemeral_path(path: str) -> bool:
+    """Whether `path` lies in the system temp directory, which deploys wipe."""
+    temp_dir = os.path.realpath(tempfile.gettempdir())
+    return os.path.realpath(path).startswith(temp_dir + os.sep)
+
+
+def task_id(task: Dict[str, Any]) -> str:
+    """
+    Stable journal id of a task.
+
+    Uses the full Firestore document path, since docIds are only unique
+    within one institution's coding_stats collection.
+    """
+    ref = task.get("firestoreRef")
+    path = getattr(ref, "path", None)
+    return path or f"{task.get('institutionId')}/{task.get('docId')}"
+
+
+class RunJournal:
+    """SQLite-backed record of the tasks each batch run has finished. Thread-safe."""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self.ephemeral = is_ephemeral_path(path)
+        if self.ephemeral:
+            logger.warning(
+                f"⚠️ Run journal is in the temp directory ({path}); interrupted runs only resume "
+                f"on this instance and are lost on redeploy. Set RUN_JOURNAL_PATH to a persistent volume."
+            )
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def start_run(self, run_key: str, run_id: Optional[str] = None, resume: bool = True) -> "JournalRun":
+        """
+        Begin or resume a run.
+
+        Args:
+            run_key: Identifies runs covering the same work (e.g. sweep and shard)
+            run_id: Explicit run id to resume or create
+            resume: Resume the latest unfinished run with this key when no
+                run_id is given (False always starts a new run)
+
+        Returns:
+            JournalRun bound to the selected run id
+        """
+        now = datetime.utcnow().isoformat()
+        with self._lock:
+            if run_id is None and resume:
+                row = self._conn.execute(
+                    "SELECT run_id FROM runs WHERE run_key = ? AND status = ? "
+                    "ORDER BY started_at DESC LIMIT 1",
+                    (run_key, RUNNING)
+                ).fetchone()
+                run_id = row[0] if row else None
+
+            run_id = run_id or uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO runs (run_id, run_key, status, started_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(run_id) DO UPDATE SET status = excluded.status, finished_at = NULL",
+                (run_id, run_key, RUNNING, now)
+            )
+            already_done = self._conn.execute(
+                "SELECT COUNT(*) FROM done WHERE run_id = ? AND outcome = ?", (run_id, SUCCESSFUL)
+            ).fetchone()[0]
+            self._conn.commit()
+
+        if already_done:
+            logger.info(f"Resuming run {run_id} ({already_done} tasks already done)")
+        else:
+            logger.info(f"Starting run {run_id} (journal: {self.path})")
+        return JournalRun(self, run_id, already_done)
+
+    def is_done(self, run_id: str, task_key: str) -> bool:
+        """Whether the task succeeded in this run; failed attempts don't count."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM done WHERE run_id = ? AND task_id = ? AND outcome = ?",
+                (run_id, task_key, SUCCESSFUL)
+            ).fetchone()
+        return row is not None
+
+    def mark_done(self, run_id: str, task_key: str, outcome: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO done (run_id, task_id, outcome, finished_at) "
+                "VALUES (?, ?, ?, ?)",
+                (run_id, task_key, outcome, datetime.utcnow().isoformat())
+            )
+            self._conn.commit()
+
+    def finish_run(self, run_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, finished_at = ? WHERE run_id = ?",
+                (COMPLETED, datetime.utcnow().isoformat(), run_id)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JournalRun:
+    """One run's view of the journal, handed to the batch workers."""
+
+    def __init__(self, journal: RunJournal, run_id: str, already_done: int = 0):
+        self.journal = journal
+        self.run_id = run_id
+        self.already_done = already_done
+
+    def is_done(self, task: Dict[str, Any]) -> bool:
+        """
+        Whether an earlier attempt of this run scraped the task successfully.
+        Tasks that failed (e.g. during an upstream outage) are retried.
+        """
+        return self.journal.is_done(self.run_id, task_id(task))
+
+    def mark_done(self, task: Dict[str, Any], outcome: str) -> None:
+        """
+        Record a finished task.
+
+        Args:
+            task: Scraping task that was processed
+            outcome: "successful" or "failed"
+        """
+        try:
+            self.journal.mark_done(self.run_id, task_id(task), outcome)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to journal task {task_id(task)}: {str(e)}")
+
+    def finish(self) -> None:
+        """Mark the run completed so the next run with the same key starts fresh."""
+        self.journal.finish_run(self.run_id)
+
+
+_default_journal: Optional[RunJournal] = None
+_default_journal_lock = threading.Lock()
+
+
+def get_run_journal() -> RunJournal:
+    """Get the process-wide run journal, opening it on first use."""
+    global _default_journal
+    with _default_journal_lock:
+        if _default_journal is None:
+            _default_journal = RunJournal()
+        return _default_journal
@@ -0,0 +1,131 @@
+"""
+Sharding and Firestore leases for multi-node batch scraping.
+
+Shard mode (?shard=3&shards=8) assigns every coding_stats document to exactly
+one shard via a stable hash of its docId, so N service instances can each take
+one shard of the weekly sweep.
+
+Leases make the split safe even when shards overlap, are misconfigured, or an
+instance is restarted: before scraping, a worker claims the document in a
+Firestore transaction by writing a `scrapeLease` field:
+
+    scrapeLease: {owner, sweepId, expiresAt, done}
+
+A document can be claimed when it has no lease, when its lease belongs to an
+earlier sweep, or when an unfinished lease has expired (its owner died). Once
+scraped the lease is marked done, so no other instance re-scrapes it in the
+same sweep.
+"""
+
+import os
+import socket
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from firebase_admin import firestore
+
+logger = logging.getLogger(__name__)
+
+LEASE_FIELD = "scrapeLease"
+
+# How long an unfinished claim blocks other instances
+DEFAULT_LEASE_TTL_SECONDS = int(os.environ.get("SCRAPE_LEASE_TTL_SECONDS", 900))
+
+
+def shard_for(doc_id: str, shards: int) -> int:
+    """
+    Stable shard number of a document.
+
+    Uses SHA-1 rather than hash() so every instance and Python process agrees
+    on the assignment.
+
+    Args:
+        doc_id: Firestore document id
+        shards: Total number of shards
+
+    Returns:
+        Shard number in [0, shards)
+    """
+    digest = hashlib.sha1(str(doc_id).encode("utf-8")).hexdigest()
+    return int(digest[:8], 16) % shards
+
+
+def default_instance_id() -> str:
+    """Identify this service instance (INSTANCE_ID env, else host and pid)."""
+    return os.environ.get("INSTANCE_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+
+def default_sweep_id(now: Optional[datetime] = None) -> str:
+    """Sweep identifier shared by all instances in the same ISO week, e.g. 2026-W42."""
+    year, week, _ = (now or datetime.now(timezone.utc)).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class LeaseManager:
+    """Claims and completes per-document scrape leases for one sweep."""
+
+    def __init__(
+        self,
+        db,
+        sweep_id: Optional[str] = None,
+        owner: Optional[str] = None,
+        ttl_seconds: int = DEFAULT_LEASE_TTL_SECONDS
+    ):
+        self.db = db
+        self.sweep_id = sweep_id or default_sweep_id()
+        self.owner = owner or default_instance_id()
+        self.ttl = timedelta(seconds=ttl_seconds)
+
+    def _claimable(self, lease: Optional[Dict[str, Any]], now: datetime) -> bool:
+        if not lease or lease.get("sweepId") != self.sweep_id:
+            return True
+        if lease.get("done"):
+            return False
+        if lease.get("owner") == self.owner:
+            return True
+        expires_at = lease.get("expiresAt")
+        return expires_at is None or expires_at <= now
+
+    def claim(self, ref) -> bool:
+        """
+        Try to claim a document for this instance in the current sweep.
+
+        Args:
+            ref: Firestore DocumentReference of the coding_stats document
+
+        Returns:
+            True if this instance now holds the lease, False if another
+            instance holds it or already finished the document this sweep
+        """
+        @firestore.transactional
+        def _claim(transaction) -> bool:
+            # Read only the lease, not the whole profile (calendars, contest history)
+            snapshot = ref.get(field_paths=[LEASE_FIELD], transaction=transaction)
+            lease = (snapshot.to_dict() or {}).get(LEASE_FIELD) if snapshot.exists else None
+            now = datetime.now(timezone.utc)
+            if not self._claimable(lease, now):
+                return False
+            transaction.update(ref, {
+                LEASE_FIELD: {
+                    "owner": self.owner,
+                    "sweepId": self.sweep_id,
+                    "expiresAt": now + self.ttl,
+                    "done": False
+                }
+            })
+            return True
+
+        return _claim(self.db.transaction())
+
+    def completion_fields(self) -> Dict[str, Any]:
+        """Fields to merge into the document's final write to mark the lease done."""
+        return {
+            LEASE_FIELD: {
+                "owner": self.owner,
+                "sweepId": self.sweep_id,
+                "expiresAt": datetime.now(timezone.utc),
+                "done": True
+            }
+        }
@@ -0,0 +1,63 @@
+"""
+Single-flight coalescing of concurrent identical calls.
+
+When several threads ask for the same key at once, only the first (the
+leader) runs the call; the others wait for it and receive the same result,
+or the same exception. Once the call finishes the key is forgotten, so the
+next request runs a new call. Nothing is cached; see utils.response_cache.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time. Thread-safe."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn(), or wait for the call already in flight for `key`.
+
+        Args:
+            key: Identity of the call, e.g. ("leetcode", "alice")
+            fn: Call to run if none is in flight
+
+        Returns:
+            Result of the call that ran for `key`
+
+        Raises:
+            Whatever the call raised, in the leader and every waiter
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,188 @@
+"""
+Staleness-driven scheduling of scrape tasks.
+
+Documents scraped more recently than a freshness TTL are skipped, and the rest
+are handed to the workers most-valuable-first: the longer a document has gone
+without a refresh and the more active its user has recently been (per the
+calendar data stored on the document), the sooner it is scraped. Each run then
+spends its rate budget where data has most likely changed.
+
+Tasks arrive as a stream, so ordering happens inside a bounded reorder window
+(a heap of at most `window` tasks) rather than over the whole collection,
+which keeps memory flat. The window starts at `warmup` tasks and grows by one
+for every task yielded, so scraping starts as soon as the first few tasks
+are read instead of after a full window. The trade-off is ordering quality:
+early tasks are only ranked against the tasks read so far, and the window
+reaches its full size after about 2 * window tasks. Stale tasks for a profile
+already waiting in the window are collapsed into the waiting task (see
+utils.dedupe).
+"""
+
+import os
+import math
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from modules.calendar_codec import DAY_FORMAT, decode_calendar
+from utils.dedupe import SCRAPE_DEDUPE, add_duplicate, dedupe_key
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Skip documents successfully scraped within this many hours (0 disables)
+DEFAULT_FRESHNESS_TTL_HOURS = float(os.environ.get("SCRAPE_FRESHNESS_TTL_HOURS", 24))
+
+# Number of tasks buffered and reordered by priority at once
+DEFAULT_PRIORITY_WINDOW = int(os.environ.get("SCRAPE_PRIORITY_WINDOW", 2000))
+
+# Tasks buffered before the first one is yielded; the window grows from here
+DEFAULT_PRIORITY_WARMUP = int(os.environ.get("SCRAPE_PRIORITY_WARMUP", 50))
+
+# Days of calendar history counted as "recent activity"
+ACTIVITY_WINDOW_DAYS = int(os.environ.get("SCRAPE_ACTIVITY_WINDOW_DAYS", 30))
+
+# Staleness assumed for documents that were never scraped
+NEVER_SCRAPED_HOURS = 24 * 365
+
+
+# ======================================================
+# SIGNALS
+# ======================================================
+
+def _as_utc(value: Any) -> Optional[datetime]:
+    """Normalize a stored timestamp to an aware UTC datetime."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def recent_activity(
+    calendar: Any,
+    days: int = ACTIVITY_WINDOW_DAYS,
+    now: Optional[datetime] = None
+) -> int:
+    """
+    Sum of calendar counts over the last `days` days.
+
+    Args:
+        calendar: Stored calendar, packed or a dict of date or epoch-second
+            keys to counts (see modules.calendar_codec)
+        days: Size of the activity window
+        now: Reference time (default: current UTC time)
+
+    Returns:
+        Total activity count in the window (0 for missing/invalid calendars)
+    """
+    cutoff = ((now or datetime.now(timezone.utc)) - timedelta(days=days)).strftime(DAY_FORMAT)
+    # YYYY-MM-DD keys order the same as the dates they name
+    return sum(count for day, count in decode_calendar(calendar).items() if day >= cutoff)
+
+
+def staleness_hours(task: Dict[str, Any], now: Optional[datetime] = None) -> float:
+    """Hours since the task's document was last updated."""
+    last_updated = _as_utc(task.get("lastUpdated"))
+    if last_updated is None:
+        return float(NEVER_SCRAPED_HOURS)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (now - last_updated).total_seconds() / 3600)
+
+
+def is_fresh(task: Dict[str, Any], ttl_hours: float, now: Optional[datetime] = None) -> bool:
+    """
+    Whether a document was successfully scraped within the freshness TTL.
+    Failed documents are never considered fresh.
+    """
+    if ttl_hours <= 0 or task.get("scrapingStatus") != "success":
+        return False
+    return staleness_hours(task, now) < ttl_hours
+
+
+def task_priority(task: Dict[str, Any], now: Optional[datetime] = None) -> float:
+    """
+    Priority score of a task (higher is scraped sooner).
+
+    Staleness in hours, boosted logarithmically by recent activity so active
+    users are refreshed first while inactive ones still age into the queue.
+    """
+    activity = max(0, task.get("recentActivity") or 0)
+    return staleness_hours(task, now) * (1 + math.log1p(activity))
+
+
+# ======================================================
+# SCHEDULER
+# ======================================================
+
+class StalenessScheduler:
+    """
+    Wraps a task stream: drops fresh tasks and yields the rest by priority
+    within a bounded reorder window, collapsing tasks for the same profile.
+    """
+
+    def __init__(
+        self,
+        tasks: Iterable[Dict[str, Any]],
+        ttl_hours: float = DEFAULT_FRESHNESS_TTL_HOURS,
+        window: int = DEFAULT_PRIORITY_WINDOW,
+        warmup: int = DEFAULT_PRIORITY_WARMUP,
+        on_skip: Optional[Callable[[Dict[str, Any], str], None]] = None,
+        dedupe: bool = SCRAPE_DEDUPE
+    ):
+        self.tasks = tasks
+        self.ttl_hours = ttl_hours
+        self.window = max(1, window)
+        self.warmup = min(max(1, warmup), self.window)
+        self.on_skip = on_skip
+        self.dedupe = dedupe
+        self.skipped_fresh = 0
+        self.collapsed = 0
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        heap = []
+        order = itertools.count()
+        now = datetime.now(timezone.utc)
+        # Leaders waiting in the heap, by (platform, username)
+        waiting: Dict[Any, Dict[str, Any]] = {}
+        # Current reorder window, growing from warmup to window
+        limit = self.warmup
+        
+        def pop() -> Dict[str, Any]:
+            task = heapq.heappop(heap)[2]
+            waiting.pop(dedupe_key(task), None)
+            return task
+
+        for task in self.tasks:
+            if is_fresh(task, self.ttl_hours, now):
+                self.skipped_fresh += 1
+                if self.on_skip is not None:
+                    self.on_skip(task, f"Fresh (updated within {self.ttl_hours:g}h)")
+                continue
+
+            key = dedupe_key(task) if self.dedupe else None
+            if key is not None and key in waiting:
+                add_duplicate(waiting[key], task)
+                self.collapsed += 1
+                continue
+            if key is not None:
+                waiting[key] = task
+
+            # heapq is a min-heap: negate the score; the counter breaks ties FIFO
+            heapq.heappush(heap, (-task_priority(task, now), next(order), task))
+            if len(heap) >= limit:
+                yield pop()
+                limit = min(self.window, limit + 1)
+
+        while heap:
+            yield pop()
+
+        if self.skipped_fresh:
+            logger.info(f"Skipped {self.skipped_fresh} fresh documents (TTL {self.ttl_hours:g}h)")
+        if self.collapsed:
+            logger.info(f"Collapsed {self.collapsed} duplicate (platform, username) tasks")
@@ -0,0 +1,593 @@
+"""
+Storage backends for the batch pipeline.
+
+The batch path needs three things from storage: listing the coding_stats
+documents to build tasks from, writing scrape results and writing scrape
+errors. Result and error writes go through the document reference carried by
+each task (set(merge=True), update() with field paths, get()) or through a
+BulkWriter-style writer for the write stage. A StorageBackend provides
+exactly that surface:
+
+- FirestoreBackend: the production Firestore client
+- SQLiteBackend: documents as JSON rows in a local SQLite file
+- MemoryBackend: documents in a dict, for benchmarks and load tests
+
+The local backends mirror the Firestore semantics the pipeline relies on:
+merge writes merge maps recursively, update() keys are field paths,
+DELETE_FIELD removes a field and ArrayUnion appends missing values. They do
+not support transactions, so document leases need Firestore.
+
+The backend is chosen with STORAGE_BACKEND ("firestore", "sqlite" or
+"memory"); SQLite stores to STORAGE_SQLITE_PATH.
+"""
+
+import os
+import copy
+import json
+import sqlite3
+import logging
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.field_path import parse_field_path
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "firestore").strip().lower()
+
+DEFAULT_SQLITE_PATH = os.environ.get(
+    "STORAGE_SQLITE_PATH",
+    os.path.join(tempfile.gettempdir(), "coding_stats.sqlite3")
+)
+
+# Collection group holding one document per (student, platform)
+CODING_STATS_COLLECTION = "coding_stats"
+
+
+# ======================================================
+# INTERFACE
+# ======================================================
+
+class StorageBackend:
+    """
+    Document storage used by the batch pipeline.
+
+    Subclasses list documents of a collection group and hand out a
+    BulkWriter-compatible writer; individual documents are read and written
+    through the `reference` of the snapshots they yield.
+    """
+
+    name = "abstract"
+
+    # Whether LeaseManager's transactions are available
+    supports_transactions = False
+
+    def iter_documents(
+        self,
+        collection_group: str = CODING_STATS_COLLECTION,
+        fields: Optional[List[str]] = None,
+        page_size: int = 300
+    ) -> Iterator[Any]:
+        """
+        Stream the documents of a collection group in path order.
+
+        Args:
+            collection_group: Collection id to read across all parents
+            fields: Top-level fields to fetch (None fetches whole documents)
+            page_size: Documents read per page
+
+        Yields:
+            Snapshots with .id, .reference and .to_dict()
+        """
+        raise NotImplementedError
+
+    def iter_partitions(
+        self,
+        collection_group: str = CODING_STATS_COLLECTION,
+        partitions: int = 1,
+        fields: Optional[List[str]] = None,
+        page_size: int = 300
+    ) -> List[Iterator[Any]]:
+        """
+        Split a collection group into up to `partitions` disjoint path ranges
+        that can be read concurrently.
+
+        Args:
+            collection_group: Collection id to read across all parents
+            partitions: Desired number of partitions (fewer may be returned
+                for small collections)
+            fields: Top-level fields to fetch (None fetches whole documents)
+            page_size: Documents read per page within each partition
+
+        Returns:
+            One lazy snapshot iterator per partition, each in path order
+        """
+        return [self.iter_documents(collection_group, fields, page_size)]
+
+    def bulk_writer(self) -> Any:
+        """Writer with the BulkWriter subset used by utils.write_stage."""
+        raise NotImplementedError
+
+
+class FirestoreBackend(StorageBackend):
+    """The Firestore client `db` behind the StorageBackend interface."""
+
+    name = "firestore"
+    supports_transactions = True
+
+    def __init__(self, db):
+        self.db = db
+
+    def iter_documents(
+        self,
+        collection_group: str = CODING_STATS_COLLECTION,
+        fields: Optional[List[str]] = None,
+        page_size: int = 300
+    ) -> Iterator[Any]:
+        query = self.db.collection_group(collection_group).order_by("__name__")
+        return self._paged(query, fields, page_size)
+
+    def iter_partitions(
+        self,
+        collection_group: str = CODING_STATS_COLLECTION,
+        partitions: int = 1,
+        fields: Optional[List[str]] = None,
+        page_size: int = 300
+    ) -> List[Iterator[Any]]:
+        if partitions <= 1:
+            return [self.iter_documents(collection_group, fields, page_size)]
+        # Partition queries return document-name cursors splitting the group
+        # into ranges of roughly equal size; one RPC, no documents read
+        group = self.db.collection_group(collection_group)
+        return [
+            self._paged(partition.query(), fields, page_size)
+            for partition in group.get_partitions(partitions)
+        ]
+
+    def _paged(self, query, fields: Optional[List[str]], page_size: int) -> Iterator[Any]:
+        """Stream a query ordered by document name one page per request."""
+        # One page per query, so no cursor stays open for the whole sweep
+        if fields is not None:
+            query = query.select(fields)
+        last_doc = None
+
+        while True:
+            page_query = query.limit(page_size)
+            if last_doc is not None:
+                page_query = page_query.start_after(last_doc)
+
+            page_count = 0
+            for doc in page_query.stream():
+                page_count += 1
+                last_doc = doc
+                yield doc
+
+            if page_count < page_size:
+                break
+
+    def bulk_writer(self) -> Any:
+        return self.db.bulk_writer()
+
+
+# ======================================================
+# LOCAL DOCUMENT SEMANTICS
+# ======================================================
+
+def _resolve(value: Any) -> Any:
+    """Turn value-level sentinels into the value Firestore would store."""
+    if value is transforms.SERVER_TIMESTAMP:
+        return datetime.utcnow()
+    if isinstance(value, transforms.ArrayUnion):
+        return list(value.values)
+    if isinstance(value, dict):
+        return {key: _resolve(item) for key, item in value.items() if item is not transforms.DELETE_FIELD}
+    return copy.deepcopy(value)
+
+
+def _apply_value(target: Dict[str, Any], key: str, value: Any, merge_maps: bool) -> None:
+    if value is transforms.DELETE_FIELD:
+        target.pop(key, None)
+    elif isinstance(value, transforms.ArrayUnion):
+        current = target.get(key)
+        current = list(current) if isinstance(current, list) else []
+        for item in value.values:
+            if item not in current:
+                current.append(copy.deepcopy(item))
+        target[key] = current
+    elif merge_maps and isinstance(value, dict) and isinstance(target.get(key), dict):
+        for child_key, child in value.items():
+            _apply_value(target[key], child_key, child, merge_maps)
+    else:
+        target[key] = _resolve(value)
+
+
+def apply_set(document: Optional[Dict[str, Any]], data: Dict[str, Any], merge: bool) -> Dict[str, Any]:
+    """
+    Result of DocumentReference.set(data, merge=merge) on `document`.
+
+    Args:
+        document: Current document data (None if it does not exist)
+        data: Fields to write (sentinels allowed)
+        merge: Merge maps into the existing document instead of replacing it
+
+    Returns:
+        New document data
+    """
+    result = copy.deepcopy(document) if (merge and document) else {}
+    for key, value in data.items():
+        _apply_value(result, key, value, merge_maps=merge)
+    return result
+
+
+def apply_update(document: Optional[Dict[str, Any]], field_updates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Result of DocumentReference.update(field_updates) on `document`.
+
+    Raises:
+        NotFound: If the document does not exist
+    """
+    if document is None:
+        raise NotFound("No document to update")
+    result = copy.deepcopy(document)
+    for path, value in field_updates.items():
+        parts = parse_field_path(path)
+        parent = result
+        for part in parts[:-1]:
+            if not isinstance(parent.get(part), dict):
+                parent[part] = {}
+            parent = parent[part]
+        # update() replaces the value at the path, maps included
+        _apply_value(parent, parts[-1], value, merge_maps=False)
+    return result
+
+
+class LocalSnapshot:
+    """DocumentSnapshot counterpart returned by local backends."""
+
+    def __init__(self, reference: "LocalDocumentRef", data: Optional[Dict[str, Any]]):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data)
+
+
+class LocalDocumentRef:
+    """DocumentReference counterpart for local backends."""
+
+    def __init__(self, backend: "LocalBackend", path: str):
+        self._backend = backend
+        self.path = path
+        self.id = path.rsplit("/", 1)[-1]
+
+    def get(self, **kwargs) -> LocalSnapshot:
+        return LocalSnapshot(self, self._backend._load(self.path))
+
+    def set(self, document_data: Dict[str, Any], merge: bool = False) -> None:
+        self._backend._modify(self.path, lambda document: apply_set(document, document_data, merge))
+
+    def update(self, field_updates: Dict[str, Any]) -> None:
+        self._backend._modify(self.path, lambda document: apply_update(document, field_updates))
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, LocalDocumentRef) and other.path == self.path
+
+    def __hash__(self) -> int:
+        return hash(self.path)
+
+
+class _LocalOperation:
+    def __init__(self, reference: LocalDocumentRef, apply: Callable[[], None]):
+        self.reference = reference
+        self.apply = apply
+
+
+class _LocalWriteFailure:
+    def __init__(self, operation: _LocalOperation, error: Exception, attempts: int):
+        self.operation = operation
+        self.code = getattr(error, "code", None) or 13
+        self.message = str(error)
+        self.attempts = attempts
+
+
+class LocalBulkWriter:
+    """
+    BulkWriter subset used by utils.write_stage, applying writes on flush().
+
+    Like BulkWriter, different documents are written in parallel while the
+    writes to one document keep their order.
+    """
+
+    def __init__(self, max_parallel: int = 20):
+        self._operations: List[_LocalOperation] = []
+        self._on_result = None
+        self._on_error = None
+        self._executor = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="local-bulk-writer")
+
+    def on_write_result(self, callback) -> None:
+        self._on_result = callback
+
+    def on_write_error(self, callback) -> None:
+        self._on_error = callback
+
+    def set(self, reference: LocalDocumentRef, document_data: Dict[str, Any], merge: bool = False) -> None:
+        self._operations.append(_LocalOperation(reference, lambda: reference.set(document_data, merge=merge)))
+
+    def update(self, reference: LocalDocumentRef, field_updates: Dict[str, Any]) -> None:
+        self._operations.append(_LocalOperation(reference, lambda: reference.update(field_updates)))
+
+    def flush(self) -> None:
+        operations, self._operations = self._operations, []
+        by_document: Dict[str, List[_LocalOperation]] = {}
+        for operation in operations:
+            by_document.setdefault(operation.reference.path, []).append(operation)
+        for future in [self._executor.submit(self._apply_all, group) for group in by_document.values()]:
+            future.result()
+
+    def _apply_all(self, operations: List[_LocalOperation]) -> None:
+        for operation in operations:
+            attempts = 0
+            while True:
+                attempts += 1
+                try:
+                    operation.apply()
+                except Exception as e:
+                    failure = _LocalWriteFailure(operation, e, attempts)
+                    if self._on_error is not None and self._on_error(failure, self):
+                        continue
+                    break
+                if self._on_result is not None:
+                    self._on_result(operation.reference, None, self)
+                break
+
+    def close(self) -> None:
+        self.flush()
+        self._executor.shutdown()
+
+
+class LocalBackend(StorageBackend):
+    """Shared behaviour of backends that keep documents in this process."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Read-modify-write of one document is atomic; different documents
+        # proceed in parallel
+        self._document_locks = [threading.Lock() for _ in range(64)]
+
+    def document(self, path: str) -> LocalDocumentRef:
+        """Reference to the document at `path` (e.g. "institutions/x/coding_stats/y")."""
+        return LocalDocumentRef(self, path)
+
+    def iter_documents(
+        self,
+        collection_group: str = CODING_STATS_COLLECTION,
+        fields: Optional[List[str]] = None,
+        page_size: int = 300
+    ) -> Iterator[LocalSnapshot]:
+        return self._range(collection_group, "", None, fields, page_size)
+
+    def iter_partitions(
+        self,
+        collection_group: str = CODING_STATS_COLLECTION,
+        partitions: int = 1,
+        fields: Optional[List[str]] = None,
+        page_size: int = 300
+    ) -> List[Iterator[LocalSnapshot]]:
+        # Partition k covers paths in (bounds[k], bounds[k + 1]]
+        bounds = [""] + self._split_points(collection_group, max(1, partitions)) + [None]
+        return [
+            self._range(collection_group, bounds[k], bounds[k + 1], fields, page_size)
+            for k in range(len(bounds) - 1)
+        ]
+
+    def _range(
+        self,
+        collection_group: str,
+        after: str,
+        until: Optional[str],
+        fields: Optional[List[str]],
+        page_size: int
+    ) -> Iterator[LocalSnapshot]:
+        while True:
+            page = self._page(collection_group, after, page_size, until)
+            for path, data in page:
+                if fields is not None:
+                    data = {field: data[field] for field in fields if field in data}
+                yield LocalSnapshot(self.document(path), data)
+            if len(page) < page_size:
+                break
+            after = page[-1][0]
+
+    def bulk_writer(self) -> LocalBulkWriter:
+        return LocalBulkWriter()
+
+    def _modify(self, path: str, change: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]) -> None:
+        with self._document_locks[hash(path) % len(self._document_locks)]:
+            self._store(path, change(self._load(path)))
+
+    # Implemented by subclasses
+
+    def _load(self, path: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _store(self, path: str, data: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _page(self, collection_group: str, after: str, limit: int, until: Optional[str] = None) -> List[Any]:
+        """
+        Up to `limit` (path, data) pairs of the group with `after` < path
+        (<= `until`, if given), in path order.
+        """
+        raise NotImplementedError
+
+    def _split_points(self, collection_group: str, partitions: int) -> List[str]:
+        """Paths ending each of the first `partitions` - 1 equal-sized ranges of the group."""
+        raise NotImplementedError
+
+
+def _collection_id(path: str) -> str:
+    parts = path.split("/")
+    return parts[-2] if len(parts) >= 2 else ""
+
+
+def _split(paths: List[str], partitions: int) -> List[str]:
+    """Last path of each of the first `partitions` - 1 equal chunks of sorted `paths`."""
+    partitions = min(partitions, len(paths))
+    return [paths[len(paths) * k // partitions - 1] for k in range(1, partitions)]
+
+
+# ======================================================
+# MEMORY BACKEND
+# ======================================================
+
+class MemoryBackend(LocalBackend):
+    """Documents held in a dict; nothing survives the process."""
+
+    name = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._documents: Dict[str, Dict[str, Any]] = {}
+
+    def _load(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            data = self._documents.get(path)
+            return copy.deepcopy(data) if data is not None else None
+
+    def _store(self, path: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            self._documents[path] = data
+
+    def _group_paths(self, collection_group: str) -> List[str]:
+        return sorted(path for path in self._documents if _collection_id(path) == collection_group)
+
+    def _page(self, collection_group: str, after: str, limit: int, until: Optional[str] = None) -> List[Any]:
+        with self._lock:
+            paths = [
+                path for path in self._group_paths(collection_group)
+                if path > after and (until is None or path <= until)
+            ][:limit]
+            return [(path, copy.deepcopy(self._documents[path])) for path in paths]
+
+    def _split_points(self, collection_group: str, partitions: int) -> List[str]:
+        with self._lock:
+            paths = self._group_paths(collection_group)
+        return _split(paths, partitions)
+
+
+# ======================================================
+# SQLITE BACKEND
+# ======================================================
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    collection_id TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_by_collection ON documents (collection_id, path);
+"""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    return str(value)
+
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1 and "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+class SQLiteBackend(LocalBackend):
+    """Documents stored as JSON rows in a SQLite file. Thread-safe."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = DEFAULT_SQLITE_PATH):
+        super().__init__()
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def _load(self, path: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM documents WHERE path = ?", (path,)).fetchone()
+        return json.loads(row[0], object_hook=_decode_object) if row else None
+
+    def _store(self, path: str, data: Dict[str, Any]) -> None:
+        encoded = json.dumps(data, default=_encode_value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents (path, collection_id, data) VALUES (?, ?, ?)",
+                (path, _collection_id(path), encoded)
+            )
+            self._conn.commit()
+
+    def _page(self, collection_group: str, after: str, limit: int, until: Optional[str] = None) -> List[Any]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, data FROM documents WHERE collection_id = ? AND path > ? "
+                "AND (? IS NULL OR path <= ?) ORDER BY path LIMIT ?",
+                (collection_group, after, until, until, limit)
+            ).fetchall()
+        return [(path, json.loads(data, object_hook=_decode_object)) for path, data in rows]
+
+    def _split_points(self, collection_group: str, partitions: int) -> List[str]:
+        with self._lock:
+            paths = [
+                row[0] for row in self._conn.execute(
+                    "SELECT path FROM documents WHERE collection_id = ? ORDER BY path",
+                    (collection_group,)
+                )
+            ]
+        return _split(paths, partitions)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ======================================================
+# SELECTION
+# ======================================================
+
+def open_storage(name: str = STORAGE_BACKEND, db=None) -> Optional[StorageBackend]:
+    """
+    Open the configured storage backend.
+
+    Args:
+        name: "firestore", "sqlite" or "memory"
+        db: Firestore client, used by the firestore backend
+
+    Returns:
+        The backend, or None for firestore when no client is available
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    if name == "firestore":
+        return FirestoreBackend(db) if db is not None else None
+    if name == "sqlite":
+        logger.info(f"Using SQLite storage backend ({DEFAULT_SQLITE_PATH})")
+        return SQLiteBackend()
+    if name == "memory":
+        logger.info("Using in-memory storage backend")
+        return MemoryBackend()
+    raise ValueError(f"Unknown STORAGE_BACKEND '{name}'. Use firestore, sqlite or memory")
@@ -0,0 +1,174 @@
+"""
+Bounded producer/consumer stream for scraping tasks.
+
+BoundedTaskStream runs a task source (e.g. a paginated Firestore query) in a
+background producer thread and hands tasks to the consumer through a bounded
+queue. Scraping starts as soon as the first document arrives, and memory stays
+flat because the producer blocks whenever the consumer falls behind.
+
+read_concurrently() does the same for several sources at once, e.g. the
+partitions of a collection group read by parallel cursors.
+"""
+
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sentinel marking the end of the stream
+_DONE = object()
+
+
+class _ProducerError:
+    """Carries an exception from the producer thread to the consumer."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class BoundedTaskStream:
+    """
+    Iterate over `source` through a bounded queue filled by a producer thread.
+
+    Exceptions raised by the source are re-raised in the consuming thread. If
+    the consumer stops early, close() (or leaving a `with` block) stops the
+    producer. on_item is called by the producer for every item read, and
+    on_exhausted once the source has been read to the end (not on failure or
+    close), while the consumer may still be working through the queue.
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Dict[str, Any]],
+        maxsize: int = 500,
+        on_item: Optional[Callable[[Dict[str, Any]], None]] = None,
+        on_exhausted: Optional[Callable[[], None]] = None
+    ):
+        self.source = source
+        self.on_item = on_item
+        self.on_exhausted = on_exhausted
+        self.produced = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, maxsize))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "BoundedTaskStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _put(self, item: Any) -> bool:
+        """Put an item, giving up if the stream is closed. Returns False if closed."""
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self) -> None:
+        try:
+            for item in self.source:
+                if not self._put(item):
+                    return
+                self.produced += 1
+                if self.on_item is not None:
+                    self.on_item(item)
+        except Exception as e:
+            logger.error(f"Task producer failed: {str(e)}")
+            self._put(_ProducerError(e))
+            return
+        if self.on_exhausted is not None:
+            self.on_exhausted()
+        self._put(_DONE)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if self._thread is not None:
+            raise RuntimeError("BoundedTaskStream can only be iterated once")
+
+        self._thread = threading.Thread(target=self._produce, name="task-producer", daemon=True)
+        self._thread.start()
+
+        while True:
+            item = self._queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+
+    def close(self) -> None:
+        """Stop the producer thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def read_concurrently(
+    sources: List[Iterable[Any]],
+    maxsize: int = 500,
+    name: str = "reader"
+) -> Iterator[Any]:
+    """
+    Drain several sources (e.g. the partitions of a collection group) in
+    parallel, one thread each, yielding their items in arrival order.
+
+    Items of one source keep their relative order; across sources they
+    interleave. An exception in any source is re-raised in the consumer.
+    Closing the generator stops the reader threads.
+
+    Args:
+        sources: Iterables to read concurrently
+        maxsize: Items buffered between the readers and the consumer
+        name: Thread name prefix
+    """
+    if len(sources) == 1:
+        yield from sources[0]
+        return
+
+    items: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, maxsize))
+    stop = threading.Event()
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def read(source: Iterable[Any]) -> None:
+        try:
+            for item in source:
+                if not put(item):
+                    return
+        except Exception as e:
+            logger.error(f"Concurrent reader failed: {str(e)}")
+            put(_ProducerError(e))
+            return
+        put(_DONE)
+
+    threads = [
+        threading.Thread(target=read, args=(source,), name=f"{name}-{index}", daemon=True)
+        for index, source in enumerate(sources)
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        remaining = len(threads)
+        while remaining:
+            item = items.get()
+            if item is _DONE:
+                remaining -= 1
+                continue
+            if isinstance(item, _ProducerError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,363 @@
+"""
+Buffered Firestore write stage for the batch pipeline.
+
+Instead of every worker blocking on its own set() round-trip, workers hand
+their document writes to a FirestoreWriteStage and move on to the next
+scrape. A flusher thread drains the buffer into a Firestore BulkWriter
+whenever `batch_size` writes are waiting or `flush_interval` seconds have
+passed since the oldest one, then waits for the BulkWriter to commit them.
+Each write's outcome is reported back through its own on_done callback, so
+one failed document never fails the rest of its batch.
+
+In front of it, a WriteBehindQueue takes the rest of persistence (building
+the update, reading the stored snapshot for a delta, claiming duplicate
+documents) off the scrape workers: a worker hands over its scrape result and
+goes straight on to the next profile, while a small pool of writer threads
+turns results into buffered writes.
+
+Thresholds can be tuned with environment variables:
+
+    WRITE_BATCH_SIZE=200        # writes per flush
+    WRITE_FLUSH_INTERVAL=1.0    # max seconds a write waits in the buffer
+    WRITE_MAX_PENDING=1000      # buffered writes before set() blocks
+    WRITE_MAX_ATTEMPTS=5        # BulkWriter attempts per document
+    WRITE_BEHIND_WORKERS=8      # threads persisting handed-off results
+    WRITE_BEHIND_QUEUE=500      # handed-off results before submit() blocks
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+
+# Route batch writes through the write stage (false: one set() per worker)
+BATCH_WRITES = os.environ.get("BATCH_WRITES", "true").strip().lower() == "true"
+
+DEFAULT_WRITE_BATCH_SIZE = int(os.environ.get("WRITE_BATCH_SIZE", 200))
+DEFAULT_WRITE_FLUSH_INTERVAL = float(os.environ.get("WRITE_FLUSH_INTERVAL", 1.0))
+DEFAULT_WRITE_MAX_PENDING = int(os.environ.get("WRITE_MAX_PENDING", 1000))
+DEFAULT_WRITE_MAX_ATTEMPTS = int(os.environ.get("WRITE_MAX_ATTEMPTS", 5))
+
+# Persist scrape results on writer threads instead of the scrape workers
+WRITE_BEHIND = os.environ.get("WRITE_BEHIND", "true").strip().lower() == "true"
+
+DEFAULT_WRITE_BEHIND_WORKERS = int(os.environ.get("WRITE_BEHIND_WORKERS", 8))
+DEFAULT_WRITE_BEHIND_QUEUE = int(os.environ.get("WRITE_BEHIND_QUEUE", 500))
+
+# on_done(error): error is None once the write is committed
+WriteCallback = Callable[[Optional[Exception]], None]
+
+
+class WriteFailed(Exception):
+    """A buffered document write was rejected by Firestore after all attempts."""
+
+    def __init__(self, path: str, code: int, message: str):
+        super().__init__(f"Write to {path} failed (code {code}): {message}")
+        self.path = path
+        self.code = code
+
+
+class _PendingWrite:
+    __slots__ = ("ref", "data", "merge", "on_done", "is_update")
+
+    def __init__(
+        self,
+        ref,
+        data: Dict[str, Any],
+        merge: bool,
+        on_done: Optional[WriteCallback],
+        is_update: bool = False
+    ):
+        self.ref = ref
+        self.data = data
+        self.merge = merge
+        self.on_done = on_done
+        self.is_update = is_update
+
+
+# ======================================================
+# WRITE STAGE
+# ======================================================
+
+class FirestoreWriteStage:
+    """
+    Buffers document writes and commits them through a BulkWriter from a
+    background flusher thread. Use as a context manager, or call close(),
+    to flush everything before the run ends.
+    """
+
+    def __init__(
+        self,
+        db,
+        batch_size: int = DEFAULT_WRITE_BATCH_SIZE,
+        flush_interval: float = DEFAULT_WRITE_FLUSH_INTERVAL,
+        max_pending: int = DEFAULT_WRITE_MAX_PENDING,
+        max_attempts: int = DEFAULT_WRITE_MAX_ATTEMPTS
+    ):
+        # Firestore client or utils.storage backend; only bulk_writer() is used
+        self.db = db
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, max_pending)
+        self.max_attempts = max(1, max_attempts)
+        self.written = 0
+        self.failed = 0
+        self._buffer: List[_PendingWrite] = []
+        self._oldest: Optional[float] = None
+        self._closed = False
+        self._stopped = False
+        # Marks threads running an on_done callback, which may queue follow-up
+        # writes (e.g. an error status) but must never block on a full buffer
+        self._callback_context = threading.local()
+        self._cond = threading.Condition()
+        # Callbacks of writes handed to the BulkWriter, per document path in
+        # submission order; BulkWriter reports results from its own threads
+        self._in_flight: Dict[str, Deque[Optional[WriteCallback]]] = defaultdict(deque)
+        self._in_flight_lock = threading.Lock()
+        self._bulk_writer = None
+        self._thread = threading.Thread(target=self._run, name="firestore-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "FirestoreWriteStage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def set(self, ref, data: Dict[str, Any], on_done: Optional[WriteCallback] = None, merge: bool = True) -> None:
+        """
+        Queue a set() of `data` on `ref`. Blocks only while the buffer is full.
+
+        Args:
+            ref: Firestore DocumentReference
+            data: Document fields (sentinels such as DELETE_FIELD allowed)
+            on_done: Called from the flusher thread with None once committed,
+                or with the exception if the write failed
+            merge: Merge into the existing document instead of replacing it
+        """
+        self._enqueue(_PendingWrite(ref, data, merge, on_done))
+
+    def update(self, ref, field_updates: Dict[str, Any], on_done: Optional[WriteCallback] = None) -> None:
+        """
+        Queue an update() of field paths on an existing document.
+
+        Args:
+            ref: Firestore DocumentReference
+            field_updates: Field path keyed values (e.g. "calendar.`2026-10-16`")
+            on_done: As for set()
+        """
+        self._enqueue(_PendingWrite(ref, field_updates, False, on_done, is_update=True))
+
+    def _enqueue(self, write: _PendingWrite) -> None:
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("FirestoreWriteStage is closed")
+            if not getattr(self._callback_context, "active", False):
+                self._cond.wait_for(lambda: len(self._buffer) < self.max_pending)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            self._buffer.append(write)
+            if len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+
+    def close(self) -> None:
+        """
+        Flush all buffered writes (including follow-up writes queued by their
+        callbacks), wait for their outcomes and stop the flusher.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self._bulk_writer is not None:
+            self._bulk_writer.close()
+        logger.info(f"Write stage closed: {self.written} documents written, {self.failed} failed")
+
+    # --------------------------------------------------
+    # Flusher thread
+    # --------------------------------------------------
+
+    def _due(self) -> bool:
+        """Whether the buffer should be flushed now (caller holds the lock)."""
+        if not self._buffer:
+            return False
+        if self._closed or len(self._buffer) >= self.batch_size:
+            return True
+        return time.monotonic() - self._oldest >= self.flush_interval
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._due() and not (self._closed and not self._buffer):
+                    timeout = None
+                    if self._oldest is not None:
+                        timeout = max(0.0, self.flush_interval - (time.monotonic() - self._oldest))
+                    self._cond.wait(timeout)
+                if self._closed and not self._buffer:
+                    self._stopped = True
+                    return
+                batch, self._buffer, self._oldest = self._buffer, [], None
+                self._cond.notify_all()
+            self._flush(batch)
+
+    def _writer(self):
+        if self._bulk_writer is None:
+            self._bulk_writer = self.db.bulk_writer()
+            self._bulk_writer.on_write_result(self._on_write_result)
+            self._bulk_writer.on_write_error(self._on_write_error)
+        return self._bulk_writer
+
+    def _flush(self, batch: List[_PendingWrite]) -> None:
+        writer = self._writer()
+        for write in batch:
+            with self._in_flight_lock:
+                self._in_flight[write.ref.path].append(write.on_done)
+            try:
+                if write.is_update:
+                    writer.update(write.ref, write.data)
+                else:
+                    writer.set(write.ref, write.data, merge=write.merge)
+            except Exception as e:
+                with self._in_flight_lock:
+                    self._in_flight[write.ref.path].pop()
+                self._finish(write.on_done, e)
+        try:
+            writer.flush()
+        except Exception as e:
+            logger.error(f"Bulk write flush failed: {str(e)}")
+            with self._in_flight_lock:
+                orphans = [on_done for callbacks in self._in_flight.values() for on_done in callbacks]
+                self._in_flight.clear()
+            for on_done in orphans:
+                self._finish(on_done, e)
+
+    def _pop_callback(self, path: str) -> Optional[WriteCallback]:
+        with self._in_flight_lock:
+            callbacks = self._in_flight.get(path)
+            if not callbacks:
+                return None
+            on_done = callbacks.popleft()
+            if not callbacks:
+                del self._in_flight[path]
+            return on_done
+
+    def _on_write_result(self, reference, write_result, bulk_writer) -> None:
+        self._finish(self._pop_callback(reference.path), None)
+
+    def _on_write_error(self, failure, bulk_writer) -> bool:
+        if failure.attempts < self.max_attempts:
+            return True
+        path = failure.operation.reference.path
+        self._finish(self._pop_callback(path), WriteFailed(path, failure.code, failure.message))
+        return False
+
+    def _finish(self, on_done: Optional[WriteCallback], error: Optional[Exception]) -> None:
+        with self._in_flight_lock:
+            if error is None:
+                self.written += 1
+            else:
+                self.failed += 1
+        if on_done is None:
+            return
+        self._callback_context.active = True
+        try:
+            on_done(error)
+        except Exception as e:
+            logger.error(f"Write callback failed: {str(e)}")
+        finally:
+            self._callback_context.active = False
+
+
+# ======================================================
+# WRITE-BEHIND QUEUE
+# ======================================================
+
+# Tells a writer thread to exit
+_STOP = object()
+
+
+class WriteBehindQueue:
+    """
+    Bounded queue of persistence jobs run by dedicated writer threads.
+
+    submit() returns as soon as the job is queued and only blocks while
+    `maxsize` jobs are already waiting (backpressure on the scrape workers).
+    close() runs every queued job before it returns. Use as a context
+    manager, or call close(), before the run ends.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WRITE_BEHIND_WORKERS,
+        maxsize: int = DEFAULT_WRITE_BEHIND_QUEUE,
+        name: str = "write-behind"
+    ):
+        self.completed = 0
+        self.failed = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, maxsize))
+        # Held across put() so no job can land behind the stop markers
+        self._submit_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{index}", daemon=True)
+            for index in range(max(1, workers))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def __enter__(self) -> "WriteBehindQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def submit(self, job: Callable[[], None]) -> None:
+        """
+        Queue `job` to run on a writer thread.
+
+        Raises:
+            RuntimeError: If the queue has been closed
+        """
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("WriteBehindQueue is closed")
+            self._queue.put(job)
+
+    def close(self) -> None:
+        """Run all queued jobs, then stop the writer threads."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            for _ in self._threads:
+                self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        logger.info(f"Write-behind queue closed: {self.completed} results persisted, {self.failed} failed")
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            try:
+                job()
+            except Exception as e:
+                logger.error(f"Write-behind job failed: {str(e)}")
+                with self._stats_lock:
+                    self.failed += 1
+                continue
+            with self._stats_lock:
+                self.completed += 1